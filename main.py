@@ -18,7 +18,29 @@ from src.api.v1.endpoints import (
     search,
     transaction_history,
 )
+from src.cache.manager import cache_manager
 from src.cache.redis import redis_client
+from src.core.scheduler.periodic import scheduler
+from src.services.maintenance.partitions import PartitionMaintenance
+from src.services.archive.service import ArchiveService
+from src.services.event.analytics import event_analytics
+from src.services.event.prewarm import EventPrewarmer
+from src.services.event.qr_generator import EventQRGenerator
+from src.services.event.qr_renderer import qr_render_pool
+from src.services.event.register import event_register_service
+from src.services.event.register_renderer import register_render_pool
+from src.services.outbox.service import (
+    outbox_relay,
+    PAYMENT_STATUS_CHANGED,
+    SHAGUN_COMPLETED,
+    SHAGUN_FAILED,
+)
+from src.services.payment.gateway.factory import payment_gateway
+from src.services.payment.inbox import webhook_inbox
+from src.services.payment.reconciler import PaymentReconciler
+from src.services.payment.status import payment_status_feed
+from src.services.realtime.pubsub import pubsub_hub
+from src.services.shagun.live import event_live_feed
 from starlette.middleware.base import BaseHTTPMiddleware
 
 os.makedirs("logs", exist_ok=True)
@@ -95,13 +117,92 @@ app.include_router(
 )
 
 
+# Background jobs
+partition_maintenance = PartitionMaintenance()
+scheduler.register(
+    "transaction_partitions",
+    partition_maintenance.ensure_transaction_partitions,
+    interval=settings.PARTITION_MAINTENANCE_INTERVAL,
+)
+archive_service = ArchiveService()
+scheduler.register(
+    "event_archive",
+    archive_service.archive_closed_events,
+    interval=settings.ARCHIVE_INTERVAL,
+)
+scheduler.register(
+    "outbox_relay",
+    outbox_relay.drain,
+    interval=settings.OUTBOX_POLL_INTERVAL,
+    singleton=False,
+)
+scheduler.register("outbox_purge", outbox_relay.purge_published, interval=3600)
+scheduler.register(
+    "webhook_inbox",
+    webhook_inbox.drain,
+    interval=settings.WEBHOOK_INBOX_POLL_INTERVAL,
+    singleton=False,
+)
+scheduler.register("webhook_inbox_purge", webhook_inbox.purge_processed, interval=3600)
+payment_reconciler = PaymentReconciler()
+scheduler.register(
+    "payment_reconcile",
+    payment_reconciler.reconcile,
+    interval=settings.RECONCILE_INTERVAL,
+)
+
+scheduler.register(
+    "qr_cache_evict",
+    EventQRGenerator().evict_renders,
+    interval=settings.QR_CACHE_EVICT_INTERVAL,
+)
+scheduler.register(
+    "event_register_render",
+    event_register_service.render_pending,
+    interval=settings.REGISTER_POLL_INTERVAL,
+    singleton=False,
+)
+scheduler.register(
+    "event_analytics_purge", event_analytics.purge_applied, interval=3600
+)
+scheduler.register(
+    "event_analytics_repair",
+    event_analytics.repair,
+    interval=settings.ANALYTICS_REPAIR_INTERVAL,
+)
+scheduler.register(
+    "event_prewarm",
+    EventPrewarmer().prewarm,
+    interval=settings.PREWARM_INTERVAL,
+)
+
+
+# Outbox consumers, run in order; one that raises retries the row for all
+# after it. Analytics goes first: it is deduplicated and in Postgres, so
+# others' failures don't stop shaguns being counted.
+outbox_relay.subscribe(PAYMENT_STATUS_CHANGED, payment_status_feed.publish)
+outbox_relay.subscribe(SHAGUN_COMPLETED, event_analytics.apply)
+outbox_relay.subscribe(SHAGUN_COMPLETED, cache_manager.invalidate_shaguns)
+outbox_relay.subscribe(SHAGUN_COMPLETED, event_live_feed.publish)
+outbox_relay.subscribe(SHAGUN_FAILED, cache_manager.invalidate_shaguns)
+
+
 @app.on_event("startup")
 async def startup():
     await db.initialize()
     await redis_client.init()
+    await pubsub_hub.start()
+    await qr_render_pool.start()
+    if settings.SCHEDULER_ENABLED:
+        await scheduler.start()
 
 
 @app.on_event("shutdown")
 async def shutdown():
+    await scheduler.stop()
+    await payment_gateway.close()
+    await pubsub_hub.stop()
+    qr_render_pool.stop()
+    register_render_pool.stop()
     await db.dispose()
     await redis_client.close()
@@ -0,0 +1,121 @@
+# migrations/helpers.py
+"""Shared helpers for online index changes in migrations.
+
+``CREATE/DROP INDEX CONCURRENTLY`` cannot run inside a transaction block and
+is not supported on partitioned tables, so these helpers run in an alembic
+autocommit block and, for partitioned tables, build the index on each
+partition concurrently before attaching it to the parent index.
+"""
+from typing import List, Optional
+
+from alembic import op
+import sqlalchemy as sa
+
+LOCK_TIMEOUT = "5s"
+
+
+def is_partitioned(table: str) -> bool:
+    return bool(
+        op.get_bind()
+        .execute(
+            sa.text(
+                "SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass(:table)"
+            ),
+            {"table": table},
+        )
+        .scalar()
+    )
+
+
+def partitions_of(table: str) -> List[str]:
+    rows = op.get_bind().execute(
+        sa.text(
+            """
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = to_regclass(:table)
+            ORDER BY c.relname
+            """
+        ),
+        {"table": table},
+    )
+    return [row[0] for row in rows]
+
+
+def _index_sql(
+    name: str,
+    table: str,
+    columns: str,
+    using: Optional[str],
+    include: Optional[str],
+    where: Optional[str],
+    concurrently: bool = False,
+    only: bool = False,
+) -> str:
+    return " ".join(
+        part
+        for part in [
+            "CREATE INDEX",
+            "CONCURRENTLY" if concurrently else "",
+            f"IF NOT EXISTS {name} ON",
+            "ONLY" if only else "",
+            table,
+            f"USING {using}" if using else "",
+            f"({columns})",
+            f"INCLUDE ({include})" if include else "",
+            f"WHERE {where}" if where else "",
+        ]
+        if part
+    )
+
+
+def create_index_concurrently(
+    name: str,
+    table: str,
+    columns: str,
+    using: Optional[str] = None,
+    include: Optional[str] = None,
+    where: Optional[str] = None,
+) -> None:
+    """Create an index without blocking writes"""
+    partitioned = is_partitioned(table)
+    partitions = partitions_of(table) if partitioned else []
+
+    with op.get_context().autocommit_block():
+        if not partitioned:
+            op.execute(
+                _index_sql(name, table, columns, using, include, where, concurrently=True)
+            )
+            return
+
+        # Parent index stays invalid until every partition index is attached
+        op.execute(_index_sql(name, table, columns, using, include, where, only=True))
+        for partition in partitions:
+            suffix = partition[len(table) :] if partition.startswith(table) else f"_{partition}"
+            partition_index = f"{name}{suffix}"[:63]
+            op.execute(
+                _index_sql(
+                    partition_index,
+                    partition,
+                    columns,
+                    using,
+                    include,
+                    where,
+                    concurrently=True,
+                )
+            )
+            op.execute(f"ALTER INDEX {name} ATTACH PARTITION {partition_index}")
+
+
+def drop_index_concurrently(name: str, table: str) -> None:
+    """Drop an index without blocking writes for longer than LOCK_TIMEOUT"""
+    with op.get_context().autocommit_block():
+        if is_partitioned(table):
+            # Partitioned indexes cannot be dropped concurrently; the catalog
+            # change is quick, so only bound how long we wait for the lock.
+            op.execute(f"SET lock_timeout = '{LOCK_TIMEOUT}'")
+            op.execute(f"DROP INDEX IF EXISTS {name}")
+            op.execute("RESET lock_timeout")
+        else:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
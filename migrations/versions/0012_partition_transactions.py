@@ -0,0 +1,192 @@
+# migrations/versions/0012_partition_transactions.py
+"""partition transactions by created_at month
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-19
+
+Converts ``transactions`` into a table partitioned by month of ``created_at``.
+Partitions are created by ``create_transactions_partitions(months_ahead)``,
+which the partition maintenance job calls periodically so that inserts
+never fall into the default partition.
+
+Partitioned tables require every unique constraint to contain the partition
+key, so the primary key becomes ``(id, created_at)``, the ``upi_ref`` index
+is no longer unique (``payments.gateway_payment_id`` stays unique) and the
+``payments.transaction_id`` foreign key is dropped.
+"""
+from alembic import op
+
+# revision identifiers
+revision = "0012"
+down_revision = "0011"
+branch_labels = None
+depends_on = None
+
+
+TRANSACTION_INDEXES = [
+    "CREATE INDEX idx_transactions_event_type_created ON transactions (event_id, type, created_at)",
+    "CREATE INDEX idx_transactions_sender ON transactions (sender_id, created_at)",
+    "CREATE INDEX idx_transactions_receiver ON transactions (receiver_id, created_at)",
+    "CREATE INDEX idx_transactions_status_type ON transactions (status, type) WHERE type = 'online'",
+    "CREATE INDEX idx_transactions_sender_name ON transactions (sender_name) WHERE type = 'cash'",
+    "CREATE INDEX idx_transactions_location ON transactions USING GIN (location jsonb_path_ops)",
+    "CREATE INDEX idx_transactions_gift_details ON transactions USING GIN (gift_details jsonb_path_ops)",
+    "CREATE INDEX idx_transactions_sender_name_trgm ON transactions USING gin (sender_name gin_trgm_ops)",
+    "CREATE INDEX idx_transactions_address_trgm ON transactions USING gin (address gin_trgm_ops)",
+    "CREATE INDEX idx_transactions_type_status ON transactions (type, status)",
+    "CREATE INDEX idx_transactions_event_created ON transactions (event_id, created_at DESC)",
+    "CREATE INDEX idx_transactions_sender_name_trigram ON transactions USING gin (sender_name gin_trgm_ops)",
+    "CREATE INDEX idx_transactions_address_trigram ON transactions USING gin (address gin_trgm_ops)",
+]
+
+TRANSACTION_FOREIGN_KEYS = """
+    ALTER TABLE transactions
+        ADD CONSTRAINT transactions_event_id_fkey
+            FOREIGN KEY (event_id) REFERENCES events (id) ON DELETE SET NULL,
+        ADD CONSTRAINT transactions_sender_id_fkey
+            FOREIGN KEY (sender_id) REFERENCES users (id) ON DELETE SET NULL,
+        ADD CONSTRAINT transactions_receiver_id_fkey
+            FOREIGN KEY (receiver_id) REFERENCES users (id) ON DELETE SET NULL
+"""
+
+
+def upgrade() -> None:
+    op.execute(
+        "ALTER TABLE payments DROP CONSTRAINT IF EXISTS payments_transaction_id_fkey"
+    )
+    op.execute("ALTER TABLE transactions RENAME TO transactions_unpartitioned")
+
+    op.execute(
+        """
+        CREATE TABLE transactions (
+            LIKE transactions_unpartitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    op.execute("ALTER TABLE transactions ALTER COLUMN created_at SET NOT NULL")
+
+    # Month boundaries are computed in UTC so partition bounds do not depend
+    # on the session time zone of whoever runs the maintenance job.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION create_transactions_partition(month_start date)
+        RETURNS boolean AS $$
+        DECLARE
+            start_date date := date_trunc('month', month_start)::date;
+            partition_name text := format(
+                'transactions_y%sm%s',
+                to_char(start_date, 'YYYY'),
+                to_char(start_date, 'MM')
+            );
+        BEGIN
+            IF to_regclass(partition_name) IS NOT NULL THEN
+                RETURN false;
+            END IF;
+
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF transactions FOR VALUES FROM (%L) TO (%L)',
+                partition_name,
+                start_date::timestamp AT TIME ZONE 'UTC',
+                (start_date + INTERVAL '1 month')::timestamp AT TIME ZONE 'UTC'
+            );
+            RETURN true;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION create_transactions_partitions(months_ahead integer)
+        RETURNS integer AS $$
+        DECLARE
+            created integer := 0;
+            month_offset integer;
+        BEGIN
+            FOR month_offset IN 0..months_ahead LOOP
+                IF create_transactions_partition(
+                    (date_trunc('month', NOW() AT TIME ZONE 'UTC')
+                        + make_interval(months => month_offset))::date
+                ) THEN
+                    created := created + 1;
+                END IF;
+            END LOOP;
+            RETURN created;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+
+    # Partitions for existing data, the coming months and a safety net
+    op.execute(
+        """
+        UPDATE transactions_unpartitioned
+        SET created_at = COALESCE(updated_at, NOW())
+        WHERE created_at IS NULL
+        """
+    )
+    op.execute(
+        """
+        SELECT create_transactions_partition(month::date)
+        FROM generate_series(
+            date_trunc(
+                'month',
+                COALESCE(
+                    (SELECT MIN(created_at) FROM transactions_unpartitioned),
+                    NOW()
+                ) AT TIME ZONE 'UTC'
+            ),
+            date_trunc('month', NOW() AT TIME ZONE 'UTC'),
+            INTERVAL '1 month'
+        ) AS month
+        """
+    )
+    op.execute("SELECT create_transactions_partitions(3)")
+    op.execute("CREATE TABLE transactions_default PARTITION OF transactions DEFAULT")
+
+    op.execute("INSERT INTO transactions SELECT * FROM transactions_unpartitioned")
+    op.execute("DROP TABLE transactions_unpartitioned")
+
+    op.execute(
+        "ALTER TABLE transactions ADD CONSTRAINT transactions_pkey PRIMARY KEY (id, created_at)"
+    )
+    op.execute(TRANSACTION_FOREIGN_KEYS)
+    op.execute(
+        "CREATE INDEX idx_transactions_upi_ref ON transactions (upi_ref) WHERE upi_ref IS NOT NULL"
+    )
+    for statement in TRANSACTION_INDEXES:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE transactions RENAME TO transactions_partitioned")
+    op.execute(
+        """
+        CREATE TABLE transactions (
+            LIKE transactions_partitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS
+        )
+        """
+    )
+    op.execute("INSERT INTO transactions SELECT * FROM transactions_partitioned")
+    op.execute("DROP TABLE transactions_partitioned CASCADE")
+    op.execute("DROP FUNCTION IF EXISTS create_transactions_partitions(integer)")
+    op.execute("DROP FUNCTION IF EXISTS create_transactions_partition(date)")
+
+    op.execute("ALTER TABLE transactions ALTER COLUMN created_at DROP NOT NULL")
+    op.execute(
+        "ALTER TABLE transactions ADD CONSTRAINT transactions_pkey PRIMARY KEY (id)"
+    )
+    op.execute(TRANSACTION_FOREIGN_KEYS)
+    op.execute(
+        "CREATE UNIQUE INDEX idx_transactions_upi_ref ON transactions (upi_ref) WHERE upi_ref IS NOT NULL"
+    )
+    for statement in TRANSACTION_INDEXES:
+        op.execute(statement)
+
+    op.execute(
+        """
+        ALTER TABLE payments
+            ADD CONSTRAINT payments_transaction_id_fkey
+            FOREIGN KEY (transaction_id) REFERENCES transactions (id) ON DELETE CASCADE
+        """
+    )
@@ -0,0 +1,100 @@
+# migrations/versions/0013_add_event_archive.py
+"""add cold archive for closed events
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+# revision identifiers
+revision = "0013"
+down_revision = "0012"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Set when archiving starts; readers switch to transactions_all from then on
+    op.add_column(
+        "events", sa.Column("archived_at", sa.TIMESTAMP(timezone=True), nullable=True)
+    )
+
+    op.execute(
+        """
+        CREATE TABLE transactions_archive (
+            LIKE transactions INCLUDING DEFAULTS INCLUDING CONSTRAINTS,
+            PRIMARY KEY (id)
+        )
+        """
+    )
+    op.execute(
+        "CREATE INDEX idx_transactions_archive_event ON transactions_archive (event_id, created_at DESC)"
+    )
+    op.execute(
+        "CREATE INDEX idx_transactions_archive_sender ON transactions_archive (sender_id, created_at)"
+    )
+    op.execute(
+        "CREATE INDEX idx_transactions_archive_receiver ON transactions_archive (receiver_id, created_at)"
+    )
+
+    op.execute(
+        """
+        CREATE TABLE payments_archive (
+            LIKE payments INCLUDING DEFAULTS INCLUDING CONSTRAINTS,
+            PRIMARY KEY (id)
+        )
+        """
+    )
+    op.execute(
+        "CREATE INDEX idx_payments_archive_transaction ON payments_archive (transaction_id)"
+    )
+
+    op.create_table(
+        "archived_events",
+        sa.Column(
+            "event_id",
+            UUID(),
+            sa.ForeignKey("events.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("shagun_count", sa.Integer, server_default="0", nullable=False),
+        sa.Column("online_count", sa.Integer, server_default="0", nullable=False),
+        sa.Column("cash_count", sa.Integer, server_default="0", nullable=False),
+        sa.Column(
+            "total_amount", sa.Numeric(20, 2), server_default="0", nullable=False
+        ),
+        sa.Column(
+            "online_amount", sa.Numeric(20, 2), server_default="0", nullable=False
+        ),
+        sa.Column("cash_amount", sa.Numeric(20, 2), server_default="0", nullable=False),
+        sa.Column("first_transaction_at", sa.TIMESTAMP(timezone=True)),
+        sa.Column("last_transaction_at", sa.TIMESTAMP(timezone=True)),
+        sa.Column(
+            "started_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("NOW()")
+        ),
+        sa.Column("completed_at", sa.TIMESTAMP(timezone=True)),
+        sa.PrimaryKeyConstraint("event_id"),
+    )
+
+    # Hot and archived rows together, for readers that cannot tell in advance
+    op.execute(
+        """
+        CREATE VIEW transactions_all AS
+        SELECT * FROM transactions
+        UNION ALL
+        SELECT * FROM transactions_archive
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("INSERT INTO transactions SELECT * FROM transactions_archive")
+    op.execute("INSERT INTO payments SELECT * FROM payments_archive")
+    op.execute("DROP VIEW IF EXISTS transactions_all")
+    op.drop_table("archived_events")
+    op.drop_table("payments_archive")
+    op.drop_table("transactions_archive")
+    op.drop_column("events", "archived_at")
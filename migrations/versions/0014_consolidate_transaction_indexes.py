@@ -0,0 +1,50 @@
+# migrations/versions/0014_consolidate_transaction_indexes.py
+"""drop redundant transaction indexes
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-19
+
+Every transaction insert maintains every index below. Dropped:
+
+- ``*_trigram`` indexes from 0011, exact duplicates of the ``*_trgm``
+  indexes from 0010
+- ``idx_transactions_type_status`` from 0010, which overlaps the partial
+  ``idx_transactions_status_type`` from 0006
+- ``idx_transactions_sender_name`` (btree on cash rows); name search uses
+  ``ILIKE`` and is served by the trigram index
+- GIN indexes on ``location`` and ``gift_details``; no query filters on them
+
+Measure the effect with ``scripts/benchmarks/bench_transaction_indexes.py``.
+"""
+from migrations.helpers import create_index_concurrently, drop_index_concurrently
+
+# revision identifiers
+revision = "0014"
+down_revision = "0013"
+branch_labels = None
+depends_on = None
+
+
+REDUNDANT_INDEXES = {
+    "idx_transactions_sender_name_trigram": dict(
+        columns="sender_name gin_trgm_ops", using="gin"
+    ),
+    "idx_transactions_address_trigram": dict(columns="address gin_trgm_ops", using="gin"),
+    "idx_transactions_type_status": dict(columns="type, status"),
+    "idx_transactions_sender_name": dict(columns="sender_name", where="type = 'cash'"),
+    "idx_transactions_location": dict(columns="location jsonb_path_ops", using="gin"),
+    "idx_transactions_gift_details": dict(
+        columns="gift_details jsonb_path_ops", using="gin"
+    ),
+}
+
+
+def upgrade() -> None:
+    for name in REDUNDANT_INDEXES:
+        drop_index_concurrently(name, "transactions")
+
+
+def downgrade() -> None:
+    for name, definition in REDUNDANT_INDEXES.items():
+        create_index_concurrently(name, "transactions", **definition)
@@ -0,0 +1,120 @@
+# migrations/versions/0015_add_completed_covering_indexes.py
+"""add covering partial indexes for completed shagun listings
+
+Revision ID: 0015
+Revises: 0014
+Create Date: 2026-10-19
+
+Event listings, search and history only read completed rows, newest first.
+Partial indexes on ``status = 'completed'`` carrying the listed columns let
+those pages be served by index-only scans. The plain indexes they supersede
+are dropped. The plan of the event listing query is logged before and after.
+"""
+import json
+import logging
+from collections import Counter
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import create_index_concurrently, drop_index_concurrently
+
+# revision identifiers
+revision = "0015"
+down_revision = "0014"
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+COMPLETED = "status = 'completed'"
+
+COVERING_INDEXES = {
+    "idx_transactions_completed_event_type": dict(
+        columns="event_id, type, created_at DESC",
+        include="id, sender_name, address, amount, location",
+        where=COMPLETED,
+    ),
+    "idx_transactions_completed_event": dict(
+        columns="event_id, created_at DESC",
+        include="id, sender_name, address, amount, type, location",
+        where=COMPLETED,
+    ),
+    "idx_transactions_completed_sender": dict(
+        columns="sender_id, created_at DESC",
+        include="id, event_id, sender_name, address, amount, type",
+        where=COMPLETED,
+    ),
+    "idx_transactions_completed_receiver": dict(
+        columns="receiver_id, created_at DESC",
+        include="id, event_id, sender_id, sender_name, address, amount, type",
+        where=COMPLETED,
+    ),
+}
+
+SUPERSEDED_INDEXES = {
+    "idx_transactions_event_type_created": dict(columns="event_id, type, created_at"),
+    "idx_transactions_sender": dict(columns="sender_id, created_at"),
+    "idx_transactions_receiver": dict(columns="receiver_id, created_at"),
+}
+
+LISTING_QUERY = """
+    SELECT t.id, t.sender_name, t.address, t.amount, t.type, t.created_at, t.location
+    FROM transactions t
+    WHERE t.event_id = :event_id
+    AND t.type = 'cash'
+    AND t.status = 'completed'
+    ORDER BY t.created_at DESC
+    LIMIT 10
+"""
+
+
+def _plan_nodes(event_id) -> str:
+    plan = (
+        op.get_bind()
+        .execute(
+            sa.text(f"EXPLAIN (FORMAT JSON) {LISTING_QUERY}"), {"event_id": event_id}
+        )
+        .scalar()
+    )
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    # One entry per node type; partitions repeat the same scan many times
+    nodes = Counter()
+
+    def walk(node):
+        nodes[node["Node Type"]] += 1
+        for child in node.get("Plans", []):
+            walk(child)
+
+    walk(plan[0]["Plan"])
+    return ", ".join(f"{name} x{count}" for name, count in nodes.items())
+
+
+def upgrade() -> None:
+    event_id = (
+        op.get_bind()
+        .execute(
+            sa.text("SELECT event_id FROM transactions WHERE status = 'completed' LIMIT 1")
+        )
+        .scalar()
+    )
+    if event_id:
+        logger.info(f"Listing plan before: {_plan_nodes(event_id)}")
+
+    for name, definition in COVERING_INDEXES.items():
+        create_index_concurrently(name, "transactions", **definition)
+    for name in SUPERSEDED_INDEXES:
+        drop_index_concurrently(name, "transactions")
+
+    if event_id:
+        op.execute("ANALYZE transactions")
+        logger.info(f"Listing plan after: {_plan_nodes(event_id)}")
+
+
+def downgrade() -> None:
+    for name, definition in SUPERSEDED_INDEXES.items():
+        create_index_concurrently(name, "transactions", **definition)
+    for name in COVERING_INDEXES:
+        drop_index_concurrently(name, "transactions")
@@ -0,0 +1,51 @@
+# migrations/versions/0016_create_outbox.py
+"""create outbox table
+
+Revision ID: 0016
+Revises: 0015
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+
+# revision identifiers
+revision = "0016"
+down_revision = "0015"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "outbox",
+        sa.Column("id", sa.BigInteger, sa.Identity(), nullable=False),
+        sa.Column("topic", sa.String(50), nullable=False),
+        sa.Column("aggregate_id", UUID(), nullable=False),
+        sa.Column("payload", JSONB, nullable=False),
+        sa.Column("attempts", sa.Integer, server_default="0", nullable=False),
+        sa.Column("last_error", sa.Text),
+        sa.Column(
+            "created_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("NOW()")
+        ),
+        sa.Column("published_at", sa.TIMESTAMP(timezone=True)),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+    # The relay only ever scans unpublished rows in id order
+    op.create_index(
+        "idx_outbox_pending",
+        "outbox",
+        ["id"],
+        postgresql_where=sa.text("published_at IS NULL"),
+    )
+    op.create_index(
+        "idx_outbox_published",
+        "outbox",
+        ["published_at"],
+        postgresql_where=sa.text("published_at IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("outbox")
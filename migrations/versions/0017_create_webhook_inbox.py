@@ -0,0 +1,53 @@
+# migrations/versions/0017_create_webhook_inbox.py
+"""create webhook inbox table
+
+Revision ID: 0017
+Revises: 0016
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import BYTEA, JSONB
+
+# revision identifiers
+revision = "0017"
+down_revision = "0016"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "webhook_inbox",
+        sa.Column("id", sa.BigInteger, sa.Identity(), nullable=False),
+        sa.Column("source", sa.String(20), server_default="razorpay", nullable=False),
+        sa.Column("event_id", sa.String(100)),
+        sa.Column("signature", sa.String(128), nullable=False),
+        sa.Column("body", BYTEA, nullable=False),
+        sa.Column("attempts", sa.Integer, server_default="0", nullable=False),
+        sa.Column("last_error", sa.Text),
+        sa.Column("result", JSONB),
+        sa.Column(
+            "received_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("NOW()")
+        ),
+        sa.Column("processed_at", sa.TIMESTAMP(timezone=True)),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+    # The drainer only ever scans unprocessed rows in arrival order
+    op.create_index(
+        "idx_webhook_inbox_pending",
+        "webhook_inbox",
+        ["id"],
+        postgresql_where=sa.text("processed_at IS NULL"),
+    )
+    op.create_index(
+        "idx_webhook_inbox_processed",
+        "webhook_inbox",
+        ["processed_at"],
+        postgresql_where=sa.text("processed_at IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("webhook_inbox")
@@ -0,0 +1,44 @@
+# migrations/versions/0018_unique_webhook_event_id.py
+"""make webhook inbox event ids unique
+
+Revision ID: 0018
+Revises: 0017
+Create Date: 2026-10-19
+
+Backs the Redis ``SET NX`` dedupe of Razorpay webhooks with a unique key, so
+a replay that slips past Redis is still stored at most once.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = "0018"
+down_revision = "0017"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Keep the first copy of any event already stored twice
+    op.execute(
+        """
+        UPDATE webhook_inbox w
+        SET event_id = NULL
+        WHERE event_id IS NOT NULL
+        AND EXISTS (
+            SELECT 1 FROM webhook_inbox d
+            WHERE d.event_id = w.event_id AND d.id < w.id
+        )
+        """
+    )
+    op.create_index(
+        "idx_webhook_inbox_event_id",
+        "webhook_inbox",
+        ["event_id"],
+        unique=True,
+        postgresql_where=sa.text("event_id IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_webhook_inbox_event_id", table_name="webhook_inbox")
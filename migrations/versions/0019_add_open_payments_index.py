@@ -0,0 +1,30 @@
+# migrations/versions/0019_add_open_payments_index.py
+"""index open payments for reconciliation
+
+Revision ID: 0019
+Revises: 0018
+Create Date: 2026-10-19
+
+The reconciler scans initiated/processing payments oldest first. Almost all
+payments are settled, so a partial index keeps that scan small.
+"""
+from migrations.helpers import create_index_concurrently, drop_index_concurrently
+
+# revision identifiers
+revision = "0019"
+down_revision = "0018"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    create_index_concurrently(
+        "idx_payments_open",
+        "payments",
+        columns="created_at",
+        where="status IN ('initiated', 'processing')",
+    )
+
+
+def downgrade() -> None:
+    drop_index_concurrently("idx_payments_open", "payments")
@@ -0,0 +1,167 @@
+# migrations/versions/0020_create_payment_gateway_events.py
+"""move gateway payloads to payment_gateway_events
+
+Revision ID: 0020
+Revises: 0019
+Create Date: 2026-10-19
+
+Raw gateway payloads move off the payments row into an append-only table,
+stored as zlib-compressed JSON: the payloads are a few KB at most, below the
+size at which TOAST would compress them itself. ``payments.metadata`` only
+ever held a copy of the order response and ``gateway_response`` the latest
+webhook, so each becomes one event. Both columns are dropped from
+``payments`` and ``payments_archive``, which the archiver fills with
+``SELECT *`` and so must keep the same column list.
+
+There is no foreign key to payments, so the audit trail outlives archiving.
+"""
+import json
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import BYTEA, JSONB, UUID
+
+# revision identifiers
+revision = "0020"
+down_revision = "0019"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+def _encode(value) -> bytes:
+    return zlib.compress(json.dumps(value, separators=(",", ":")).encode())
+
+
+def upgrade() -> None:
+    op.create_table(
+        "payment_gateway_events",
+        sa.Column("id", sa.BigInteger, sa.Identity(), nullable=False),
+        sa.Column("payment_id", UUID(), nullable=False),
+        sa.Column("event", sa.String(50), nullable=False),
+        sa.Column("payload", BYTEA, nullable=False),
+        sa.Column(
+            "created_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("NOW()")
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "idx_payment_gateway_events_payment",
+        "payment_gateway_events",
+        ["payment_id", "id"],
+    )
+
+    # Compressed in Python, batch by batch in payment id order
+    connection = op.get_bind()
+    last_id = None
+    while True:
+        rows = connection.execute(
+            sa.text(
+                """
+                SELECT id, metadata, gateway_response, created_at, updated_at
+                FROM (
+                    SELECT id, metadata, gateway_response, created_at, updated_at
+                    FROM payments
+                    UNION ALL
+                    SELECT id, metadata, gateway_response, created_at, updated_at
+                    FROM payments_archive
+                ) p
+                WHERE (CAST(:last_id AS uuid) IS NULL OR id > CAST(:last_id AS uuid))
+                ORDER BY id
+                LIMIT :limit
+                """
+            ),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).fetchall()
+        if not rows:
+            break
+
+        events = []
+        for row in rows:
+            if row.metadata is not None:
+                events.append(
+                    {
+                        "payment_id": row.id,
+                        "event": "order.created",
+                        "payload": _encode(row.metadata),
+                        "created_at": row.created_at,
+                    }
+                )
+            if row.gateway_response is not None and row.gateway_response != row.metadata:
+                events.append(
+                    {
+                        "payment_id": row.id,
+                        "event": "gateway.response",
+                        "payload": _encode(row.gateway_response),
+                        "created_at": row.updated_at,
+                    }
+                )
+        if events:
+            connection.execute(
+                sa.text(
+                    """
+                    INSERT INTO payment_gateway_events
+                        (payment_id, event, payload, created_at)
+                    VALUES (:payment_id, :event, :payload, :created_at)
+                    """
+                ),
+                events,
+            )
+        last_id = str(rows[-1].id)
+
+    for table in ("payments", "payments_archive"):
+        op.drop_column(table, "gateway_response")
+        op.drop_column(table, "metadata")
+
+
+def downgrade() -> None:
+    # Appended in the same order to both tables, so SELECT * still lines up
+    for table in ("payments", "payments_archive"):
+        op.add_column(table, sa.Column("gateway_response", JSONB))
+        op.add_column(table, sa.Column("metadata", JSONB))
+
+    connection = op.get_bind()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.text(
+                """
+                SELECT id, payment_id, event, payload
+                FROM payment_gateway_events
+                WHERE id > :last_id
+                ORDER BY id
+                LIMIT :limit
+                """
+            ),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).fetchall()
+        if not rows:
+            break
+
+        # Later events overwrite earlier ones, as the old webhook handler did
+        for table in ("payments", "payments_archive"):
+            connection.execute(
+                sa.text(
+                    f"""
+                    UPDATE {table}
+                    SET gateway_response = CAST(:payload AS jsonb),
+                        metadata = CASE WHEN :event = 'order.created'
+                                   THEN CAST(:payload AS jsonb)
+                                   ELSE metadata END
+                    WHERE id = :payment_id
+                    """
+                ),
+                [
+                    {
+                        "payment_id": row.payment_id,
+                        "event": row.event,
+                        "payload": zlib.decompress(row.payload).decode(),
+                    }
+                    for row in rows
+                ],
+            )
+        last_id = rows[-1].id
+
+    op.drop_table("payment_gateway_events")
@@ -0,0 +1,90 @@
+# migrations/versions/0021_create_qr_images.py
+"""move event QR codes to content-addressed qr_images
+
+Revision ID: 0021
+Revises: 0020
+Create Date: 2026-10-19
+
+``events.qr_code`` held each QR as a base64 data URI, so every ``SELECT e.*``
+dragged tens of KB per event along. The PNG bytes move to ``qr_images``,
+keyed by their SHA-256, and events keep only the hash. PNGs are already
+compressed, so the content column skips TOAST compression.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import BYTEA
+
+# revision identifiers
+revision = "0021"
+down_revision = "0020"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "qr_images",
+        sa.Column("sha256", sa.String(64), nullable=False),
+        sa.Column("content", BYTEA, nullable=False),
+        sa.Column(
+            "content_type", sa.String(50), server_default="image/png", nullable=False
+        ),
+        sa.Column(
+            "created_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("NOW()")
+        ),
+        sa.PrimaryKeyConstraint("sha256"),
+    )
+    op.execute("ALTER TABLE qr_images ALTER COLUMN content SET STORAGE EXTERNAL")
+    op.add_column(
+        "events",
+        sa.Column(
+            "qr_sha256",
+            sa.String(64),
+            sa.ForeignKey("qr_images.sha256", ondelete="SET NULL"),
+        ),
+    )
+    # Lets an unreferenced image be found and deleted without a scan
+    op.create_index(
+        "idx_events_qr_sha256",
+        "events",
+        ["qr_sha256"],
+        postgresql_where=sa.text("qr_sha256 IS NOT NULL"),
+    )
+
+    op.execute(
+        """
+        WITH decoded AS (
+            SELECT id, decode(substring(qr_code FROM 'base64,(.*)$'), 'base64') AS content
+            FROM events
+            WHERE qr_code LIKE 'data:image/png;base64,%'
+        ), hashed AS (
+            SELECT id, content, encode(sha256(content), 'hex') AS sha256
+            FROM decoded
+        ), images AS (
+            INSERT INTO qr_images (sha256, content)
+            SELECT DISTINCT ON (sha256) sha256, content FROM hashed
+            ON CONFLICT (sha256) DO NOTHING
+        )
+        UPDATE events e
+        SET qr_sha256 = h.sha256
+        FROM hashed h
+        WHERE e.id = h.id
+        """
+    )
+    op.drop_column("events", "qr_code")
+
+
+def downgrade() -> None:
+    op.add_column("events", sa.Column("qr_code", sa.Text))
+    op.execute(
+        """
+        UPDATE events e
+        SET qr_code = 'data:image/png;base64,'
+            || translate(encode(q.content, 'base64'), E'\\n', '')
+        FROM qr_images q
+        WHERE q.sha256 = e.qr_sha256
+        """
+    )
+    op.drop_index("idx_events_qr_sha256", table_name="events")
+    op.drop_column("events", "qr_sha256")
+    op.drop_table("qr_images")
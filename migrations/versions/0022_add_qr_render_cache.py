@@ -0,0 +1,54 @@
+# migrations/versions/0022_add_qr_render_cache.py
+"""key qr_images by render inputs so it doubles as the render cache
+
+Revision ID: 0022
+Revises: 0021
+Create Date: 2026-10-19
+
+Every render (PNG at any size, SVG, PDF) is stored in ``qr_images`` once,
+under the SHA-256 of its bytes, and found again by ``render_key``: a hash
+of payload, format, size, logo version and renderer version. Rows from
+0021 have no key yet and pick one up the next time they are rendered.
+Renders no event points at are evicted once ``last_used_at`` is old.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = "0022"
+down_revision = "0021"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("qr_images", sa.Column("render_key", sa.String(64)))
+    op.add_column(
+        "qr_images",
+        sa.Column("format", sa.String(10), server_default="png", nullable=False),
+    )
+    op.add_column("qr_images", sa.Column("size", sa.Integer))
+    op.add_column(
+        "qr_images",
+        sa.Column(
+            "last_used_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("NOW()"),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        "idx_qr_images_render_key", "qr_images", ["render_key"], unique=True
+    )
+    op.create_index("idx_qr_images_last_used", "qr_images", ["last_used_at"])
+
+
+def downgrade() -> None:
+    # Renders in other formats have no place in the 0021 table
+    op.execute("DELETE FROM qr_images WHERE format <> 'png' OR size IS NOT NULL")
+    op.drop_index("idx_qr_images_last_used", table_name="qr_images")
+    op.drop_index("idx_qr_images_render_key", table_name="qr_images")
+    op.drop_column("qr_images", "last_used_at")
+    op.drop_column("qr_images", "size")
+    op.drop_column("qr_images", "format")
+    op.drop_column("qr_images", "render_key")
@@ -0,0 +1,68 @@
+# migrations/versions/0023_normalize_shagun_ids.py
+"""store shagun_ids upper case so lookups can use the unique index
+
+Revision ID: 0023
+Revises: 0022
+Create Date: 2026-10-19
+
+Lookups used ``LOWER(shagun_id) = LOWER($1)``, which no index serves, so
+every QR scan read all of ``events``. IDs are now stored trimmed and upper
+case, enforced by a check constraint, and looked up by plain equality on
+``idx_events_shagun_id``.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = "0023"
+down_revision = "0022"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    collisions = (
+        op.get_bind()
+        .execute(
+            sa.text(
+                """
+                SELECT UPPER(BTRIM(shagun_id))
+                FROM events
+                WHERE shagun_id IS NOT NULL
+                GROUP BY 1
+                HAVING COUNT(*) > 1
+                """
+            )
+        )
+        .scalars()
+        .all()
+    )
+    if collisions:
+        raise RuntimeError(
+            f"shagun_ids differing only in case or spacing: {', '.join(collisions)}"
+        )
+
+    op.execute(
+        """
+        UPDATE events
+        SET shagun_id = UPPER(BTRIM(shagun_id))
+        WHERE shagun_id <> UPPER(BTRIM(shagun_id))
+        """
+    )
+    op.execute(
+        """
+        ALTER TABLE events
+        ADD CONSTRAINT ck_events_shagun_id_normalized
+        CHECK (shagun_id = UPPER(BTRIM(shagun_id))) NOT VALID
+        """
+    )
+    # ADD CONSTRAINT's exclusive lock lasts until commit, so validate in a
+    # transaction of its own, whose lock lets reads and writes through
+    with op.get_context().autocommit_block():
+        op.execute(
+            "ALTER TABLE events VALIDATE CONSTRAINT ck_events_shagun_id_normalized"
+        )
+
+
+def downgrade() -> None:
+    op.drop_constraint("ck_events_shagun_id_normalized", "events", type_="check")
@@ -0,0 +1,51 @@
+# migrations/versions/0024_add_event_listing_counters.py
+"""store each event's shagun count and index a creator's events by date
+
+Revision ID: 0024
+Revises: 0023
+Create Date: 2026-10-19
+
+``transaction_count`` sits next to the stored amount totals and is kept
+up to date by the same writes, so event details no longer aggregate over
+``transactions``. The listing pages through a creator's events by
+``(event_date, id)``, which the new index serves in either direction.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import create_index_concurrently, drop_index_concurrently
+
+# revision identifiers
+revision = "0024"
+down_revision = "0023"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "events",
+        sa.Column("transaction_count", sa.Integer, server_default="0", nullable=False),
+    )
+    # Completed shaguns, archived or not, like total_amount
+    op.execute(
+        """
+        UPDATE events e
+        SET transaction_count = t.count
+        FROM (
+            SELECT event_id, COUNT(*) AS count
+            FROM transactions_all
+            WHERE status = 'completed'
+            GROUP BY event_id
+        ) t
+        WHERE e.id = t.event_id
+        """
+    )
+    create_index_concurrently(
+        "idx_events_creator_date", "events", columns="creator_id, event_date, id"
+    )
+
+
+def downgrade() -> None:
+    drop_index_concurrently("idx_events_creator_date", "events")
+    op.drop_column("events", "transaction_count")
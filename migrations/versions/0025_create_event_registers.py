@@ -0,0 +1,61 @@
+# migrations/versions/0025_create_event_registers.py
+"""create event_registers for generated PDF shagun registers
+
+Revision ID: 0025
+Revises: 0024
+Create Date: 2026-10-19
+
+A register is requested, rendered by a background job and kept per event
+and version. The version is the event's ``transaction_count``; completed
+shaguns only ever accrue, so an unchanged count means an unchanged
+register. Older versions are deleted once a newer one is ready.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import BYTEA, UUID
+
+# revision identifiers
+revision = "0025"
+down_revision = "0024"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "event_registers",
+        sa.Column("id", sa.BigInteger, sa.Identity(), primary_key=True),
+        sa.Column(
+            "event_id",
+            UUID,
+            sa.ForeignKey("events.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("version", sa.Integer, nullable=False),
+        sa.Column(
+            "status", sa.String(20), server_default="pending", nullable=False
+        ),  # pending, rendering, ready, failed
+        sa.Column("content", BYTEA),
+        sa.Column("pages", sa.Integer),
+        sa.Column("attempts", sa.Integer, server_default="0", nullable=False),
+        sa.Column("last_error", sa.Text),
+        sa.Column(
+            "created_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("NOW()")
+        ),
+        sa.Column("started_at", sa.TIMESTAMP(timezone=True)),
+        sa.Column("completed_at", sa.TIMESTAMP(timezone=True)),
+        sa.UniqueConstraint("event_id", "version", name="uq_event_registers_version"),
+    )
+    # Already Flate-compressed
+    op.execute("ALTER TABLE event_registers ALTER COLUMN content SET STORAGE EXTERNAL")
+    # The render job's queue
+    op.create_index(
+        "idx_event_registers_queue",
+        "event_registers",
+        ["id"],
+        postgresql_where=sa.text("status IN ('pending', 'rendering')"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("event_registers")
@@ -0,0 +1,136 @@
+# migrations/versions/0026_create_event_analytics.py
+"""create per-event analytics rollups by hour, village and amount band
+
+Revision ID: 0026
+Revises: 0025
+Create Date: 2026-10-19
+
+Each completed shagun adds one to a row in each rollup, applied by an
+outbox consumer. The outbox delivers at least once, so the consumer first
+records the transaction in ``event_analytics_applied`` and skips it if it
+was already there. Villages and bands are derived by SQL functions so the
+consumer and this backfill cannot disagree.
+
+The backfill counts every completed shagun, archived or not. Shaguns whose
+outbox rows are still unpublished are marked applied in the same pass, and
+``outbox`` is share-locked meanwhile so no shagun lands between the two.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+# revision identifiers
+revision = "0026"
+down_revision = "0025"
+branch_labels = None
+depends_on = None
+
+# Must match ANALYTICS_TIMEZONE in settings
+TIMEZONE = "Asia/Kolkata"
+
+# First line of the address, tidied so spellings of one village group together
+VILLAGE_FUNCTION = r"""
+    CREATE OR REPLACE FUNCTION shagun_village(address text)
+    RETURNS text AS $$
+        SELECT COALESCE(
+            initcap(btrim(
+                regexp_replace(split_part(address, ',', 1), '\s+', ' ', 'g')
+            )),
+            ''
+        )
+    $$ LANGUAGE sql IMMUTABLE
+"""
+# Lower bound of the amount's band, at the usual shagun amounts
+AMOUNT_BAND_FUNCTION = """
+    CREATE OR REPLACE FUNCTION shagun_amount_band(amount numeric)
+    RETURNS numeric AS $$
+        SELECT bounds[GREATEST(width_bucket(amount, bounds), 1)]
+        FROM (SELECT '{0,101,251,501,1001,2101,5001,11001}'::numeric[] AS bounds) b
+    $$ LANGUAGE sql IMMUTABLE
+"""
+
+# Rollup table: the key each shagun is counted under, and how it is derived
+ROLLUPS = {
+    "event_hourly_stats": (
+        "hour",
+        sa.TIMESTAMP(timezone=True),
+        f"date_trunc('hour', t.created_at, '{TIMEZONE}')",
+    ),
+    "event_village_stats": (
+        "village",  # '' when not given
+        sa.String(200),
+        "shagun_village(t.address)",
+    ),
+    "event_amount_band_stats": (
+        "band_min",
+        sa.Numeric(20, 2),
+        "shagun_amount_band(t.amount)",
+    ),
+}
+
+
+def upgrade() -> None:
+    op.execute(VILLAGE_FUNCTION)
+    op.execute(AMOUNT_BAND_FUNCTION)
+
+    for table, (key, key_type, _) in ROLLUPS.items():
+        op.create_table(
+            table,
+            sa.Column(
+                "event_id",
+                UUID,
+                sa.ForeignKey("events.id", ondelete="CASCADE"),
+                nullable=False,
+            ),
+            sa.Column(key, key_type, nullable=False),
+            sa.Column("shaguns", sa.Integer, server_default="0", nullable=False),
+            sa.Column(
+                "amount", sa.Numeric(20, 2), server_default="0", nullable=False
+            ),
+            sa.PrimaryKeyConstraint("event_id", key),
+        )
+
+    op.create_table(
+        "event_analytics_applied",
+        sa.Column("transaction_id", UUID, primary_key=True),
+        sa.Column(
+            "applied_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("NOW()"),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        "idx_event_analytics_applied_at", "event_analytics_applied", ["applied_at"]
+    )
+
+    # Completions write their outbox row in the same transaction
+    op.execute("LOCK TABLE outbox IN SHARE MODE")
+    for table, (key, _, expression) in ROLLUPS.items():
+        op.execute(
+            f"""
+            INSERT INTO {table} (event_id, {key}, shaguns, amount)
+            SELECT t.event_id, {expression}, COUNT(*), SUM(t.amount)
+            FROM transactions_all t
+            INNER JOIN events e ON e.id = t.event_id
+            WHERE t.status = 'completed'
+            GROUP BY 1, 2
+            """
+        )
+    op.execute(
+        """
+        INSERT INTO event_analytics_applied (transaction_id)
+        SELECT DISTINCT aggregate_id
+        FROM outbox
+        WHERE topic = 'shagun.completed'
+        AND published_at IS NULL
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("event_analytics_applied")
+    for table in ROLLUPS:
+        op.drop_table(table)
+    op.execute("DROP FUNCTION IF EXISTS shagun_amount_band(numeric)")
+    op.execute("DROP FUNCTION IF EXISTS shagun_village(text)")
@@ -0,0 +1,42 @@
+# migrations/versions/0027_add_payment_reconcile_tracking.py
+"""track when each open payment was last reconciled
+
+Revision ID: 0027
+Revises: 0026
+Create Date: 2026-10-19
+
+The reconciler took the oldest open payments first, so a batch of orders
+the gateway kept failing to return was picked again every run and newer
+payments behind it never got a turn. It now takes those reconciled
+longest ago first, and counts consecutive lookups the gateway rejected so
+an order it cannot return is expired like an unattempted one.
+
+Added to ``payments_archive`` as well, which the archiver fills with
+``SELECT *``.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = "0027"
+down_revision = "0026"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Same order on both tables, so SELECT * still lines up
+    for table in ("payments", "payments_archive"):
+        op.add_column(table, sa.Column("reconciled_at", sa.TIMESTAMP(timezone=True)))
+        op.add_column(
+            table,
+            sa.Column(
+                "reconcile_failures", sa.Integer, server_default="0", nullable=False
+            ),
+        )
+
+
+def downgrade() -> None:
+    for table in ("payments", "payments_archive"):
+        op.drop_column(table, "reconcile_failures")
+        op.drop_column(table, "reconciled_at")
@@ -0,0 +1,109 @@
+# migrations/versions/0028_move_default_rows_into_new_partitions.py
+"""move default-partition rows into a month's partition when creating it
+
+Revision ID: 0028
+Revises: 0027
+Create Date: 2026-10-19
+
+``create_transactions_partition`` failed once ``transactions_default`` held
+rows for the month being created (inserted while the maintenance job was
+behind), since Postgres refuses a partition whose range the default already
+has rows in. It now detaches the default, creates the partition, moves those
+rows into it and attaches the default again, all in the caller's
+transaction. Months the default has no rows for are created as before,
+without the detach.
+"""
+from alembic import op
+
+# revision identifiers
+revision = "0028"
+down_revision = "0027"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION create_transactions_partition(month_start date)
+        RETURNS boolean AS $$
+        DECLARE
+            start_date date := date_trunc('month', month_start)::date;
+            partition_name text := format(
+                'transactions_y%sm%s',
+                to_char(start_date, 'YYYY'),
+                to_char(start_date, 'MM')
+            );
+            lower_bound timestamptz := start_date::timestamp AT TIME ZONE 'UTC';
+            upper_bound timestamptz :=
+                (start_date + INTERVAL '1 month')::timestamp AT TIME ZONE 'UTC';
+            stranded boolean;
+        BEGIN
+            IF to_regclass(partition_name) IS NOT NULL THEN
+                RETURN false;
+            END IF;
+
+            SELECT EXISTS (
+                SELECT 1 FROM transactions_default
+                WHERE created_at >= lower_bound AND created_at < upper_bound
+            ) INTO stranded;
+
+            IF stranded THEN
+                ALTER TABLE transactions DETACH PARTITION transactions_default;
+            END IF;
+
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF transactions FOR VALUES FROM (%L) TO (%L)',
+                partition_name,
+                lower_bound,
+                upper_bound
+            );
+
+            IF stranded THEN
+                EXECUTE format(
+                    'INSERT INTO %I SELECT * FROM transactions_default
+                     WHERE created_at >= %L AND created_at < %L',
+                    partition_name,
+                    lower_bound,
+                    upper_bound
+                );
+                DELETE FROM transactions_default
+                WHERE created_at >= lower_bound AND created_at < upper_bound;
+                ALTER TABLE transactions
+                    ATTACH PARTITION transactions_default DEFAULT;
+            END IF;
+            RETURN true;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION create_transactions_partition(month_start date)
+        RETURNS boolean AS $$
+        DECLARE
+            start_date date := date_trunc('month', month_start)::date;
+            partition_name text := format(
+                'transactions_y%sm%s',
+                to_char(start_date, 'YYYY'),
+                to_char(start_date, 'MM')
+            );
+        BEGIN
+            IF to_regclass(partition_name) IS NOT NULL THEN
+                RETURN false;
+            END IF;
+
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF transactions FOR VALUES FROM (%L) TO (%L)',
+                partition_name,
+                start_date::timestamp AT TIME ZONE 'UTC',
+                (start_date + INTERVAL '1 month')::timestamp AT TIME ZONE 'UTC'
+            );
+            RETURN true;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
@@ -0,0 +1,143 @@
+# scripts/benchmarks/bench_gateway_event_loop.py
+"""Event loop latency while Razorpay order creation is in flight.
+
+Serves a stub Razorpay ``POST /orders`` with a fixed latency on localhost and
+creates orders against it two ways: with a blocking HTTP call inside the
+coroutine, as the old ``razorpay.Client`` gateway did, and with the async
+``RazorpayGateway``. Meanwhile a probe coroutine stands in for the other
+requests on the worker, sleeping in short ticks and recording how late each
+tick resumes.
+
+Usage (from the repo root, with the app's .env available):
+    python scripts/benchmarks/bench_gateway_event_loop.py --calls 50 --latency 0.2
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+import httpx
+import uvicorn
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.core.config.app import settings  # noqa: E402
+from src.services.payment.gateway.razorpay import RazorpayGateway  # noqa: E402
+
+PROBE_INTERVAL = 0.005
+
+
+def stub_app(latency: float):
+    async def app(scope, receive, send):
+        if scope["type"] != "http":
+            return
+        await asyncio.sleep(latency)
+        body = json.dumps(
+            {"id": f"order_{time.monotonic_ns():x}", "status": "created"}
+        ).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"application/json")],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+    return app
+
+
+def start_stub(port: int, latency: float) -> uvicorn.Server:
+    server = uvicorn.Server(
+        uvicorn.Config(stub_app(latency), port=port, log_level="warning")
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+async def probe(lags: list, stop: asyncio.Event):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(time.perf_counter() - started - PROBE_INTERVAL)
+
+
+async def run_variant(label: str, create, args) -> tuple:
+    lags, stop = [], asyncio.Event()
+    probe_task = asyncio.create_task(probe(lags, stop))
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def one(i):
+        async with semaphore:
+            await create(i)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(args.calls)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe_task
+
+    lags.sort()
+    return (
+        label,
+        args.calls / elapsed,
+        statistics.median(lags) * 1000,
+        lags[int(len(lags) * 0.99) - 1] * 1000,
+        lags[-1] * 1000,
+    )
+
+
+async def main(args):
+    base_url = f"http://127.0.0.1:{args.port}/v1"
+    settings.RAZORPAY_BASE_URL = base_url
+    stub = start_stub(args.port, args.latency)
+
+    blocking_client = httpx.Client(base_url=base_url)
+    gateway = RazorpayGateway()
+
+    async def create_blocking(i):
+        # What razorpay.Client did: a synchronous request on the event loop
+        blocking_client.post("/orders", json={"amount": 10100, "receipt": str(i)})
+
+    async def create_async(i):
+        await gateway.create_payment(101.0, str(i), {})
+
+    try:
+        results = [
+            await run_variant("blocking", create_blocking, args),
+            await run_variant("async", create_async, args),
+        ]
+    finally:
+        blocking_client.close()
+        await gateway.close()
+        stub.should_exit = True
+
+    print(
+        f"calls={args.calls} concurrency={args.concurrency} "
+        f"gateway latency={args.latency * 1000:.0f}ms"
+    )
+    print(
+        f"{'variant':<9} {'orders/s':>9} {'lag p50 ms':>11} "
+        f"{'lag p99 ms':>11} {'lag max ms':>11}"
+    )
+    for label, throughput, p50, p99, worst in results:
+        print(
+            f"{label:<9} {throughput:>9.1f} {p50:>11.1f} {p99:>11.1f} {worst:>11.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument(
+        "--latency", type=float, default=0.2, help="Stub gateway latency in seconds"
+    )
+    parser.add_argument("--port", type=int, default=8765)
+    asyncio.run(main(parser.parse_args()))
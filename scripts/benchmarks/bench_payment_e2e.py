@@ -0,0 +1,145 @@
+# scripts/benchmarks/bench_payment_e2e.py
+"""End-to-end online shagun throughput against the local Razorpay stub.
+
+Each payment goes through the same calls a guest's phone makes: send shagun
+(creates the transaction and gateway order), checkout on the stub (which
+also fires the signed webhooks at the app), verify, then a long-poll on the
+payment events endpoint until the status is final.
+
+Usage (stub, then app pointed at it, then this script):
+    python scripts/razorpay_stub.py --port 9100 --latency 0.1 \\
+        --webhook-url http://localhost:8000/api/v1/webhooks/razorpay
+    RAZORPAY_BASE_URL=http://localhost:9100/v1 uvicorn main:app --port 8000
+    python scripts/benchmarks/bench_payment_e2e.py \\
+        --user-id <guest uuid> --event-id <event uuid> --payments 500
+
+The app's rate limiter counts per client IP, so raise its default limit or
+spread runs when sending more than a hundred payments a minute. Tokens are
+minted with the app's SECRET_KEY, so run it with the app's .env available.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.core.security.jwt import jwt_handler  # noqa: E402
+
+FINAL_STATUSES = ("completed", "failed")
+
+
+async def pay(client, stub, args, index, timings, outcomes):
+    steps = {}
+
+    started = time.perf_counter()
+    response = await client.post(
+        "/api/v1/transactions/send",
+        json={
+            "event_id": args.event_id,
+            "amount": args.amount,
+            "payment_method": "upi",
+            "sender_name": f"Bench Guest {index}",
+            "address": "Bench Village",
+        },
+    )
+    steps["send"] = time.perf_counter() - started
+    if response.status_code != 200:
+        outcomes[f"send_{response.status_code}"] += 1
+        return
+    payment = response.json()["payment"]
+
+    step = time.perf_counter()
+    outcome = "failed" if index % 100 < args.fail_percent else "captured"
+    response = await stub.post(
+        f"/stub/orders/{payment['gateway_payment_id']}/checkout",
+        json={"outcome": outcome},
+    )
+    steps["checkout"] = time.perf_counter() - step
+
+    if outcome == "captured":
+        step = time.perf_counter()
+        response = await client.post("/api/v1/payments/verify", json=response.json())
+        steps["verify"] = time.perf_counter() - step
+        if response.status_code != 200:
+            outcomes[f"verify_{response.status_code}"] += 1
+            return
+
+    # Failed checkouts only reach the app through the webhook
+    step = time.perf_counter()
+    status = None
+    while status not in FINAL_STATUSES:
+        response = await client.get(
+            f"/api/v1/payments/{payment['id']}/events",
+            params={"timeout": 25, **({"since": status} if status else {})},
+        )
+        status = response.json()["status"]
+    steps["settle"] = time.perf_counter() - step
+    steps["total"] = time.perf_counter() - started
+
+    outcomes[status] += 1
+    for name, elapsed in steps.items():
+        timings[name].append(elapsed)
+
+
+async def main(args):
+    token = jwt_handler.create_access_token({"user_id": args.user_id})
+    timings, outcomes = defaultdict(list), Counter()
+    semaphore = asyncio.Semaphore(args.concurrency)
+    limits = httpx.Limits(max_connections=args.concurrency)
+
+    async with httpx.AsyncClient(
+        base_url=args.api_url,
+        headers={"Authorization": f"Bearer {token}"},
+        timeout=60,
+        limits=limits,
+    ) as client, httpx.AsyncClient(
+        base_url=args.stub_url, timeout=60, limits=limits
+    ) as stub:
+
+        async def run(index):
+            async with semaphore:
+                await pay(client, stub, args, index, timings, outcomes)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(run(i) for i in range(args.payments)))
+        elapsed = time.perf_counter() - started
+
+        stats = (await stub.get("/stub/stats")).json()
+
+    print(
+        f"payments={args.payments} concurrency={args.concurrency} "
+        f"elapsed={elapsed:.1f}s throughput={args.payments / elapsed:.1f}/s"
+    )
+    print(f"outcomes={dict(outcomes)}")
+    print(f"stub={stats}")
+    print(f"{'step':<10}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    for name in ("send", "checkout", "verify", "settle", "total"):
+        values = sorted(timings[name])
+        if not values:
+            continue
+        print(
+            f"{name:<10}{statistics.median(values) * 1000:>10.1f}"
+            f"{values[int(len(values) * 0.95) - 1 if len(values) > 1 else 0] * 1000:>10.1f}"
+            f"{values[-1] * 1000:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--api-url", default="http://localhost:8000")
+    parser.add_argument("--stub-url", default="http://localhost:9100")
+    parser.add_argument("--user-id", required=True, help="Guest sending shagun")
+    parser.add_argument("--event-id", required=True)
+    parser.add_argument("--amount", type=float, default=101)
+    parser.add_argument("--payments", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument(
+        "--fail-percent", type=int, default=0, help="Checkouts that fail, 0-100"
+    )
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,303 @@
+# scripts/razorpay_stub.py
+"""Local stand-in for the Razorpay API, for offline load and integration runs.
+
+Implements the calls RazorpayGateway makes (order create, order and payment
+fetch) with configurable latency and error rate, plus a checkout endpoint
+that plays the customer: it creates a payment attempt, returns the signed
+checkout response the frontend would post to ``/payments/verify``, and sends
+signed webhooks to the app like Razorpay does.
+
+Usage:
+    python scripts/razorpay_stub.py --port 9100 --latency 0.15 --error-rate 0.01 \\
+        --webhook-url http://localhost:8000/api/v1/webhooks/razorpay
+
+Then point the app at it in .env:
+    RAZORPAY_BASE_URL=http://localhost:9100/v1
+
+Key id, key secret and webhook secret default to the app's RAZORPAY_* values
+from the environment or .env, so signatures verify on both sides.
+
+Stub-only endpoints:
+    POST /stub/orders/{order_id}/checkout  {"outcome": "captured" | "failed" | "authorized"}
+    GET  /stub/stats
+"""
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import random
+import secrets
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import httpx
+import uvicorn
+from dotenv import load_dotenv
+from fastapi import Depends, FastAPI, Request
+from fastapi.responses import JSONResponse
+from fastapi.security import HTTPBasic, HTTPBasicCredentials
+from pydantic import BaseModel
+
+
+@dataclass
+class StubConfig:
+    key_id: str
+    key_secret: str
+    webhook_secret: str
+    webhook_url: Optional[str] = None
+    latency: float = 0.0  # Seconds added to every API call
+    jitter: float = 0.0  # Up to this many extra seconds, uniformly
+    error_rate: float = 0.0  # Share of API calls answered with a 503
+    webhook_delay: float = 0.5  # Seconds between checkout and webhooks
+    duplicate_rate: float = 0.0  # Share of webhooks delivered twice
+    seed: Optional[int] = None
+
+
+class RazorpayError(Exception):
+    """An API error, answered in Razorpay's {"error": {...}} shape"""
+
+    def __init__(self, status_code: int, code: str, description: str):
+        self.status_code = status_code
+        self.code = code
+        self.description = description
+
+
+class CheckoutRequest(BaseModel):
+    outcome: str = "captured"
+    method: str = "upi"
+
+
+def _id(prefix: str) -> str:
+    return f"{prefix}_{secrets.token_hex(7)}"
+
+
+def create_app(config: StubConfig) -> FastAPI:
+    app = FastAPI(title="Razorpay stub")
+    # Missing credentials are answered by authenticate, in Razorpay's shape
+    security = HTTPBasic(auto_error=False)
+    rng = random.Random(config.seed)
+    orders: Dict[str, Dict] = {}
+    payments: Dict[str, Dict] = {}
+    stats = Counter()
+    webhook_client = httpx.AsyncClient(timeout=10)
+
+    @app.exception_handler(RazorpayError)
+    async def razorpay_error(request: Request, e: RazorpayError):
+        return JSONResponse(
+            status_code=e.status_code,
+            content={
+                "error": {
+                    "code": e.code,
+                    "description": e.description,
+                    "source": "NA",
+                    "step": "NA",
+                    "reason": "NA",
+                    "metadata": {},
+                }
+            },
+        )
+
+    def authenticate(
+        credentials: Optional[HTTPBasicCredentials] = Depends(security),
+    ):
+        if not (
+            credentials
+            and hmac.compare_digest(credentials.username, config.key_id)
+            and hmac.compare_digest(credentials.password, config.key_secret)
+        ):
+            raise RazorpayError(401, "BAD_REQUEST_ERROR", "Authentication failed")
+
+    async def simulate(request: Request):
+        """Latency and injected failures for a gateway API call"""
+        stats[f"{request.method} {request.url.path.split('/')[2]}"] += 1
+        await asyncio.sleep(config.latency + rng.uniform(0, config.jitter))
+        if rng.random() < config.error_rate:
+            stats["injected_errors"] += 1
+            raise RazorpayError(503, "SERVER_ERROR", "Injected stub failure")
+
+    async def send_webhook(event: str, payment: Dict, order: Dict):
+        body = json.dumps(
+            {
+                "entity": "event",
+                "account_id": "acc_stub",
+                "event": event,
+                "contains": ["payment", "order"] if event == "order.paid" else ["payment"],
+                "payload": {
+                    "payment": {"entity": payment},
+                    **({"order": {"entity": order}} if event == "order.paid" else {}),
+                },
+                "created_at": int(time.time()),
+            }
+        ).encode()
+        headers = {
+            "Content-Type": "application/json",
+            "X-Razorpay-Signature": hmac.new(
+                config.webhook_secret.encode(), body, hashlib.sha256
+            ).hexdigest(),
+            "X-Razorpay-Event-Id": _id("evt"),
+        }
+        deliveries = 2 if rng.random() < config.duplicate_rate else 1
+        for _ in range(deliveries):
+            # Razorpay retries deliveries that are not acknowledged with a 2xx
+            for attempt in range(3):
+                try:
+                    response = await webhook_client.post(
+                        config.webhook_url, content=body, headers=headers
+                    )
+                    stats[f"webhook_{response.status_code}"] += 1
+                    if response.status_code < 300:
+                        break
+                except httpx.HTTPError:
+                    stats["webhook_errors"] += 1
+                await asyncio.sleep(0.5 * 2**attempt)
+
+    async def deliver_webhooks(payment: Dict, order: Dict):
+        await asyncio.sleep(config.webhook_delay)
+        if payment["status"] == "failed":
+            events = ["payment.failed"]
+        elif payment["status"] == "authorized":
+            events = ["payment.authorized"]
+        else:
+            events = ["payment.authorized", "payment.captured", "order.paid"]
+        for event in events:
+            await send_webhook(event, payment, order)
+
+    @app.post("/v1/orders", dependencies=[Depends(authenticate), Depends(simulate)])
+    async def create_order(data: Dict):
+        order = {
+            "id": _id("order"),
+            "entity": "order",
+            "amount": data["amount"],
+            "amount_paid": 0,
+            "amount_due": data["amount"],
+            "currency": data.get("currency", "INR"),
+            "receipt": data.get("receipt"),
+            "status": "created",
+            "attempts": 0,
+            "notes": data.get("notes", {}),
+            "created_at": int(time.time()),
+        }
+        orders[order["id"]] = order
+        return order
+
+    def find_order(order_id: str) -> Dict:
+        if order_id not in orders:
+            raise RazorpayError(
+                400, "BAD_REQUEST_ERROR", "The id provided does not exist"
+            )
+        return orders[order_id]
+
+    @app.get(
+        "/v1/orders/{order_id}", dependencies=[Depends(authenticate), Depends(simulate)]
+    )
+    async def fetch_order(order_id: str):
+        return find_order(order_id)
+
+    @app.get(
+        "/v1/orders/{order_id}/payments",
+        dependencies=[Depends(authenticate), Depends(simulate)],
+    )
+    async def fetch_order_payments(order_id: str):
+        find_order(order_id)
+        items = [p for p in payments.values() if p["order_id"] == order_id]
+        return {"entity": "collection", "count": len(items), "items": items}
+
+    @app.get(
+        "/v1/payments/{payment_id}",
+        dependencies=[Depends(authenticate), Depends(simulate)],
+    )
+    async def fetch_payment(payment_id: str):
+        if payment_id not in payments:
+            raise RazorpayError(
+                400, "BAD_REQUEST_ERROR", "The id provided does not exist"
+            )
+        return payments[payment_id]
+
+    @app.post("/stub/orders/{order_id}/checkout")
+    async def checkout(order_id: str, data: CheckoutRequest):
+        """Play the customer paying an order; returns the checkout response"""
+        order = find_order(order_id)
+        payment = {
+            "id": _id("pay"),
+            "entity": "payment",
+            "amount": order["amount"],
+            "currency": order["currency"],
+            "status": data.outcome,
+            "order_id": order_id,
+            "method": data.method,
+            "captured": data.outcome == "captured",
+            "error_code": "BAD_REQUEST_ERROR" if data.outcome == "failed" else None,
+            "created_at": int(time.time()),
+        }
+        payments[payment["id"]] = payment
+        order["attempts"] += 1
+        order["status"] = "attempted"
+        if data.outcome == "captured":
+            order.update(status="paid", amount_paid=order["amount"], amount_due=0)
+        stats[f"checkout_{data.outcome}"] += 1
+
+        if config.webhook_url:
+            asyncio.create_task(deliver_webhooks(dict(payment), dict(order)))
+
+        if data.outcome == "failed":
+            return {"error": {"code": "BAD_REQUEST_ERROR", "reason": "payment_failed"}}
+        return {
+            "razorpay_order_id": order_id,
+            "razorpay_payment_id": payment["id"],
+            "razorpay_signature": hmac.new(
+                config.key_secret.encode(),
+                f"{order_id}|{payment['id']}".encode(),
+                hashlib.sha256,
+            ).hexdigest(),
+        }
+
+    @app.get("/stub/stats")
+    async def get_stats():
+        return {"orders": len(orders), "payments": len(payments), **stats}
+
+    @app.on_event("shutdown")
+    async def shutdown():
+        await webhook_client.aclose()
+
+    return app
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--key-id", default=os.getenv("RAZORPAY_KEY_ID", "rzp_test_stub"))
+    parser.add_argument(
+        "--key-secret", default=os.getenv("RAZORPAY_KEY_SECRET", "stub_secret")
+    )
+    parser.add_argument(
+        "--webhook-secret",
+        default=os.getenv("RAZORPAY_WEBHOOK_SECRET", "stub_webhook_secret"),
+    )
+    parser.add_argument("--webhook-url", help="Where to POST signed webhooks")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--webhook-delay", type=float, default=0.5)
+    parser.add_argument("--duplicate-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    config = StubConfig(
+        key_id=args.key_id,
+        key_secret=args.key_secret,
+        webhook_secret=args.webhook_secret,
+        webhook_url=args.webhook_url,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        webhook_delay=args.webhook_delay,
+        duplicate_rate=args.duplicate_rate,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
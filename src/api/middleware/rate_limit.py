@@ -10,10 +10,6 @@ class RateLimiter:
         self.rate_limits = {
             "/api/v1/auth/send-otp": {"calls": 30, "period": 3600},
             "/api/v1/auth/verify-otp": {"calls": 5, "period": 3600},
-            "/api/v1/webhooks/razorpay": {
-                "calls": 1000,
-                "period": 3600,
-            },  # Webhook specific limit
             "default": {"calls": 100, "period": 60},
         }
 
@@ -22,18 +18,17 @@ class RateLimiter:
         if request.url.path == "/api/v1/webhooks/razorpay/test":
             return
 
+        # Webhooks are bounded by signature checks and dedupe in the endpoint
+        if request.url.path == "/api/v1/webhooks/razorpay":
+            return
+
         client_ip = request.client.host
         path = request.url.path
 
         # Get rate limit data for the path
         limit_data = self.rate_limits.get(path, self.rate_limits["default"])
 
-        # Special handling for webhooks - use Razorpay signature if available
         key = f"rate_limit:{client_ip}:{path}"
-        if path == "/api/v1/webhooks/razorpay":
-            signature = request.headers.get("X-Razorpay-Signature", "")
-            if signature:
-                key = f"rate_limit:razorpay:{signature}:{path}"
 
         # Get current count
         count = await self.redis.get(key)
@@ -1,18 +1,24 @@
 # src/api/v1/endpoints/events.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 import logging
 from src.core.security.jwt import jwt_handler, security
+from src.services.event.analytics import event_analytics
+from src.services.event.export import EXPORT_MEDIA_TYPES, event_exporter
+from src.services.event.register import event_register_service
 from src.services.event.service import EventService
 from src.db.models.event import (
     EventCreate,
     EventResponse,
+    EventListResponse,
+    EventAnalyticsResponse,
     EventQRResponse,
     EventByShagunIDResponse,
 )
-from typing import List
-import qrcode
-import io
-import base64
+from src.services.event.qr_renderer import FORMATS, normalize_size
+from src.utils.helpers import etag_matches
+from typing import Literal, Optional
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -27,10 +33,17 @@ async def create_event(
     return await event_service.create_event(event_data, current_user["user_id"])
 
 
-@router.get("/events", response_model=List[EventResponse])
-async def get_events(current_user=Depends(jwt_handler.get_current_user)):
-    """Get all events for the user"""
-    return await event_service.get_events(current_user["user_id"])
+@router.get("/events", response_model=EventListResponse)
+async def get_events(
+    scope: Literal["all", "upcoming", "past"] = "all",
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    current_user=Depends(jwt_handler.get_current_user),
+):
+    """Get the user's events, a page at a time"""
+    return await event_service.get_events(
+        current_user["user_id"], scope=scope, limit=limit, cursor=cursor
+    )
 
 
 @router.get("/events/{event_id}", response_model=EventResponse)
@@ -50,20 +63,175 @@ async def get_event_qr(
     event = await event_service.get_event(event_id, current_user["user_id"])
 
     # Get or generate QR
-    qr_data = await event_service.qr_generator.get_qr(event_id, force_refresh)
+    qr_sha256 = await event_service.qr_generator.get_qr_hash(
+        event_id, current_user["user_id"], force_refresh
+    )
 
     return {
         "event_id": str(event["id"]),
         "event_name": event["event_name"],
         "event_date": event["event_date"],
         "village": event.get("village"),
-        "qr_code": qr_data,
+        "qr_code_url": event_service.qr_generator.qr_url(event["id"], qr_sha256),
         "shagun_id": event["shagun_id"],
         "status": event.get("status", "active"),
         "created_at": event["created_at"],
     }
 
 
+@router.get("/events/{event_id}/qr.{fmt}")
+async def get_event_qr_file(
+    event_id: str,
+    fmt: str,
+    request: Request,
+    size: Optional[int] = None,
+    v: Optional[str] = None,
+    current_user=Depends(jwt_handler.get_current_user),
+):
+    """
+    QR as a file, cacheable by its content hash
+    - png: the event's QR; with size, 256, 512, 1024 or 2048 px
+    - svg: vector
+    - pdf: print-ready page; size is the QR edge in mm (50, 100, 150, 200)
+    """
+    try:
+        size = normalize_size(fmt, size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    qr_generator = event_service.qr_generator
+    if fmt == "png" and size is None:
+        # Hash first, so a revalidation never reads the image
+        qr_sha256 = await qr_generator.get_qr_hash(event_id, current_user["user_id"])
+        content = None
+    else:
+        render = await qr_generator.get_qr_file(
+            event_id, current_user["user_id"], fmt, size
+        )
+        qr_sha256, content = render if render else (None, None)
+    if not qr_sha256:
+        raise HTTPException(status_code=404, detail="Event not found")
+
+    etag = f'"{qr_sha256}"'
+    headers = {
+        "ETag": etag,
+        # A versioned URL always names the same image; others revalidate
+        "Cache-Control": (
+            "private, max-age=31536000, immutable"
+            if v and len(v) >= 16 and qr_sha256.startswith(v)
+            else "private, no-cache"
+        ),
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    if content is None:
+        content = await qr_generator.get_qr_image(qr_sha256)
+    if content is None:
+        raise HTTPException(status_code=404, detail="QR not found")
+    return Response(content=content, media_type=FORMATS[fmt], headers=headers)
+
+
+@router.get("/events/{event_id}/analytics", response_model=EventAnalyticsResponse)
+async def get_event_analytics(
+    event_id: str, current_user=Depends(jwt_handler.get_current_user)
+):
+    """Shaguns by hour, village and amount band, from stored rollups"""
+    return await event_analytics.get_analytics(event_id, current_user["user_id"])
+
+
+@router.get("/events/{event_id}/export")
+async def export_event_shaguns(
+    event_id: str,
+    fmt: Literal["csv", "xlsx"] = Query("csv", alias="format"),
+    current_user=Depends(jwt_handler.get_current_user),
+):
+    """Download the event's full shagun register, streamed as it is read"""
+    event = await event_exporter.get_event(event_id, current_user["user_id"])
+    release = event_exporter.reserve()
+    if release is None:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many exports running, please retry shortly",
+            headers={"Retry-After": "10"},
+        )
+
+    return StreamingResponse(
+        event_exporter.stream(event, fmt, release),
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="{event["shagun_id"]}-shaguns.{fmt}"'
+            ),
+            "Cache-Control": "private, no-store",
+        },
+        # Also run if the client left before the stream started
+        background=BackgroundTask(release),
+    )
+
+
+@router.post("/events/{event_id}/register")
+async def request_event_register(
+    event_id: str,
+    response: Response,
+    current_user=Depends(jwt_handler.get_current_user),
+):
+    """
+    Ask for a printable PDF register of the event's shaguns
+    - ready: download_url is set, nothing is rendered again
+    - otherwise 202: wait on GET /events/{event_id}/register?wait=25
+    """
+    status = await event_register_service.request(event_id, current_user["user_id"])
+    if status["status"] != "ready":
+        response.status_code = 202
+    return status
+
+
+@router.get("/events/{event_id}/register")
+async def get_event_register(
+    event_id: str,
+    wait: float = Query(0, ge=0, le=60, description="Seconds to wait for it"),
+    current_user=Depends(jwt_handler.get_current_user),
+):
+    """Status of the register for the event's current shaguns"""
+    if wait:
+        return await event_register_service.wait(
+            event_id, current_user["user_id"], wait
+        )
+    return await event_register_service.get_status(event_id, current_user["user_id"])
+
+
+@router.get("/events/{event_id}/register.pdf")
+async def get_event_register_pdf(
+    event_id: str,
+    request: Request,
+    v: Optional[int] = None,
+    current_user=Depends(jwt_handler.get_current_user),
+):
+    """The register PDF, while no new shaguns have arrived since it was made"""
+    status = await event_register_service.get_status(event_id, current_user["user_id"])
+    if status["status"] != "ready":
+        raise HTTPException(status_code=404, detail="Register not ready")
+
+    etag = f'"register-{status["version"]}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": (
+            "private, max-age=31536000, immutable"
+            if v == status["version"]
+            else "private, no-cache"
+        ),
+        "Content-Disposition": f'inline; filename="shagun-register-{event_id}.pdf"',
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    register = await event_register_service.get_pdf(event_id, current_user["user_id"])
+    if register is None or register[0] != status["version"]:
+        raise HTTPException(status_code=404, detail="Register not ready")
+    return Response(content=register[1], media_type="application/pdf", headers=headers)
+
+
 @router.get("/events/shagun/{shagun_id}", response_model=EventByShagunIDResponse)
 async def get_event_by_shagun_id(
     shagun_id: str, current_user=Depends(jwt_handler.get_current_user)
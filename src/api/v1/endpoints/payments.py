@@ -1,6 +1,8 @@
 # src/api/v1/endpoints/payments.py
-from fastapi import APIRouter, Depends, HTTPException, Request, Header
+from fastapi import APIRouter, Depends, HTTPException, Request, Header, Query
+from fastapi.responses import StreamingResponse
 from src.services.payment.processor import PaymentProcessor
+from src.services.payment.status import payment_status_feed
 from src.core.security.jwt import jwt_handler
 from src.db.models.payment import PaymentVerificationData
 from typing import Optional
@@ -34,13 +36,51 @@ async def verify_payment(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.get("/gateway/status")
+async def get_gateway_status(current_user=Depends(jwt_handler.get_current_user)):
+    """Circuit breaker state of the payment gateway on this worker"""
+    return payment_processor.gateway_status()
+
+
+@router.get("/{payment_id}/events")
+async def get_payment_events(
+    payment_id: UUID,
+    request: Request,
+    since: Optional[str] = Query(None, description="Last status the client saw"),
+    timeout: float = Query(25, ge=1, le=60),
+    current_user=Depends(jwt_handler.get_current_user),
+):
+    """
+    Wait for payment status changes instead of polling
+    - Accept: text/event-stream: SSE stream of the status, then each change
+    - otherwise: long-poll, returns when the status differs from `since`
+    """
+    if "text/event-stream" in request.headers.get("accept", ""):
+        # Fail with a proper status before the stream starts
+        await payment_status_feed.get_status(payment_id, current_user["user_id"])
+        return StreamingResponse(
+            payment_status_feed.stream(payment_id, current_user["user_id"]),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+    return await payment_status_feed.wait(
+        payment_id, current_user["user_id"], since, timeout
+    )
+
+
+@router.get("/{payment_id}/gateway-events")
+async def get_payment_gateway_events(
+    payment_id: UUID, current_user=Depends(jwt_handler.get_current_user)
+):
+    """Every payload the gateway sent about a payment you made, oldest first"""
+    return await payment_status_feed.get_gateway_events(
+        payment_id, current_user["user_id"]
+    )
+
+
 @router.get("/{payment_id}")
 async def get_payment_status(
     payment_id: UUID, current_user=Depends(jwt_handler.get_current_user)
 ):
     """Get payment status and details"""
-    try:
-        return await payment_processor.get_payment_details(str(payment_id))
-    except Exception as e:
-        logger.error(f"Failed to get payment details: {str(e)}")
-        raise HTTPException(status_code=404, detail=str(e))
+    return await payment_status_feed.get_status(payment_id, current_user["user_id"])
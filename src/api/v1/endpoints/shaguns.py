@@ -1,7 +1,9 @@
 # src/api/v1/endpoints/shagun.py
 from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
 from uuid import UUID
 from src.core.security.jwt import jwt_handler
+from src.services.shagun.live import event_live_feed
 from src.services.shagun.service import ShagunService
 from src.db.models.shagun import EventShagunResponse
 
@@ -22,3 +24,21 @@ async def get_event_shaguns(
         page_cash=page_cash,
         page_size=page_size,
     )
+
+
+@router.get("/{event_id}/live")
+async def get_event_shaguns_live(
+    event_id: UUID, current_user=Depends(jwt_handler.get_current_user)
+):
+    """
+    SSE stream for the host's dashboard instead of refreshing
+    - event: dashboard, the first page and summary, as GET /{event_id}
+    - event: shaguns, new shaguns (newest first) and the event totals
+    """
+    # Fail with a proper status before the stream starts
+    await event_live_feed.check_access(event_id, current_user["user_id"])
+    return StreamingResponse(
+        event_live_feed.stream(event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
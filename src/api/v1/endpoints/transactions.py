@@ -34,6 +34,9 @@ async def send_shagun(
         # Debug log
         logger.info(f"Received data: {data.dict()}")
 
+        # Don't leave a pending transaction behind while payments are down
+        payment_processor.ensure_gateway_available()
+
         # Create transaction - Don't overwrite sender_name
         transaction = await transaction_service.create_online_transaction(
             event_id=data.event_id,
@@ -55,6 +58,8 @@ async def send_shagun(
 
         return {**transaction, "payment": payment}
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in send_shagun: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,13 +1,13 @@
 # src/api/v1/endpoints/webhooks.py
 from fastapi import APIRouter, Header, Request, HTTPException
-from src.services.payment.webhook import WebhookHandler
+from src.services.payment.inbox import webhook_inbox
 from src.utils.webhook_utils import WebhookUtils
 from src.core.config.app import settings
+from typing import Optional
 import logging
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
-webhook_handler = WebhookHandler()
 webhook_utils = WebhookUtils()
 
 
@@ -15,22 +15,31 @@ webhook_utils = WebhookUtils()
 async def razorpay_webhook(
     request: Request,
     x_razorpay_signature: str = Header(..., alias="X-Razorpay-Signature"),
+    x_razorpay_event_id: Optional[str] = Header(None, alias="X-Razorpay-Event-Id"),
 ):
-    """Handle Razorpay webhook events"""
+    """Verify and store a Razorpay webhook; it is applied by the inbox drainer"""
+    # Signature first, on the raw bytes: forgeries cost no I/O at all
+    body = await request.body()
+    if not webhook_utils.verify_signature(body, x_razorpay_signature):
+        logger.warning("Rejected webhook with invalid signature")
+        raise HTTPException(status_code=400, detail="Invalid webhook signature")
+
+    # Replays cost one Redis call; the signature keys events without an id
+    event_key = x_razorpay_event_id or x_razorpay_signature
+    if not await webhook_utils.claim_webhook(event_key):
+        return {"status": "duplicate"}
+
     try:
-        body = await request.body()
-        result = await webhook_handler.handle_payment_webhook(
-            body=body, signature=x_razorpay_signature
+        stored = await webhook_inbox.append(
+            body, x_razorpay_signature, x_razorpay_event_id
         )
-        return result
-
     except Exception as e:
-        logger.error(f"Webhook processing failed: {str(e)}")
-        # Always return 200 for webhooks
-        return {
-            "status": "error",
-            "message": "Internal server error, but webhook received",
-        }
+        logger.error(f"Failed to store webhook: {str(e)}")
+        # Not stored, so let Razorpay retry it
+        await webhook_utils.release_webhook(event_key)
+        raise HTTPException(status_code=503, detail="Webhook not stored")
+
+    return {"status": "received" if stored else "duplicate"}
 
 
 @router.get("/razorpay/test")
@@ -0,0 +1,123 @@
+# src/cache/manager.py
+import json
+import logging
+from typing import Dict, Optional, Union
+
+from src.cache.redis import redis_client
+from src.core.config.app import settings
+
+logger = logging.getLogger("shagunpe")
+
+# Page size of the cached first page of an event's shagun list (the app default)
+FIRST_PAGE_SIZE = 10
+
+# Cached in place of an event that doesn't exist
+NOT_FOUND = "not_found"
+
+
+class CacheManager:
+    """Read-through Redis cache for the reads guests and hosts make at an event
+
+    Shared by every worker. A failing Redis is treated as a miss, so the
+    database stays the fallback rather than the request failing.
+    """
+
+    @staticmethod
+    def _event_header_key(shagun_id: str) -> str:
+        return f"event:shagun:{shagun_id}"
+
+    @staticmethod
+    def _shagun_page_key(event_id) -> str:
+        return f"event:{event_id}:shaguns:first_page"
+
+    @staticmethod
+    def _shagun_generation_key(event_id) -> str:
+        return f"event:{event_id}:shaguns:generation"
+
+    async def _get(self, key: str) -> Optional[Union[Dict, str]]:
+        try:
+            value = await redis_client.get(key)
+        except Exception as e:
+            logger.warning(f"Cache read failed for {key}: {str(e)}")
+            return None
+        return value if isinstance(value, dict) or value == NOT_FOUND else None
+
+    async def _set(self, key: str, value: Union[Dict, str], expire: int = None):
+        if isinstance(value, dict):
+            value = json.dumps(value, default=str)
+        try:
+            await redis_client.set(
+                key, value, expire=expire or settings.EVENT_CACHE_TTL
+            )
+        except Exception as e:
+            logger.warning(f"Cache write failed for {key}: {str(e)}")
+
+    async def get_event_header(self, shagun_id: str) -> Optional[Union[Dict, str]]:
+        """The cached header, NOT_FOUND for a known miss, or None if uncached"""
+        return await self._get(self._event_header_key(shagun_id))
+
+    async def set_event_header(self, shagun_id: str, header: Optional[Dict]):
+        """Cache a header; None caches the miss, briefly"""
+        if header is None:
+            await self._set(
+                self._event_header_key(shagun_id),
+                NOT_FOUND,
+                expire=settings.EVENT_NEGATIVE_CACHE_TTL,
+            )
+        else:
+            await self._set(self._event_header_key(shagun_id), header)
+
+    async def forget_event_header(self, shagun_id: str):
+        try:
+            await redis_client.delete(self._event_header_key(shagun_id))
+        except Exception as e:
+            logger.warning(f"Cache delete failed for {shagun_id}: {str(e)}")
+
+    async def get_shagun_page(self, event_id) -> Optional[Dict]:
+        return await self._get(self._shagun_page_key(event_id))
+
+    async def get_shagun_generation(self, event_id) -> Optional[str]:
+        """Read before building the first page; None if Redis is failing"""
+        try:
+            return await redis_client.get(self._shagun_generation_key(event_id)) or "0"
+        except Exception as e:
+            logger.warning(f"Cache read failed for event {event_id}: {str(e)}")
+            return None
+
+    async def set_shagun_page(self, event_id, page: Dict, generation: Optional[str]):
+        """Cache the first page, unless invalidated since generation was read
+
+        A page built from a read that raced a new shagun would otherwise be
+        cached after the invalidation meant to drop it.
+        """
+        if generation is None:
+            return
+        try:
+            await redis_client.set_if_equal(
+                self._shagun_generation_key(event_id),
+                generation,
+                self._shagun_page_key(event_id),
+                json.dumps(page, default=str),
+                settings.EVENT_CACHE_TTL,
+            )
+        except Exception as e:
+            logger.warning(f"Cache write failed for event {event_id}: {str(e)}")
+
+    async def invalidate_shaguns(self, event: Dict):
+        """Outbox consumer: a shagun changed, so its event's first page is stale"""
+        event_id = event["payload"].get("event_id")
+        if not event_id:
+            return
+        # Swallowed like any cache failure: raising would retry the outbox
+        # row, and every consumer after this one with it
+        try:
+            generation_key = self._shagun_generation_key(event_id)
+            await redis_client.incr(generation_key)
+            # Only needs to outlive a page being built
+            await redis_client.expire(generation_key, settings.EVENT_CACHE_TTL)
+            await redis_client.delete(self._shagun_page_key(event_id))
+        except Exception as e:
+            logger.warning(f"Cache delete failed for event {event_id}: {str(e)}")
+
+
+cache_manager = CacheManager()
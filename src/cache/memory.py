@@ -0,0 +1,42 @@
+# src/cache/memory.py
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class MemoryLRU:
+    """Per-process LRU bounded by total size rather than entry count"""
+
+    def __init__(self, max_bytes: int, sizeof: Callable[[Any], int] = len):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._bytes = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        size = self.sizeof(value)
+        if size > self.max_bytes:
+            return
+        self.delete(key)
+        self._entries[key] = value
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= self.sizeof(evicted)
+
+    def delete(self, key: Hashable):
+        value = self._entries.pop(key, None)
+        if value is not None:
+            self._bytes -= self.sizeof(value)
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
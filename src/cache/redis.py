@@ -3,6 +3,15 @@ import redis.asyncio as aioredis
 from src.core.config.app import settings
 import json
 
+# Set KEYS[2] only while KEYS[1] still holds ARGV[1]; a missing KEYS[1] is "0"
+SET_IF_EQUAL_SCRIPT = """
+if (redis.call('GET', KEYS[1]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[2], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
 
 class RedisClient:
     def __init__(self):
@@ -35,6 +44,22 @@ class RedisClient:
             value = json.dumps(value)
         await self.redis.set(key, value, ex=expire)
 
+    async def set_nx(self, key: str, value, expire: int) -> bool:
+        """Set key only if absent; True if this call set it"""
+        return bool(await self.redis.set(key, value, ex=expire, nx=True))
+
+    async def set_if_equal(
+        self, guard: str, expected: str, key: str, value, expire: int
+    ) -> bool:
+        """Set key only if guard still holds expected, atomically"""
+        if isinstance(value, (dict, list)):
+            value = json.dumps(value)
+        return bool(
+            await self.redis.eval(
+                SET_IF_EQUAL_SCRIPT, 2, guard, key, expected, value, expire
+            )
+        )
+
     async def incr(self, key: str):
         return await self.redis.incr(key)
 
@@ -47,6 +72,12 @@ class RedisClient:
     async def exists(self, key: str):
         return await self.redis.exists(key)
 
+    async def xadd(self, stream: str, fields: dict, maxlen: int = None):
+        return await self.redis.xadd(stream, fields, maxlen=maxlen, approximate=True)
+
+    async def publish(self, channel: str, message: str):
+        return await self.redis.publish(channel, message)
+
     async def close(self):
         if self.redis:
             await self.redis.close()
@@ -33,6 +33,95 @@ class Settings(BaseSettings):
     RAZORPAY_KEY_ID: Optional[str] = None
     RAZORPAY_KEY_SECRET: Optional[str] = None
     RAZORPAY_WEBHOOK_SECRET: Optional[str] = None
+    PAYMENT_GATEWAY: str = "razorpay"  # or "fake" for local runs and tests
+    RAZORPAY_BASE_URL: str = "https://api.razorpay.com/v1"  # or scripts/razorpay_stub.py
+    RAZORPAY_HTTP2: bool = True
+    RAZORPAY_TIMEOUT: float = 10.0  # Seconds, per read/write
+    RAZORPAY_CONNECT_TIMEOUT: float = 3.0
+    RAZORPAY_MAX_CONNECTIONS: int = 20  # Per worker
+    RAZORPAY_MAX_RETRIES: int = 2
+    RAZORPAY_RETRY_BACKOFF: float = 0.2  # Seconds, doubled per retry
+
+    # Gateway circuit breaker and bulkhead, per worker
+    GATEWAY_MAX_CONCURRENCY: int = 10  # Gateway calls in flight
+    GATEWAY_QUEUE_TIMEOUT: float = 1.0  # Seconds to wait for a free slot
+    GATEWAY_BREAKER_WINDOW: int = 20  # Recent calls considered
+    GATEWAY_BREAKER_MIN_CALLS: int = 10
+    GATEWAY_BREAKER_FAILURE_RATE: float = 0.5  # Failed or slow share that trips it
+    GATEWAY_BREAKER_SLOW_CALL_SECONDS: float = 5.0
+    GATEWAY_BREAKER_OPEN_SECONDS: int = 30
+    GATEWAY_BREAKER_HALF_OPEN_CALLS: int = 3
+
+    # Reconciliation of payments whose webhook never arrived
+    RECONCILE_AFTER_MINUTES: int = 15
+    PAYMENT_ORDER_EXPIRY_MINUTES: int = 60  # Unattempted orders fail after this
+    RECONCILE_BATCH_SIZE: int = 200
+    RECONCILE_CONCURRENCY: int = 5  # Gateway lookups in flight
+    RECONCILE_INTERVAL: int = 300  # Seconds
+    RECONCILE_MAX_FAILURES: int = 3  # Rejected lookups before an expired order fails
+
+    # Payment status push to clients
+    PAYMENT_EVENTS_MAX_SECONDS: int = 300  # Longest an SSE stream stays open
+    PAYMENT_EVENTS_KEEPALIVE: int = 15  # Seconds between SSE comments
+    LIVE_EVENT_MAX_SECONDS: int = 1800  # Longest a dashboard stream stays open
+    LIVE_EVENT_KEEPALIVE: int = 15  # Seconds between SSE comments
+    LIVE_EVENT_MIN_INTERVAL: float = 0.5  # Seconds between dashboard pushes
+
+    # QR rendering, per API worker
+    QR_RENDER_WORKERS: int = 2  # Worker processes
+    QR_RENDER_MAX_PENDING: int = 8  # Renders queued or running
+    QR_CACHE_MEMORY_BYTES: int = 32 * 1024 * 1024  # Recent renders kept in memory
+    QR_CACHE_RETENTION_DAYS: int = 30  # Unused renders no event points at
+    QR_CACHE_EVICT_BATCH_SIZE: int = 1000
+    QR_CACHE_EVICT_INTERVAL: int = 6 * 3600  # Seconds
+
+    # Shagun register exports, per API worker
+    EXPORT_MAX_CONCURRENT: int = 4  # Each holds a DB connection while streaming
+    EXPORT_TIMEZONE: str = "Asia/Kolkata"  # Times in exported registers
+
+    # Printable shagun registers
+    REGISTER_RENDER_WORKERS: int = 1  # Worker processes, per API worker
+    REGISTER_POLL_INTERVAL: float = 2.0  # Seconds
+    REGISTER_MAX_ATTEMPTS: int = 3
+    REGISTER_STALE_SECONDS: int = 600  # A render running longer was lost
+
+    # Event analytics rollups
+    ANALYTICS_TIMEZONE: str = "Asia/Kolkata"  # Hour buckets; set by migration 0026
+    ANALYTICS_TOP_VILLAGES: int = 20  # The rest are summed into one entry
+    ANALYTICS_MAX_HOURS: int = 14 * 24  # Most recent hour buckets returned
+    ANALYTICS_DEDUPE_HOURS: int = 72  # Counted shaguns remembered against redelivery
+    ANALYTICS_REPAIR_INTERVAL: int = 300  # Seconds between rebuilds of missed events
+
+    # Event-day pre-warming
+    PREWARM_INTERVAL: int = 600  # Seconds
+    PREWARM_HORIZON_HOURS: int = 24  # Events dated within this window
+    EVENT_CACHE_TTL: int = 1800  # Seconds; outlives a prewarm interval
+    EVENT_NEGATIVE_CACHE_TTL: int = 60  # Seconds an unknown shagun_id stays unknown
+
+    # Background jobs
+    SCHEDULER_ENABLED: bool = True
+    TRANSACTION_PARTITIONS_AHEAD: int = 3  # Months of partitions to keep ready
+    PARTITION_MAINTENANCE_INTERVAL: int = 6 * 3600  # Seconds
+
+    # Archive
+    ARCHIVE_AFTER_DAYS: int = 90  # Days after event_date
+    ARCHIVE_BATCH_SIZE: int = 1000
+    ARCHIVE_EVENTS_PER_RUN: int = 20
+    ARCHIVE_INTERVAL: int = 3600  # Seconds
+
+    # Outbox
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_MAX_ATTEMPTS: int = 10
+    OUTBOX_POLL_INTERVAL: float = 0.5  # Seconds
+    OUTBOX_RETENTION_HOURS: int = 24
+    OUTBOX_REDIS_STREAM: Optional[str] = None  # Also publish to this stream
+    OUTBOX_REDIS_STREAM_MAXLEN: int = 100000
+
+    # Webhook inbox
+    WEBHOOK_INBOX_BATCH_SIZE: int = 100
+    WEBHOOK_INBOX_MAX_ATTEMPTS: int = 10
+    WEBHOOK_INBOX_POLL_INTERVAL: float = 0.5  # Seconds
+    WEBHOOK_INBOX_RETENTION_DAYS: int = 7
 
     class Config:
         env_file = ".env"
@@ -24,3 +24,12 @@ class InvalidPaymentSignatureError(HTTPException):
         super().__init__(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid payment signature"
         )
+
+
+class PaymentGatewayUnavailableError(HTTPException):
+    def __init__(self, retry_after: int = 30):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Payments temporarily unavailable, please try again shortly",
+            headers={"Retry-After": str(retry_after)},
+        )
@@ -0,0 +1,81 @@
+# src/core/scheduler/periodic.py
+import asyncio
+import logging
+import zlib
+from typing import Awaitable, Callable, List
+
+from src.core.config.database import db
+
+logger = logging.getLogger("shagunpe")
+
+
+class PeriodicJob:
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], Awaitable],
+        interval: float,
+        singleton: bool = True,
+    ):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.singleton = singleton
+        # Stable advisory lock key so only one worker runs a singleton job
+        self.lock_key = zlib.crc32(f"shagunpe:job:{name}".encode())
+
+
+class Scheduler:
+    """Runs registered jobs on a fixed interval inside the API process"""
+
+    def __init__(self):
+        self._jobs: List[PeriodicJob] = []
+        self._tasks: List[asyncio.Task] = []
+
+    def register(
+        self,
+        name: str,
+        func: Callable[[], Awaitable],
+        interval: float,
+        singleton: bool = True,
+    ):
+        self._jobs.append(PeriodicJob(name, func, interval, singleton))
+
+    async def start(self):
+        for job in self._jobs:
+            self._tasks.append(asyncio.create_task(self._run(job)))
+        logger.info(f"Scheduler started with {len(self._jobs)} jobs")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def run_once(self, job: PeriodicJob):
+        """Run a job now, skipping it if another worker holds its lock"""
+        if not job.singleton:
+            await job.func()
+            return
+
+        async with db.pool.acquire() as conn:
+            locked = await conn.fetchval("SELECT pg_try_advisory_lock($1)", job.lock_key)
+            if not locked:
+                return
+            try:
+                await job.func()
+            finally:
+                await conn.execute("SELECT pg_advisory_unlock($1)", job.lock_key)
+
+    async def _run(self, job: PeriodicJob):
+        while True:
+            try:
+                await self.run_once(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Scheduled job {job.name} failed: {str(e)}")
+            await asyncio.sleep(job.interval)
+
+
+scheduler = Scheduler()
@@ -1,7 +1,7 @@
 # src/db/models/event.py
 from pydantic import BaseModel, Field
 from datetime import date, datetime
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 
 
@@ -25,7 +25,63 @@ class EventResponse(BaseModel):
     online_amount: float
     cash_amount: float
     status: str
+    transaction_count: int = 0
     created_at: datetime
+    qr_code_url: Optional[str] = None
+
+
+class EventListItem(BaseModel):
+    id: UUID
+    event_name: str
+    event_date: date
+    village: Optional[str]
+    location: Optional[str]
+    shagun_id: str
+    status: str
+    total_amount: float
+    transaction_count: int
+    qr_code_url: Optional[str] = None
+
+
+class EventListResponse(BaseModel):
+    items: List[EventListItem]
+    next_cursor: Optional[str] = None  # Pass back to get the next page
+
+
+class EventHourlyStat(BaseModel):
+    hour: datetime
+    shaguns: int
+    amount: float
+
+
+class EventVillageStat(BaseModel):
+    village: Optional[str]  # None for shaguns without an address
+    shaguns: int
+    amount: float
+
+
+class EventOtherVillages(BaseModel):
+    villages: int
+    shaguns: int
+    amount: float
+
+
+class EventAmountBandStat(BaseModel):
+    min: float
+    max: Optional[float]  # Exclusive; None for the top band
+    shaguns: int
+    amount: float
+
+
+class EventAnalyticsResponse(BaseModel):
+    event_id: UUID
+    timezone: str  # Of the hour buckets
+    shaguns: int
+    amount: float
+    hourly: List[EventHourlyStat]
+    villages: List[EventVillageStat]  # Top villages by amount
+    other_villages: EventOtherVillages
+    amount_bands: List[EventAmountBandStat]
 
 
 class EventQRResponse(BaseModel):
@@ -33,7 +89,7 @@ class EventQRResponse(BaseModel):
     event_name: str
     event_date: date
     village: Optional[str]
-    qr_code: str
+    qr_code_url: str
     shagun_id: str
     status: str
     created_at: datetime
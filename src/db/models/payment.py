@@ -27,8 +27,6 @@ class PaymentResponse(BaseModel):
     payment_method: str
     status: PaymentStatus
     gateway_payment_id: Optional[str]
-    gateway_response: Optional[Dict]
-    metadata: Optional[Dict]
     created_at: datetime
     updated_at: Optional[datetime]
 
@@ -0,0 +1,151 @@
+# src/services/archive/service.py
+from typing import Optional
+from uuid import UUID
+from datetime import datetime
+import logging
+
+from src.core.config.app import settings
+from src.core.config.database import db
+
+logger = logging.getLogger("shagunpe")
+
+
+class ArchiveService:
+    @staticmethod
+    def transactions_table(archived_at: Optional[datetime]) -> str:
+        """Relation to read an event's transactions from"""
+        return "transactions_all" if archived_at else "transactions"
+
+    async def archive_closed_events(self) -> int:
+        """Archive events that ended more than ARCHIVE_AFTER_DAYS ago"""
+        async with db.pool.acquire() as conn:
+            # Events left half-archived by an interrupted run are picked up too
+            rows = await conn.fetch(
+                """
+                SELECT e.id
+                FROM events e
+                LEFT JOIN archived_events a ON a.event_id = e.id
+                WHERE e.event_date < CURRENT_DATE - $1::int
+                AND a.completed_at IS NULL
+                ORDER BY e.event_date
+                LIMIT $2
+                """,
+                settings.ARCHIVE_AFTER_DAYS,
+                settings.ARCHIVE_EVENTS_PER_RUN,
+            )
+
+        archived = 0
+        for row in rows:
+            try:
+                await self.archive_event(row["id"])
+                archived += 1
+            except Exception as e:
+                logger.error(f"Error archiving event {row['id']}: {str(e)}")
+
+        if archived:
+            logger.info(f"Archived {archived} closed events")
+        return archived
+
+    async def archive_event(self, event_id: UUID) -> int:
+        """Move an event's transactions and payments to the archive tables"""
+        async with db.pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(
+                    """
+                    WITH mark_event AS (
+                        UPDATE events
+                        SET archived_at = COALESCE(archived_at, NOW())
+                        WHERE id = $1
+                    )
+                    INSERT INTO archived_events (event_id)
+                    VALUES ($1)
+                    ON CONFLICT (event_id) DO NOTHING
+                    """,
+                    event_id,
+                )
+
+            moved = 0
+            while True:
+                async with conn.transaction():
+                    status = await conn.execute(
+                        """
+                        WITH batch AS (
+                            SELECT id, created_at
+                            FROM transactions
+                            WHERE event_id = $1
+                            ORDER BY created_at
+                            LIMIT $2
+                            FOR UPDATE
+                        ), moved_payments AS (
+                            DELETE FROM payments p
+                            USING batch b
+                            WHERE p.transaction_id = b.id
+                            RETURNING p.*
+                        ), archived_payments AS (
+                            INSERT INTO payments_archive
+                            SELECT * FROM moved_payments
+                        ), moved_transactions AS (
+                            DELETE FROM transactions t
+                            USING batch b
+                            WHERE t.id = b.id AND t.created_at = b.created_at
+                            RETURNING t.*
+                        )
+                        INSERT INTO transactions_archive
+                        SELECT * FROM moved_transactions
+                        """,
+                        event_id,
+                        settings.ARCHIVE_BATCH_SIZE,
+                    )
+
+                batch_count = int(status.split()[-1])
+                moved += batch_count
+                if batch_count < settings.ARCHIVE_BATCH_SIZE:
+                    break
+
+            await conn.execute(
+                """
+                UPDATE archived_events a
+                SET shagun_count = s.shagun_count,
+                    online_count = s.online_count,
+                    cash_count = s.cash_count,
+                    total_amount = s.total_amount,
+                    online_amount = s.online_amount,
+                    cash_amount = s.cash_amount,
+                    first_transaction_at = s.first_transaction_at,
+                    last_transaction_at = s.last_transaction_at,
+                    completed_at = NOW()
+                FROM (
+                    SELECT
+                        COUNT(*) as shagun_count,
+                        COUNT(CASE WHEN type = 'online' THEN 1 END) as online_count,
+                        COUNT(CASE WHEN type = 'cash' THEN 1 END) as cash_count,
+                        COALESCE(SUM(amount), 0) as total_amount,
+                        COALESCE(SUM(CASE WHEN type = 'online' THEN amount ELSE 0 END), 0) as online_amount,
+                        COALESCE(SUM(CASE WHEN type = 'cash' THEN amount ELSE 0 END), 0) as cash_amount,
+                        MIN(created_at) as first_transaction_at,
+                        MAX(created_at) as last_transaction_at
+                    FROM transactions_archive
+                    WHERE event_id = $1 AND status = 'completed'
+                ) s
+                WHERE a.event_id = $1
+                """,
+                event_id,
+            )
+
+            logger.info(f"Archived {moved} transactions for event {event_id}")
+            return moved
+
+    async def get_summary(self, conn, event_id: UUID) -> Optional[dict]:
+        """Summary row of a fully archived event"""
+        summary = await conn.fetchrow(
+            """
+            SELECT shagun_count, online_count, cash_count,
+                   total_amount as total_shagun,
+                   online_amount as online_shagun,
+                   cash_amount as cash_shagun
+            FROM archived_events
+            WHERE event_id = $1 AND completed_at IS NOT NULL
+            """,
+            event_id,
+        )
+        return dict(summary) if summary else None
@@ -0,0 +1,278 @@
+# src/services/event/analytics.py
+import logging
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Optional
+
+from asyncpg import SerializationError, UniqueViolationError
+from fastapi import HTTPException
+
+from src.core.config.app import settings
+from src.core.config.database import db
+
+logger = logging.getLogger("shagunpe")
+
+# Band lower bounds, as in the shagun_amount_band() SQL function
+AMOUNT_BANDS = (0, 101, 251, 501, 1001, 2101, 5001, 11001)
+
+# One statement per rollup, always in this order so concurrent shaguns of
+# an event lock rows in the same order
+ROLLUP_UPSERTS = (
+    """
+    INSERT INTO event_hourly_stats AS s (event_id, hour, shaguns, amount)
+    VALUES ($1, date_trunc('hour', $3::timestamptz, $4), 1, $2)
+    ON CONFLICT (event_id, hour) DO UPDATE
+    SET shaguns = s.shaguns + 1, amount = s.amount + EXCLUDED.amount
+    """,
+    """
+    INSERT INTO event_village_stats AS s (event_id, village, shaguns, amount)
+    VALUES ($1, shagun_village($3), 1, $2)
+    ON CONFLICT (event_id, village) DO UPDATE
+    SET shaguns = s.shaguns + 1, amount = s.amount + EXCLUDED.amount
+    """,
+    """
+    INSERT INTO event_amount_band_stats AS s (event_id, band_min, shaguns, amount)
+    VALUES ($1, shagun_amount_band($2), 1, $2)
+    ON CONFLICT (event_id, band_min) DO UPDATE
+    SET shaguns = s.shaguns + 1, amount = s.amount + EXCLUDED.amount
+    """,
+)
+
+# Rollup table: its key and how a transaction t is counted under it, as in
+# the backfill of migration 0026; $2 is ANALYTICS_TIMEZONE
+ROLLUP_KEYS = {
+    "event_hourly_stats": ("hour", "date_trunc('hour', t.created_at, $2::text)"),
+    "event_village_stats": ("village", "shagun_village(t.address)"),
+    "event_amount_band_stats": ("band_min", "shagun_amount_band(t.amount)"),
+}
+
+
+class EventAnalytics:
+    """Per-event rollups of completed shaguns, kept current from the outbox
+
+    Reads touch a handful of rollup rows, never ``transactions``, so they
+    cost the same for ten shaguns or a hundred thousand.
+    """
+
+    async def apply(self, event: Dict):
+        """Outbox consumer: count a completed shagun, once"""
+        payload = event["payload"]
+        async with db.pool.acquire() as conn:
+            async with conn.transaction():
+                applied = await conn.fetchval(
+                    """
+                    INSERT INTO event_analytics_applied (transaction_id)
+                    VALUES ($1)
+                    ON CONFLICT DO NOTHING
+                    RETURNING true
+                    """,
+                    payload["transaction_id"],
+                )
+                if not applied:
+                    return
+                # Via str: JSON gave a float
+                amount = Decimal(str(payload["amount"]))
+                await conn.execute(
+                    ROLLUP_UPSERTS[0],
+                    payload["event_id"],
+                    amount,
+                    datetime.fromisoformat(payload["created_at"]),
+                    settings.ANALYTICS_TIMEZONE,
+                )
+                await conn.execute(
+                    ROLLUP_UPSERTS[1], payload["event_id"], amount, payload["address"]
+                )
+                await conn.execute(ROLLUP_UPSERTS[2], payload["event_id"], amount)
+
+    async def rebuild(self, event_id) -> None:
+        """Recount an event's rollups from its completed shaguns
+
+        For an event that missed shaguns, e.g. after their outbox rows ran
+        out of attempts. One snapshot sees a completion and its outbox row
+        together, so shaguns counted here and not yet delivered are marked
+        applied; one landing meanwhile is left to the consumer. A clash
+        with the consumer, a serialization failure or a duplicate rollup
+        row, fails the rebuild rather than counting twice.
+        """
+        async with db.pool.acquire() as conn:
+            async with conn.transaction(isolation="repeatable_read"):
+                for table, (key, expression) in ROLLUP_KEYS.items():
+                    await conn.execute(
+                        f"DELETE FROM {table} WHERE event_id = $1", event_id
+                    )
+                    args = [event_id]
+                    if "$2" in expression:
+                        args.append(settings.ANALYTICS_TIMEZONE)
+                    await conn.execute(
+                        f"""
+                        INSERT INTO {table} (event_id, {key}, shaguns, amount)
+                        SELECT t.event_id, {expression}, COUNT(*), SUM(t.amount)
+                        FROM transactions_all t
+                        WHERE t.event_id = $1
+                        AND t.status = 'completed'
+                        GROUP BY 1, 2
+                        """,
+                        *args,
+                    )
+                await conn.execute(
+                    """
+                    INSERT INTO event_analytics_applied (transaction_id)
+                    SELECT DISTINCT aggregate_id
+                    FROM outbox
+                    WHERE topic = 'shagun.completed'
+                    AND published_at IS NULL
+                    AND (payload->>'event_id')::uuid = $1
+                    ON CONFLICT DO NOTHING
+                    """,
+                    event_id,
+                )
+
+    async def repair(self) -> int:
+        """Scheduled job: rebuild events whose shaguns the consumer gave up on"""
+        async with db.pool.acquire() as conn:
+            # Within the dedupe window: older ones were seen by an earlier run
+            event_ids = await conn.fetch(
+                """
+                SELECT DISTINCT (o.payload->>'event_id')::uuid AS event_id
+                FROM outbox o
+                WHERE o.topic = 'shagun.completed'
+                AND o.published_at IS NULL
+                AND o.attempts >= $1
+                AND o.created_at > NOW() - make_interval(hours => $2)
+                AND NOT EXISTS (
+                    SELECT 1
+                    FROM event_analytics_applied a
+                    WHERE a.transaction_id = o.aggregate_id
+                )
+                """,
+                settings.OUTBOX_MAX_ATTEMPTS,
+                settings.ANALYTICS_DEDUPE_HOURS,
+            )
+        rebuilt = 0
+        for row in event_ids:
+            try:
+                await self.rebuild(row["event_id"])
+                rebuilt += 1
+            # Updated, or inserted a rollup row, after the snapshot
+            except (SerializationError, UniqueViolationError):
+                logger.warning(
+                    f"Analytics rebuild of event {row['event_id']} raced a "
+                    "shagun, retrying next run"
+                )
+        return rebuilt
+
+    async def purge_applied(self) -> int:
+        """Forget applied shaguns once the outbox can no longer redeliver them"""
+        async with db.pool.acquire() as conn:
+            status = await conn.execute(
+                """
+                DELETE FROM event_analytics_applied
+                WHERE applied_at < NOW() - make_interval(hours => $1)
+                """,
+                settings.ANALYTICS_DEDUPE_HOURS,
+            )
+        return int(status.split()[-1])
+
+    async def get_analytics(self, event_id: str, user_id: str) -> Dict:
+        async with db.pool.acquire() as conn:
+            event = await conn.fetchrow(
+                """
+                SELECT id
+                FROM events
+                WHERE id = $1 AND creator_id = $2
+                """,
+                event_id,
+                user_id,
+            )
+            if not event:
+                raise HTTPException(status_code=404, detail="Event not found")
+
+            hourly = await conn.fetch(
+                """
+                SELECT hour, shaguns, amount
+                FROM (
+                    SELECT hour, shaguns, amount
+                    FROM event_hourly_stats
+                    WHERE event_id = $1
+                    ORDER BY hour DESC
+                    LIMIT $2
+                ) h
+                ORDER BY hour
+                """,
+                event["id"],
+                settings.ANALYTICS_MAX_HOURS,
+            )
+            villages = await conn.fetch(
+                """
+                SELECT village, shaguns, amount,
+                       COUNT(*) OVER () as village_count
+                FROM event_village_stats
+                WHERE event_id = $1
+                ORDER BY amount DESC, village
+                LIMIT $2
+                """,
+                event["id"],
+                settings.ANALYTICS_TOP_VILLAGES,
+            )
+            bands = await conn.fetch(
+                """
+                SELECT band_min, shaguns, amount
+                FROM event_amount_band_stats
+                WHERE event_id = $1
+                ORDER BY band_min
+                """,
+                event["id"],
+            )
+
+        # Totals from the bands, which every shagun falls in, so the parts
+        # always add up even while the outbox catches up
+        shaguns = sum(row["shaguns"] for row in bands)
+        amount = sum(row["amount"] for row in bands)
+        village_count = villages[0]["village_count"] if villages else 0
+        return {
+            "event_id": event["id"],
+            "timezone": settings.ANALYTICS_TIMEZONE,
+            "shaguns": shaguns,
+            "amount": float(amount),
+            "hourly": [
+                {
+                    "hour": row["hour"],
+                    "shaguns": row["shaguns"],
+                    "amount": float(row["amount"]),
+                }
+                for row in hourly
+            ],
+            "villages": [
+                {
+                    "village": row["village"] or None,
+                    "shaguns": row["shaguns"],
+                    "amount": float(row["amount"]),
+                }
+                for row in villages
+            ],
+            "other_villages": {
+                "villages": village_count - len(villages),
+                "shaguns": shaguns - sum(row["shaguns"] for row in villages),
+                "amount": float(amount - sum(row["amount"] for row in villages)),
+            },
+            "amount_bands": [
+                {
+                    "min": float(row["band_min"]),
+                    "max": self._band_max(row["band_min"]),
+                    "shaguns": row["shaguns"],
+                    "amount": float(row["amount"]),
+                }
+                for row in bands
+            ],
+        }
+
+    @staticmethod
+    def _band_max(band_min) -> Optional[float]:
+        """Upper bound, exclusive; None for the top band"""
+        for bound in AMOUNT_BANDS:
+            if bound > band_min:
+                return float(bound)
+        return None
+
+
+event_analytics = EventAnalytics()
@@ -15,10 +15,8 @@ class EventProcessor:
             # Generate QR code
             await self.qr_generator.generate_and_store(event_data)
 
-            # Future tasks:
-            # - Send notifications
-            # - Update statistics
-            # - Process event analytics
+            # Shagun side effects (notifications, statistics, analytics)
+            # subscribe to the outbox relay instead of running inline
 
         except Exception as e:
             logger.error(f"Error processing event {event_data['id']}: {str(e)}")
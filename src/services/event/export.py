@@ -0,0 +1,152 @@
+# src/services/event/export.py
+import csv
+import io
+import logging
+from typing import AsyncIterator, Callable, List, Optional
+
+from fastapi import HTTPException
+
+from src.core.config.app import settings
+from src.core.config.database import db
+from src.services.archive.service import ArchiveService
+from src.utils.xlsx import XLSXStreamWriter
+
+logger = logging.getLogger("shagunpe")
+
+EXPORT_COLUMNS = ["Date", "Sender", "Address", "Amount", "Type"]
+EXPORT_BATCH_SIZE = 1000  # Rows per cursor fetch, and per response chunk
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+# Spreadsheet apps run cells starting with these as formulas
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+class EventExporter:
+    """Streams an event's full shagun register as CSV or XLSX"""
+
+    def __init__(self):
+        self.archive_service = ArchiveService()
+        self.active = 0  # Export slots taken on this worker
+
+    async def get_event(self, event_id: str, user_id: str):
+        async with db.pool.acquire() as conn:
+            event = await conn.fetchrow(
+                """
+                SELECT id, event_name, shagun_id, created_at, archived_at
+                FROM events
+                WHERE id = $1 AND creator_id = $2
+                """,
+                event_id,
+                user_id,
+            )
+        if not event:
+            raise HTTPException(status_code=404, detail="Event not found")
+        return event
+
+    def reserve(self) -> Optional[Callable[[], None]]:
+        """Take an export slot, or None if EXPORT_MAX_CONCURRENT are taken
+
+        Taken before the response is returned, so a burst of requests can't
+        all pass the check before any starts streaming. The returned
+        callable gives the slot back; calling it again does nothing.
+        """
+        if self.active >= settings.EXPORT_MAX_CONCURRENT:
+            return None
+        self.active += 1
+        released = False
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                self.active -= 1
+
+        return release
+
+    async def stream(self, event, fmt: str, release) -> AsyncIterator[bytes]:
+        """The file in the given format, releasing its slot however it ends"""
+        chunks = self.stream_csv(event) if fmt == "csv" else self.stream_xlsx(event)
+        try:
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            release()
+
+    async def _batches(self, event) -> AsyncIterator[List]:
+        """Completed shaguns oldest first, read through a server-side cursor
+
+        Only one batch is in memory at a time. The columns are all in the
+        completed-shaguns index, so this is an index-only scan.
+        """
+        table = self.archive_service.transactions_table(event["archived_at"])
+        async with db.pool.acquire() as conn:
+            # One snapshot for the whole file, however long the download
+            async with conn.transaction(isolation="repeatable_read", readonly=True):
+                cursor = await conn.cursor(
+                    f"""
+                    SELECT t.created_at AT TIME ZONE $3 as created_at,
+                           t.sender_name, t.address, t.amount, t.type::text
+                    FROM {table} t
+                    WHERE t.event_id = $1
+                    AND t.status = 'completed'
+                    AND t.created_at >= $2
+                    ORDER BY t.created_at
+                    """,
+                    event["id"],
+                    event["created_at"],
+                    settings.EXPORT_TIMEZONE,
+                )
+                while True:
+                    batch = await cursor.fetch(EXPORT_BATCH_SIZE)
+                    if not batch:
+                        break
+                    yield batch
+
+    async def stream_csv(self, event) -> AsyncIterator[bytes]:
+        # BOM so Excel reads names in any script as UTF-8
+        buffer = io.StringIO()
+        buffer.write("\ufeff")
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+        async for batch in self._batches(event):
+            writer.writerows(
+                [
+                    row["created_at"].strftime("%Y-%m-%d %H:%M:%S"),
+                    self._csv_text(row["sender_name"]),
+                    self._csv_text(row["address"]),
+                    row["amount"],
+                    row["type"],
+                ]
+                for row in batch
+            )
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue().encode()
+
+    async def stream_xlsx(self, event) -> AsyncIterator[bytes]:
+        writer = XLSXStreamWriter(sheet_name=event["event_name"])
+        yield writer.start(EXPORT_COLUMNS)
+        async for batch in self._batches(event):
+            yield writer.add_rows(
+                (
+                    row["created_at"],
+                    row["sender_name"],
+                    row["address"],
+                    row["amount"],
+                    row["type"],
+                )
+                for row in batch
+            )
+        yield writer.close()
+
+    @staticmethod
+    def _csv_text(value):
+        if value and value.startswith(FORMULA_PREFIXES):
+            return f"'{value}"
+        return value
+
+
+event_exporter = EventExporter()
@@ -0,0 +1,62 @@
+# src/services/event/prewarm.py
+import logging
+import time
+
+from src.core.config.app import settings
+from src.core.config.database import db
+from src.services.event.qr_generator import EventQRGenerator
+from src.services.event.service import EventService
+from src.services.shagun.service import ShagunService
+
+logger = logging.getLogger("shagunpe")
+
+
+class EventPrewarmer:
+    """Warms every cache an event's guests and host hit before the day starts"""
+
+    def __init__(self):
+        self.qr_generator = EventQRGenerator()
+        self.event_service = EventService()
+        self.shagun_service = ShagunService()
+
+    async def upcoming_events(self):
+        """Unarchived events dated from today to the end of the horizon"""
+        async with db.pool.acquire() as conn:
+            return await conn.fetch(
+                """
+                SELECT id, shagun_id, qr_sha256
+                FROM events
+                WHERE event_date BETWEEN CURRENT_DATE
+                    AND (NOW() + make_interval(hours => $1))::date
+                AND archived_at IS NULL
+                AND shagun_id IS NOT NULL
+                ORDER BY event_date
+                """,
+                settings.PREWARM_HORIZON_HOURS,
+            )
+
+    async def prewarm_event(self, event: dict):
+        # QR first: a missing or outdated image is the slowest cold path
+        await self.qr_generator.ensure_current(event)
+        # Rewritten even when present, so the TTL never lapses mid-event
+        await self.event_service.get_event_by_shagun_id(
+            event["shagun_id"], refresh=True
+        )
+        await self.shagun_service.get_event_shaguns(event["id"], refresh=True)
+
+    async def prewarm(self) -> int:
+        """Scheduled job: warm each upcoming event; one failure doesn't stop the rest"""
+        started = time.monotonic()
+        warmed = 0
+        for event in await self.upcoming_events():
+            try:
+                await self.prewarm_event(dict(event))
+                warmed += 1
+            except Exception as e:
+                logger.error(f"Prewarming event {event['id']} failed: {str(e)}")
+        if warmed:
+            logger.info(
+                f"Prewarmed {warmed} upcoming events in "
+                f"{time.monotonic() - started:.1f}s"
+            )
+        return warmed
@@ -1,108 +1,227 @@
 # services/event/qr_generator.py
-import qrcode
-from PIL import Image
-import io
-import base64
-import os
+import hashlib
 import logging
+from typing import Optional, Tuple
+from src.cache.memory import MemoryLRU
+from src.core.config.app import settings
 from src.core.config.database import db
+from src.services.event.qr_renderer import (
+    FORMATS,
+    normalize_size,
+    qr_render_pool,
+    render_key,
+)
 
 logger = logging.getLogger("shagunpe")
 
+# Recent renders by render key, as (sha256, content), shared by every
+# generator in this process
+_renders = MemoryLRU(
+    settings.QR_CACHE_MEMORY_BYTES, sizeof=lambda render: len(render[1])
+)
 
-class EventQRGenerator:
-    def __init__(self):
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        src_dir = os.path.dirname(os.path.dirname(os.path.dirname(current_dir)))
-        self.logo_path = os.path.join(src_dir, "src", "assets", "logo.png")
-
-    async def generate_and_store(self, event_data: dict):
-        """Generate QR code and store it"""
-        try:
-            qr_code = await self._generate_qr(event_data)
-            await self._store_qr(event_data["id"], qr_code)
-            return qr_code
-        except Exception as e:
-            logger.error(f"Error in QR generation: {str(e)}")
-            raise
-
-    async def get_qr(self, event_id: str, force_refresh: bool = False):
-        """Get QR code from storage or generate new"""
-        try:
-            if not force_refresh:
-                qr_code = await self._get_stored_qr(event_id)
-                if qr_code:
-                    return qr_code
-
-            async with db.pool.acquire() as conn:
-                event = await conn.fetchrow(
-                    "SELECT * FROM events WHERE id = $1", event_id
-                )
-                if not event:
-                    raise ValueError("Event not found")
 
-                return await self.generate_and_store(dict(event))
-
-        except Exception as e:
-            logger.error(f"Error getting QR: {str(e)}")
-            raise
-
-    async def _generate_qr(self, event_data: dict) -> str:
-        """Generate QR code with logo"""
-        qr = qrcode.QRCode(
-            version=None,
-            error_correction=qrcode.constants.ERROR_CORRECT_H,
-            box_size=10,
-            border=4,
+class EventQRGenerator:
+    @staticmethod
+    def qr_url(event_id, qr_sha256: Optional[str]) -> Optional[str]:
+        """Versioned image URL; a new QR gets a new URL"""
+        if not qr_sha256:
+            return None
+        return (
+            f"{settings.BASE_URL}{settings.API_V1_PREFIX}/events/events/"
+            f"{event_id}/qr.png?v={qr_sha256[:16]}"
         )
 
+    @staticmethod
+    def _payload(event_data: dict) -> str:
         qr_data = {
             "event_id": str(event_data["id"]),
             "shagun_id": event_data["shagun_id"],
             "type": "shagunpe_event",
         }
-        qr.add_data(qr_data)
-        qr.make(fit=True)
+        return str(qr_data)
 
-        qr_image = qr.make_image(fill_color="black", back_color="white").convert("RGBA")
+    async def render(
+        self, event_data: dict, fmt: str = "png", size: Optional[int] = None
+    ) -> Tuple[str, bytes]:
+        """(SHA-256, bytes) of the event's QR in a format and size
 
-        # Add logo if exists
-        if os.path.exists(self.logo_path):
-            logo = Image.open(self.logo_path)
-            logo_size = qr_image.size[0] // 4
-            logo = logo.resize((logo_size, logo_size))
+        Looked up by a hash of everything the output depends on, in memory
+        and then in qr_images; only a miss in both renders.
+        """
+        size = normalize_size(fmt, size)
+        data = self._payload(event_data)
+        key = render_key(data, fmt, size)
 
-            pos = (
-                (qr_image.size[0] - logo.size[0]) // 2,
-                (qr_image.size[1] - logo.size[1]) // 2,
+        cached = _renders.get(key)
+        if cached:
+            return cached
+
+        async with db.pool.acquire() as conn:
+            # Touched at most daily, so hits don't turn into writes
+            row = await conn.fetchrow(
+                """
+                WITH hit AS (
+                    SELECT sha256, content, last_used_at
+                    FROM qr_images
+                    WHERE render_key = $1
+                ), touch AS (
+                    UPDATE qr_images q
+                    SET last_used_at = NOW()
+                    FROM hit
+                    WHERE q.sha256 = hit.sha256
+                    AND hit.last_used_at < NOW() - INTERVAL '1 day'
+                )
+                SELECT sha256, content FROM hit
+                """,
+                key,
             )
 
-            logo_bg = Image.new("RGBA", logo.size, "white")
-            qr_image.paste(logo_bg, pos, logo_bg)
-            qr_image.paste(logo, pos, logo)
+        if row:
+            result = (row["sha256"], row["content"])
+        else:
+            # CPU-bound, so it runs in the render pool rather than on the loop
+            content = await qr_render_pool.render(data, fmt, size)
+            result = (hashlib.sha256(content).hexdigest(), content)
+            async with db.pool.acquire() as conn:
+                await conn.execute(
+                    """
+                    INSERT INTO qr_images
+                        (sha256, content, content_type, render_key, format, size)
+                    VALUES ($1, $2, $3, $4, $5, $6)
+                    ON CONFLICT (sha256) DO UPDATE
+                    SET render_key = EXCLUDED.render_key,
+                        last_used_at = NOW()
+                    """,
+                    result[0],
+                    content,
+                    FORMATS[fmt],
+                    key,
+                    fmt,
+                    size,
+                )
 
-        buffered = io.BytesIO()
-        qr_image.save(buffered, format="PNG", optimize=True, quality=85)
-        return f"data:image/png;base64,{base64.b64encode(buffered.getvalue()).decode()}"
+        _renders.set(key, result)
+        return result
 
-    async def _store_qr(self, event_id: str, qr_code: str):
-        """Store QR in database"""
+    async def generate_and_store(self, event_data: dict) -> str:
+        """Generate QR code and store it; returns its SHA-256"""
+        try:
+            qr_sha256, png = await self.render(event_data)
+            await self._store_qr(event_data["id"], qr_sha256, png)
+            return qr_sha256
+        except Exception as e:
+            logger.error(f"Error in QR generation: {str(e)}")
+            raise
+
+    async def ensure_current(self, event_data: dict) -> str:
+        """Make sure the event points at a current render; returns its SHA-256
+
+        Cheap when nothing changed: the render is a cache hit and nothing is
+        written. A new renderer or logo gets the event a new image.
+        """
+        qr_sha256, png = await self.render(event_data)
+        if qr_sha256 != event_data.get("qr_sha256"):
+            await self._store_qr(event_data["id"], qr_sha256, png)
+        return qr_sha256
+
+    async def _owned_event(self, event_id: str, user_id: str):
         async with db.pool.acquire() as conn:
-            await conn.execute(
+            return await conn.fetchrow(
                 """
-                UPDATE events 
-                SET qr_code = $1, 
-                    qr_code_updated_at = NOW()
-                WHERE id = $2
+                SELECT id, shagun_id, qr_sha256
+                FROM events
+                WHERE id = $1 AND creator_id = $2
                 """,
-                qr_code,
                 event_id,
+                user_id,
             )
 
-    async def _get_stored_qr(self, event_id: str) -> str:
-        """Get stored QR code"""
+    async def get_qr_hash(
+        self, event_id: str, user_id: str, force_refresh: bool = False
+    ) -> Optional[str]:
+        """SHA-256 of the event's QR, generated if missing; None if no access"""
+        try:
+            event = await self._owned_event(event_id, user_id)
+            if not event:
+                return None
+            if event["qr_sha256"] and not force_refresh:
+                return event["qr_sha256"]
+
+            # Unchanged QR data is a cache hit, not a re-render
+            return await self.generate_and_store(dict(event))
+
+        except Exception as e:
+            logger.error(f"Error getting QR: {str(e)}")
+            raise
+
+    async def get_qr_file(
+        self, event_id: str, user_id: str, fmt: str, size: Optional[int]
+    ) -> Optional[Tuple[str, bytes]]:
+        """The event's QR in any format; None if no access"""
+        event = await self._owned_event(event_id, user_id)
+        if not event:
+            return None
+        return await self.render(dict(event), fmt, size)
+
+    async def get_qr_image(self, qr_sha256: str) -> Optional[bytes]:
+        """Image bytes by content hash"""
         async with db.pool.acquire() as conn:
-            result = await conn.fetchrow(
-                "SELECT qr_code FROM events WHERE id = $1", event_id
+            return await conn.fetchval(
+                "SELECT content FROM qr_images WHERE sha256 = $1", qr_sha256
             )
-            return result["qr_code"] if result else None
+
+    async def evict_renders(self) -> int:
+        """Drop renders unused for the retention period that no event uses"""
+        evicted = 0
+        async with db.pool.acquire() as conn:
+            while True:
+                status = await conn.execute(
+                    """
+                    DELETE FROM qr_images
+                    WHERE sha256 IN (
+                        SELECT q.sha256
+                        FROM qr_images q
+                        WHERE q.last_used_at < NOW() - make_interval(days => $1)
+                        AND NOT EXISTS (
+                            SELECT 1 FROM events e WHERE e.qr_sha256 = q.sha256
+                        )
+                        LIMIT $2
+                    )
+                    """,
+                    settings.QR_CACHE_RETENTION_DAYS,
+                    settings.QR_CACHE_EVICT_BATCH_SIZE,
+                )
+                count = int(status.split()[-1])
+                evicted += count
+                if count < settings.QR_CACHE_EVICT_BATCH_SIZE:
+                    break
+        if evicted:
+            logger.info(f"Evicted {evicted} cached QR renders")
+        return evicted
+
+    async def _store_qr(self, event_id: str, qr_sha256: str, png: bytes):
+        """Point the event at the image"""
+        async with db.pool.acquire() as conn:
+            async with conn.transaction():
+                # The render may have been served from memory after eviction;
+                # touching it keeps the eviction job off it meanwhile
+                await conn.execute(
+                    """
+                    INSERT INTO qr_images (sha256, content)
+                    VALUES ($1, $2)
+                    ON CONFLICT (sha256) DO UPDATE SET last_used_at = NOW()
+                    """,
+                    qr_sha256,
+                    png,
+                )
+                await conn.execute(
+                    """
+                    UPDATE events
+                    SET qr_sha256 = $1,
+                        qr_code_updated_at = NOW()
+                    WHERE id = $2
+                    """,
+                    qr_sha256,
+                    event_id,
+                )
@@ -0,0 +1,279 @@
+# src/services/event/qr_renderer.py
+import asyncio
+import base64
+import functools
+import hashlib
+import io
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional
+
+import qrcode
+from PIL import Image
+
+from src.core.config.app import settings
+from src.utils.pdf import MM, PDFWriter
+
+logger = logging.getLogger("shagunpe")
+
+LOGO_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "assets",
+    "logo.png",
+)
+
+# Bump when the output for the same inputs changes, to retire cached renders
+RENDER_VERSION = 1
+
+FORMATS = {"png": "image/png", "svg": "image/svg+xml", "pdf": "application/pdf"}
+PNG_SIZES = (256, 512, 1024, 2048)  # Pixels; no size is the canonical image
+PDF_SIZES = (50, 100, 150, 200)  # Printed QR edge in mm
+PDF_DEFAULT_SIZE = 100
+PDF_MARGIN_MM = 10
+PRINT_DPI = 300
+
+# Per worker process, set by _init_worker
+_logo: Optional[Image.Image] = None
+_logos: Dict[int, Image.Image] = {}
+
+
+@functools.lru_cache(maxsize=1)
+def logo_version() -> str:
+    """Changes whenever the logo file does; part of every cache key"""
+    if not os.path.exists(LOGO_PATH):
+        return "none"
+    with open(LOGO_PATH, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+def normalize_size(fmt: str, size: Optional[int]) -> Optional[int]:
+    """The size a render is made and cached at; ValueError if unsupported"""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported QR format: {fmt}")
+    if fmt == "svg":
+        return None  # Vector; scales to any size
+    if fmt == "pdf":
+        size = size or PDF_DEFAULT_SIZE
+        if size not in PDF_SIZES:
+            raise ValueError(f"PDF size must be one of {PDF_SIZES} mm")
+        return size
+    if size is not None and size not in PNG_SIZES:
+        raise ValueError(f"PNG size must be one of {PNG_SIZES} px")
+    return size
+
+
+def render_key(data: str, fmt: str, size: Optional[int]) -> str:
+    """Cache key for a render: everything its output depends on"""
+    return hashlib.sha256(
+        f"{RENDER_VERSION}\0{logo_version()}\0{fmt}\0{size or 0}\0{data}".encode()
+    ).hexdigest()
+
+
+def _init_worker(logo_path: str):
+    """Decode the logo once per worker instead of once per QR"""
+    global _logo
+    if os.path.exists(logo_path):
+        _logo = Image.open(logo_path)
+        _logo.load()
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _make_qr(data: str) -> qrcode.QRCode:
+    qr = qrcode.QRCode(
+        version=None,
+        error_correction=qrcode.constants.ERROR_CORRECT_H,
+        box_size=10,
+        border=4,
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+    return qr
+
+
+def _logo_sized(size: int) -> Optional[Image.Image]:
+    """The logo at size x size px, resized once per worker"""
+    if _logo is None:
+        return None
+    if size not in _logos:
+        _logos[size] = _logo.resize((size, size))
+    return _logos[size]
+
+
+def _dark_runs(matrix: List[List[bool]]):
+    """(x, y, length) of each horizontal run of dark modules"""
+    for y, row in enumerate(matrix):
+        x = 0
+        while x < len(row):
+            if not row[x]:
+                x += 1
+                continue
+            start = x
+            while x < len(row) and row[x]:
+                x += 1
+            yield start, y, x - start
+
+
+def render_png(data: str, size: Optional[int] = None) -> bytes:
+    """QR with the logo in the middle, as PNG bytes"""
+    qr = _make_qr(data)
+    if size is not None:
+        modules = qr.modules_count + 2 * qr.border
+        qr.box_size = max(1, -(-size // modules))
+
+    qr_image = qr.make_image(fill_color="black", back_color="white").convert("RGBA")
+    if size is not None and qr_image.size[0] != size:
+        qr_image = qr_image.resize((size, size), Image.NEAREST)
+
+    logo = _logo_sized(qr_image.size[0] // 4)
+    if logo is not None:
+        pos = (
+            (qr_image.size[0] - logo.size[0]) // 2,
+            (qr_image.size[1] - logo.size[1]) // 2,
+        )
+
+        logo_bg = Image.new("RGBA", logo.size, "white")
+        qr_image.paste(logo_bg, pos, logo_bg)
+        qr_image.paste(logo, pos, logo)
+
+    buffered = io.BytesIO()
+    qr_image.save(buffered, format="PNG", optimize=True)
+    return buffered.getvalue()
+
+
+def render_svg(data: str, size: Optional[int] = None) -> bytes:
+    """Vector QR in module units, with the logo embedded as PNG"""
+    matrix = _make_qr(data).get_matrix()
+    n = len(matrix)
+    path = "".join(f"M{x} {y}h{run}v1h-{run}z" for x, y, run in _dark_runs(matrix))
+
+    logo_svg = ""
+    logo = _logo_sized(512)
+    if logo is not None:
+        buffered = io.BytesIO()
+        logo.save(buffered, format="PNG", optimize=True)
+        side = n / 4
+        pos = (n - side) / 2
+        logo_svg = (
+            f'<rect x="{pos}" y="{pos}" width="{side}" height="{side}" fill="#fff"/>'
+            f'<image x="{pos}" y="{pos}" width="{side}" height="{side}" '
+            f'xlink:href="data:image/png;base64,'
+            f'{base64.b64encode(buffered.getvalue()).decode()}"/>'
+        )
+
+    return (
+        '<svg xmlns="http://www.w3.org/2000/svg" '
+        'xmlns:xlink="http://www.w3.org/1999/xlink" '
+        f'viewBox="0 0 {n} {n}" shape-rendering="crispEdges">'
+        f'<rect width="{n}" height="{n}" fill="#fff"/>'
+        f'<path fill="#000" d="{path}"/>{logo_svg}</svg>'
+    ).encode()
+
+
+def render_pdf(data: str, size: Optional[int] = PDF_DEFAULT_SIZE) -> bytes:
+    """Single page, vector QR size mm wide with a margin, for print shops"""
+    matrix = _make_qr(data).get_matrix()
+    n = len(matrix)
+    page = (size + 2 * PDF_MARGIN_MM) * MM
+    origin = PDF_MARGIN_MM * MM
+    module = size * MM / n
+
+    # PDF's y axis points up, the matrix rows go down
+    ops = ["0 g"]
+    for x, y, run in _dark_runs(matrix):
+        ops.append(
+            f"{origin + x * module:.3f} {origin + (n - 1 - y) * module:.3f} "
+            f"{run * module:.3f} {module:.3f} re"
+        )
+    ops.append("f")
+
+    pdf = PDFWriter()
+    images = {}
+    side_mm = size / 4
+    logo = _logo_sized(min(1024, round(side_mm / 25.4 * PRINT_DPI)))
+    if logo is not None:
+        logo = logo.convert("RGBA")
+        images["Logo"] = pdf.add_image(
+            logo.convert("RGB").tobytes(),
+            logo.size[0],
+            logo.size[1],
+            alpha=logo.getchannel("A").tobytes(),
+        )
+        side = side_mm * MM
+        pos = origin + (size * MM - side) / 2
+        ops.append(f"1 g {pos:.3f} {pos:.3f} {side:.3f} {side:.3f} re f")
+        ops.append(f"q {side:.3f} 0 0 {side:.3f} {pos:.3f} {pos:.3f} cm /Logo Do Q")
+
+    pdf.add_page(page, page, "\n".join(ops).encode(), images=images)
+    return pdf.output()
+
+
+RENDERERS = {"png": render_png, "svg": render_svg, "pdf": render_pdf}
+
+
+def render(data: str, fmt: str = "png", size: Optional[int] = None) -> bytes:
+    """Runs in a worker: the QR for data in the given format and size"""
+    return RENDERERS[fmt](data, size)
+
+
+class QRRenderPool:
+    """Renders QR images in worker processes, off the event loop"""
+
+    def __init__(self):
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        # spawn: forking a process with a running loop and threads is unsafe
+        return ProcessPoolExecutor(
+            max_workers=settings.QR_RENDER_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(LOGO_PATH,),
+        )
+
+    async def start(self):
+        """Start the workers now so the first render doesn't pay for it"""
+        if self._executor is None:
+            self._executor = self._create_executor()
+            self._slots = asyncio.Semaphore(settings.QR_RENDER_MAX_PENDING)
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *(
+                loop.run_in_executor(self._executor, _ping)
+                for _ in range(settings.QR_RENDER_WORKERS)
+            )
+        )
+        logger.info(f"QR render pool started with {settings.QR_RENDER_WORKERS} workers")
+
+    async def render(
+        self, data: str, fmt: str = "png", size: Optional[int] = None
+    ) -> bytes:
+        """Rendered QR for data; waits for a free slot when the pool is busy"""
+        if self._executor is None:
+            await self.start()
+        # Bounded, so a burst queues here rather than inside the executor
+        async with self._slots:
+            try:
+                return await asyncio.get_running_loop().run_in_executor(
+                    self._executor, render, data, fmt, size
+                )
+            except BrokenProcessPool:
+                # A worker died; replace the pool for the next caller
+                logger.error("QR render pool broken, restarting it")
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = self._create_executor()
+                raise
+
+    def stop(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+qr_render_pool = QRRenderPool()
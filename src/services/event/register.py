@@ -0,0 +1,291 @@
+# src/services/event/register.py
+import asyncio
+import logging
+import time
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException
+
+from src.core.config.app import settings
+from src.core.config.database import db
+from src.services.archive.service import ArchiveService
+from src.services.event.register_renderer import register_render_pool
+from src.services.realtime.pubsub import pubsub_hub
+
+logger = logging.getLogger("shagunpe")
+
+# A register in one of these will change without a new request
+IN_PROGRESS = ("pending", "rendering")
+
+
+class EventRegisterService:
+    """Printable PDF registers, rendered by a background job
+
+    A register is kept per event version (its shagun count), so asking
+    again before new shaguns arrive returns the stored document.
+    """
+
+    def __init__(self):
+        self.archive_service = ArchiveService()
+
+    @staticmethod
+    def _topic(event_id) -> str:
+        return f"event:{event_id}:register"
+
+    @staticmethod
+    def download_url(event_id, version: int) -> str:
+        return (
+            f"{settings.BASE_URL}{settings.API_V1_PREFIX}/events/events/"
+            f"{event_id}/register.pdf?v={version}"
+        )
+
+    async def _owned_event(self, conn, event_id: str, user_id: str):
+        event = await conn.fetchrow(
+            """
+            SELECT id, transaction_count
+            FROM events
+            WHERE id = $1 AND creator_id = $2
+            """,
+            event_id,
+            user_id,
+        )
+        if not event:
+            raise HTTPException(status_code=404, detail="Event not found")
+        return event
+
+    def _status(self, event_id, row) -> Dict:
+        status = {
+            "event_id": str(event_id),
+            "version": row["version"],
+            "status": row["status"],
+            "pages": row["pages"],
+            "download_url": None,
+        }
+        if row["status"] == "ready":
+            status["download_url"] = self.download_url(event_id, row["version"])
+        return status
+
+    async def request(self, event_id: str, user_id: str) -> Dict:
+        """Queue the register for the event as it is now, unless already there"""
+        async with db.pool.acquire() as conn:
+            event = await self._owned_event(conn, event_id, user_id)
+            # A failed render is retried when asked for again
+            row = await conn.fetchrow(
+                """
+                INSERT INTO event_registers AS r (event_id, version)
+                VALUES ($1, $2)
+                ON CONFLICT (event_id, version) DO UPDATE
+                SET status = CASE WHEN r.status = 'failed'
+                                  THEN 'pending' ELSE r.status END,
+                    attempts = CASE WHEN r.status = 'failed'
+                                    THEN 0 ELSE r.attempts END
+                RETURNING version, status, pages
+                """,
+                event["id"],
+                event["transaction_count"],
+            )
+        return self._status(event_id, row)
+
+    async def get_status(self, event_id: str, user_id: str) -> Dict:
+        """The current version's register; status "none" if not requested"""
+        async with db.pool.acquire() as conn:
+            event = await self._owned_event(conn, event_id, user_id)
+            row = await conn.fetchrow(
+                """
+                SELECT version, status, pages
+                FROM event_registers
+                WHERE event_id = $1 AND version = $2
+                """,
+                event["id"],
+                event["transaction_count"],
+            )
+        if not row:
+            row = {
+                "version": event["transaction_count"],
+                "status": "none",
+                "pages": None,
+            }
+        return self._status(event_id, row)
+
+    async def wait(self, event_id: str, user_id: str, timeout: float) -> Dict:
+        """Long-poll: return once the register is no longer being rendered"""
+        async with pubsub_hub.subscribe(self._topic(event_id)) as queue:
+            # Read after subscribing so a completion in between is not missed
+            status = await self.get_status(event_id, user_id)
+            if status["status"] not in IN_PROGRESS:
+                return status
+            try:
+                await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                return status
+        return await self.get_status(event_id, user_id)
+
+    async def get_pdf(self, event_id: str, user_id: str) -> Optional[Tuple[int, bytes]]:
+        """(version, PDF) of the current version's register, if ready"""
+        async with db.pool.acquire() as conn:
+            event = await self._owned_event(conn, event_id, user_id)
+            row = await conn.fetchrow(
+                """
+                SELECT version, content
+                FROM event_registers
+                WHERE event_id = $1 AND version = $2 AND status = 'ready'
+                """,
+                event["id"],
+                event["transaction_count"],
+            )
+        return (row["version"], row["content"]) if row else None
+
+    async def _fail_lost(self):
+        """Fail renders that lost their worker on the last attempt
+
+        The queue below retries a lost render only while attempts remain;
+        without this the register would stay "rendering" and its waiters
+        would never hear back.
+        """
+        async with db.pool.acquire() as conn:
+            lost = await conn.fetch(
+                """
+                UPDATE event_registers
+                SET status = 'failed',
+                    last_error = 'Render lost its worker'
+                WHERE status = 'rendering'
+                AND started_at < NOW() - make_interval(secs => $1)
+                AND attempts >= $2
+                RETURNING event_id
+                """,
+                settings.REGISTER_STALE_SECONDS,
+                settings.REGISTER_MAX_ATTEMPTS,
+            )
+        for row in lost:
+            logger.error(f"Register for event {row['event_id']} lost its worker")
+            await pubsub_hub.publish(
+                self._topic(row["event_id"]), {"status": "failed"}
+            )
+
+    async def render_pending(self) -> int:
+        """Scheduled job: render queued registers one at a time"""
+        await self._fail_lost()
+        rendered = 0
+        while True:
+            async with db.pool.acquire() as conn:
+                # A render that outlived REGISTER_STALE_SECONDS lost its worker
+                job = await conn.fetchrow(
+                    """
+                    UPDATE event_registers r
+                    SET status = 'rendering',
+                        started_at = NOW(),
+                        attempts = r.attempts + 1
+                    WHERE r.id = (
+                        SELECT id
+                        FROM event_registers
+                        WHERE (
+                            status = 'pending'
+                            OR (status = 'rendering'
+                                AND started_at < NOW() - make_interval(secs => $1))
+                        )
+                        AND attempts < $2
+                        ORDER BY id
+                        LIMIT 1
+                        FOR UPDATE SKIP LOCKED
+                    )
+                    RETURNING r.id, r.event_id, r.version, r.attempts
+                    """,
+                    settings.REGISTER_STALE_SECONDS,
+                    settings.REGISTER_MAX_ATTEMPTS,
+                )
+            if not job:
+                return rendered
+            await self._render(job)
+            rendered += 1
+
+    async def _render(self, job):
+        started = time.monotonic()
+        try:
+            header, rows = await self._load(job["event_id"])
+            content, pages = await register_render_pool.render(header, rows)
+        except Exception as e:
+            logger.error(f"Register for event {job['event_id']} failed: {str(e)}")
+            final = job["attempts"] >= settings.REGISTER_MAX_ATTEMPTS
+            async with db.pool.acquire() as conn:
+                await conn.execute(
+                    """
+                    UPDATE event_registers
+                    SET status = $2, last_error = $3
+                    WHERE id = $1
+                    """,
+                    job["id"],
+                    "failed" if final else "pending",
+                    str(e),
+                )
+            if final:
+                await pubsub_hub.publish(
+                    self._topic(job["event_id"]), {"status": "failed"}
+                )
+            return
+
+        async with db.pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(
+                    """
+                    UPDATE event_registers
+                    SET status = 'ready',
+                        content = $2,
+                        pages = $3,
+                        completed_at = NOW()
+                    WHERE id = $1
+                    """,
+                    job["id"],
+                    content,
+                    pages,
+                )
+                # Superseded: nobody can download an older version
+                await conn.execute(
+                    """
+                    DELETE FROM event_registers
+                    WHERE event_id = $1
+                    AND version < $2
+                    AND status IN ('ready', 'failed')
+                    """,
+                    job["event_id"],
+                    job["version"],
+                )
+
+        await pubsub_hub.publish(
+            self._topic(job["event_id"]),
+            {"status": "ready", "version": job["version"]},
+        )
+        logger.info(
+            f"Rendered {pages}-page register for event {job['event_id']} "
+            f"({len(rows)} shaguns) in {time.monotonic() - started:.1f}s"
+        )
+
+    async def _load(self, event_id) -> Tuple[Dict, list]:
+        """Event header and (name, village, amount) rows, oldest first"""
+        async with db.pool.acquire() as conn:
+            event = await conn.fetchrow(
+                """
+                SELECT event_name, event_date, village, shagun_id, total_amount,
+                       created_at, archived_at
+                FROM events
+                WHERE id = $1
+                """,
+                event_id,
+            )
+            table = self.archive_service.transactions_table(event["archived_at"])
+            rows = await conn.fetch(
+                f"""
+                SELECT t.sender_name, t.address, t.amount
+                FROM {table} t
+                WHERE t.event_id = $1
+                AND t.status = 'completed'
+                AND t.created_at >= $2
+                ORDER BY t.created_at
+                """,
+                event_id,
+                event["created_at"],
+            )
+        # Plain tuples: records don't pickle to the worker
+        return dict(event), [tuple(row) for row in rows]
+
+
+event_register_service = EventRegisterService()
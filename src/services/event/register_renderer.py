@@ -0,0 +1,218 @@
+# src/services/event/register_renderer.py
+import asyncio
+import logging
+import math
+import multiprocessing
+import os
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.core.config.app import settings
+from src.utils.pdf import MM, PDFWriter
+from src.utils.pdf_text import EmbeddedFont, TextStyle
+
+logger = logging.getLogger("shagunpe")
+
+FONT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "assets",
+    "fonts",
+)
+
+A4 = (210 * MM, 297 * MM)
+MARGIN = 40
+FONT_SIZE = 9
+ROW_HEIGHT = 15
+TITLE_HEIGHT = 60  # Event details above the table on the first page
+# Column left edges; amounts are right-aligned to the page margin
+COLUMNS = {"number": MARGIN, "name": MARGIN + 40, "village": MARGIN + 270}
+NAME_WIDTH = 220
+VILLAGE_WIDTH = 150
+VIRAMA = "\u094d"
+
+
+def format_inr(amount) -> str:
+    """Rupees with Indian digit grouping, e.g. 12,34,567.00"""
+    rupees, paise = f"{Decimal(amount):.2f}".split(".")
+    sign = "-" if rupees.startswith("-") else ""
+    rupees = rupees.lstrip("-")
+    if len(rupees) > 3:
+        head, tail = rupees[:-3], rupees[-3:]
+        groups = []
+        while len(head) > 2:
+            groups.insert(0, head[-2:])
+            head = head[:-2]
+        if head:
+            groups.insert(0, head)
+        rupees = ",".join(groups) + "," + tail
+    return f"{sign}Rs. {rupees}.{paise}"
+
+
+def _styles() -> Tuple[TextStyle, TextStyle]:
+    """Regular and bold: Noto Sans, with Devanagari from Noto Serif Devanagari"""
+
+    def font(filename: str, name: str) -> EmbeddedFont:
+        return EmbeddedFont(os.path.join(FONT_DIR, filename), name)
+
+    devanagari = font("NotoSerifDevanagari-Regular.ttf", "F3")
+    return (
+        TextStyle(font("NotoSans-Regular.ttf", "F1"), devanagari),
+        TextStyle(font("NotoSans-Bold.ttf", "F2"), devanagari),
+    )
+
+
+def _fit(style: TextStyle, text: str, size: float, width: float) -> str:
+    """text, cut short with an ellipsis if wider than width
+
+    Cuts only between whole syllables: never before a vowel sign or other
+    combining mark, nor after a virama.
+    """
+    if style.width(text, size) <= width:
+        return text
+    while text:
+        text = text[:-1]
+        while text and (
+            unicodedata.category(text[-1]).startswith("M") or text[-1] == VIRAMA
+        ):
+            text = text[:-1]
+        if style.width(text + "...", size) <= width:
+            break
+    return text.rstrip() + "..."
+
+
+def _right(style: TextStyle, x: float, y: float, text: str, size: float = FONT_SIZE):
+    return style.show(x - style.width(text, size), y, text, size)
+
+
+def _band(y: float, width: float, gray: float) -> str:
+    """Shaded background behind the row whose text sits at y"""
+    box = f"{MARGIN} {y - 4:.2f} {width - 2 * MARGIN:.2f} {ROW_HEIGHT}"
+    return f"{gray} g {box} re f 0 g"
+
+
+def _table_header(ops: List[str], bold: TextStyle, y: float, width: float):
+    ops.append(_band(y, width, 0.85))
+    ops.append(_right(bold, COLUMNS["name"] - 10, y, "#"))
+    ops.append(bold.show(COLUMNS["name"], y, "Name", FONT_SIZE))
+    ops.append(bold.show(COLUMNS["village"], y, "Village", FONT_SIZE))
+    ops.append(_right(bold, width - MARGIN, y, "Amount"))
+
+
+def render_register(header: Dict, rows: Sequence[Tuple]) -> Tuple[bytes, int]:
+    """Runs in a worker: (PDF bytes, page count) of an event's shagun register
+
+    header has the event's name, date, shagun_id and total; rows are
+    (sender_name, address, amount) in register order. Names and villages
+    print in Latin or Devanagari script.
+    """
+    width, height = A4
+    top = height - MARGIN
+    per_page = int((height - 2 * MARGIN - 2 * ROW_HEIGHT) // ROW_HEIGHT)
+    first_page = per_page - math.ceil(TITLE_HEIGHT / ROW_HEIGHT)
+    # The totals line needs a row of its own
+    pages = 1 + max(0, math.ceil((len(rows) + 1 - first_page) / per_page))
+
+    pdf = PDFWriter()
+    regular, bold = _styles()
+    fonts = {
+        font.name: font.reference(pdf) for font in regular.fonts + bold.fonts
+    }
+    generated = date.today().strftime("%d %b %Y")
+
+    start = 0
+    for page in range(1, pages + 1):
+        ops = []
+        y = top
+        if page == 1:
+            title = _fit(bold, header["event_name"], 16, width - 2 * MARGIN)
+            ops.append(bold.show(MARGIN, y - 16, title, 16))
+            details = " | ".join(
+                part
+                for part in (
+                    header["event_date"].strftime("%d %b %Y"),
+                    header.get("village"),
+                    f"Shagun ID {header['shagun_id']}",
+                    f"{len(rows)} shaguns",
+                    f"Total {format_inr(header['total_amount'])}",
+                )
+                if part
+            )
+            details = _fit(regular, details, 10, width - 2 * MARGIN)
+            ops.append(regular.show(MARGIN, y - 36, details, 10))
+            y -= TITLE_HEIGHT
+            count = first_page
+        else:
+            count = per_page
+
+        y -= ROW_HEIGHT
+        _table_header(ops, bold, y, width)
+        for i, (name, village, amount) in enumerate(rows[start : start + count]):
+            y -= ROW_HEIGHT
+            if i % 2:
+                ops.append(_band(y, width, 0.95))
+            name = _fit(regular, name or "", FONT_SIZE, NAME_WIDTH)
+            village = _fit(regular, village or "", FONT_SIZE, VILLAGE_WIDTH)
+            ops.append(_right(regular, COLUMNS["name"] - 10, y, str(start + i + 1)))
+            ops.append(regular.show(COLUMNS["name"], y, name, FONT_SIZE))
+            ops.append(regular.show(COLUMNS["village"], y, village, FONT_SIZE))
+            ops.append(_right(regular, width - MARGIN, y, format_inr(amount)))
+        start += count
+
+        if page == pages:
+            y -= ROW_HEIGHT
+            rule = y + ROW_HEIGHT - 4
+            ops.append(f"{MARGIN} {rule:.2f} m {width - MARGIN:.2f} {rule:.2f} l S")
+            ops.append(bold.show(COLUMNS["name"], y, "Total", FONT_SIZE))
+            total = format_inr(header["total_amount"])
+            ops.append(_right(bold, width - MARGIN, y, total))
+
+        footer = MARGIN - 20
+        generated_by = f"Generated {generated} by ShagunPe"
+        ops.append(regular.show(MARGIN, footer, generated_by, 8))
+        page_of = f"Page {page} of {pages}"
+        ops.append(_right(regular, width - MARGIN, footer, page_of, 8))
+        pdf.add_page(width, height, "\n".join(ops).encode(), fonts=fonts)
+
+    for font in {font.name: font for font in regular.fonts + bold.fonts}.values():
+        font.embed(pdf)
+    return pdf.output(), pages
+
+
+class RegisterRenderPool:
+    """Renders registers in a worker process, off the event loop"""
+
+    def __init__(self):
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        # spawn: forking a process with a running loop and threads is unsafe
+        return ProcessPoolExecutor(
+            max_workers=settings.REGISTER_RENDER_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    async def render(self, header: Dict, rows: Sequence[Tuple]) -> Tuple[bytes, int]:
+        # Started on first use: most workers never render a register
+        if self._executor is None:
+            self._executor = self._create_executor()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, render_register, header, rows
+            )
+        except BrokenProcessPool:
+            logger.error("Register render pool broken, restarting it")
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._create_executor()
+            raise
+
+    def stop(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+register_render_pool = RegisterRenderPool()
@@ -1,20 +1,56 @@
 # services/event/service.py
+from datetime import date
+from typing import Optional
+from uuid import UUID
 from fastapi import HTTPException, BackgroundTasks
+from src.cache.manager import NOT_FOUND, cache_manager
 from src.core.config.database import db
 from src.db.models.event import EventCreate
 from src.services.event.event_processor import EventProcessor
 from src.services.event.qr_generator import EventQRGenerator
+from src.utils.helpers import decode_cursor, encode_cursor
+from src.utils.validators import normalize_shagun_id
 import shortuuid
 import logging
 
 logger = logging.getLogger("shagunpe")
 
+# Everything the API returns about an event; the QR image itself is served
+# separately by hash
+EVENT_COLUMNS = """
+    e.id, e.creator_id, e.event_name, e.guardian_name, e.event_date,
+    e.village, e.location, e.shagun_id, e.total_amount, e.online_amount,
+    e.cash_amount, e.status, e.transaction_count, e.qr_sha256, e.created_at,
+    e.updated_at
+"""
+
+# What the events listing shows per event
+EVENT_LIST_COLUMNS = """
+    e.id, e.event_name, e.event_date, e.village, e.location, e.shagun_id,
+    COALESCE(e.status, 'active') as status, e.total_amount, e.transaction_count,
+    e.qr_sha256
+"""
+
+# Listing scope: (filter, sort direction); upcoming includes today
+EVENT_LIST_SCOPES = {
+    "all": ("", "DESC"),
+    "upcoming": ("AND e.event_date >= CURRENT_DATE", "ASC"),
+    "past": ("AND e.event_date < CURRENT_DATE", "DESC"),
+}
+
 
 class EventService:
     def __init__(self):
         self.qr_generator = EventQRGenerator()
         self.event_processor = EventProcessor()
 
+    def _with_qr_url(self, event) -> dict:
+        event = dict(event)
+        event["qr_code_url"] = self.qr_generator.qr_url(
+            event["id"], event.pop("qr_sha256", None)
+        )
+        return event
+
     async def create_event(
         self,
         event_data: EventCreate,
@@ -27,12 +63,12 @@ class EventService:
                 shagun_id = f"SG{shortuuid.uuid()[:8].upper()}"
 
                 event = await conn.fetchrow(
-                    """
-                    INSERT INTO events 
-                    (creator_id, event_name, guardian_name, event_date, 
+                    f"""
+                    INSERT INTO events AS e
+                    (creator_id, event_name, guardian_name, event_date,
                      village, location, shagun_id)
                     VALUES ($1, $2, $3, $4, $5, $6, $7)
-                    RETURNING *
+                    RETURNING {EVENT_COLUMNS}
                     """,
                     user_id,
                     event_data.event_name,
@@ -43,50 +79,84 @@ class EventService:
                     shagun_id,
                 )
 
-                if background_tasks:
-                    background_tasks.add_task(
-                        self.event_processor.process_new_event, dict(event)
-                    )
-                else:
-                    await self.qr_generator.generate_and_store(dict(event))
+            # A scan of the new code moments ago may have been cached as a miss
+            await cache_manager.forget_event_header(shagun_id)
+
+            # Rendered without holding a pooled connection
+            event = dict(event)
+            if background_tasks:
+                background_tasks.add_task(
+                    self.event_processor.process_new_event, dict(event)
+                )
+            else:
+                event["qr_sha256"] = await self.qr_generator.generate_and_store(
+                    event
+                )
 
-                return dict(event)
+            return self._with_qr_url(event)
 
         except Exception as e:
             logger.error(f"Error creating event: {str(e)}")
             raise HTTPException(status_code=500, detail="Error creating event")
 
-    async def get_events(self, user_id: str):
+    async def get_events(
+        self,
+        user_id: str,
+        scope: str = "all",
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ):
+        """A page of the user's events, keyset-paginated on (event_date, id)
+
+        Each page is one index range scan, however many events the user has.
+        """
+        where, direction = EVENT_LIST_SCOPES[scope]
+        params = [user_id]
+        if cursor:
+            try:
+                after_date, after_id = decode_cursor(cursor)
+                params += [date.fromisoformat(after_date), UUID(after_id)]
+            except (TypeError, ValueError):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            after = ">" if direction == "ASC" else "<"
+            where += f" AND (e.event_date, e.id) {after} ($2, $3)"
+
         try:
             async with db.pool.acquire() as conn:
                 events = await conn.fetch(
-                    """
-                    SELECT e.*, u.name as creator_name
+                    f"""
+                    SELECT {EVENT_LIST_COLUMNS}
                     FROM events e
-                    LEFT JOIN users u ON e.creator_id = u.id
-                    WHERE e.creator_id = $1
-                    ORDER BY e.event_date DESC
+                    WHERE e.creator_id = $1 {where}
+                    ORDER BY e.event_date {direction}, e.id {direction}
+                    LIMIT {limit + 1}
                     """,
-                    user_id,
+                    *params,
                 )
-                return [dict(event) for event in events]
         except Exception as e:
             logger.error(f"Error fetching events: {str(e)}")
             raise HTTPException(status_code=500, detail="Error fetching events")
 
+        # One extra row tells whether there is a next page
+        next_cursor = None
+        if len(events) > limit:
+            events = events[:limit]
+            next_cursor = encode_cursor([events[-1]["event_date"], events[-1]["id"]])
+        return {
+            "items": [self._with_qr_url(event) for event in events],
+            "next_cursor": next_cursor,
+        }
+
     async def get_event(self, event_id: str, user_id: str):
         try:
             async with db.pool.acquire() as conn:
                 event = await conn.fetchrow(
-                    """
-                    SELECT e.*, u.name as creator_name,
-                           COUNT(DISTINCT t.id) as transaction_count,
-                           COALESCE(SUM(t.amount), 0) as total_received
+                    f"""
+                    SELECT {EVENT_COLUMNS}, u.name as creator_name,
+                           e.total_amount as total_received
                     FROM events e
                     LEFT JOIN users u ON e.creator_id = u.id
-                    LEFT JOIN transactions t ON e.id = t.event_id
                     WHERE e.id = $1 AND e.creator_id = $2
-                    GROUP BY e.id, u.name
                     """,
                     event_id,
                     user_id,
@@ -95,13 +165,26 @@ class EventService:
                 if not event:
                     raise HTTPException(status_code=404, detail="Event not found")
 
-                return dict(event)
+                return self._with_qr_url(event)
 
         except Exception as e:
             logger.error(f"Error fetching event: {str(e)}")
             raise HTTPException(status_code=500, detail="Error fetching event")
 
-    async def get_event_by_shagun_id(self, shagun_id: str):
+    async def get_event_by_shagun_id(self, shagun_id: str, refresh: bool = False):
+        # What every guest scanning the event's QR asks for. Malformed codes
+        # never reach the database, unknown ones only once per negative TTL.
+        normalized = normalize_shagun_id(shagun_id)
+        if not normalized:
+            raise HTTPException(status_code=404, detail="Event not found")
+
+        if not refresh:
+            cached = await cache_manager.get_event_header(normalized)
+            if cached == NOT_FOUND:
+                raise HTTPException(status_code=404, detail="Event not found")
+            if cached:
+                return cached
+
         try:
             async with db.pool.acquire() as conn:
                 event = await conn.fetchrow(
@@ -115,16 +198,17 @@ class EventService:
                         COALESCE(status, 'active') as status,
                         created_at
                     FROM events 
-                    WHERE LOWER(shagun_id) = LOWER($1)
+                    WHERE shagun_id = $1
                     """,
-                    shagun_id,
+                    normalized,
                 )
-
-                if not event:
-                    raise HTTPException(status_code=404, detail="Event not found")
-
-                return dict(event)
-
         except Exception as e:
             logger.error(f"Error fetching event by shagun_id: {str(e)}")
             raise HTTPException(status_code=500, detail=str(e))
+
+        await cache_manager.set_event_header(
+            normalized, dict(event) if event else None
+        )
+        if not event:
+            raise HTTPException(status_code=404, detail="Event not found")
+        return dict(event)
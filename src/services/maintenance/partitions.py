@@ -0,0 +1,21 @@
+# src/services/maintenance/partitions.py
+import logging
+
+from src.core.config.app import settings
+from src.core.config.database import db
+
+logger = logging.getLogger("shagunpe")
+
+
+class PartitionMaintenance:
+    async def ensure_transaction_partitions(self) -> int:
+        """Create monthly transaction partitions ahead of time"""
+        async with db.pool.acquire() as conn:
+            created = await conn.fetchval(
+                "SELECT create_transactions_partitions($1)",
+                settings.TRANSACTION_PARTITIONS_AHEAD,
+            )
+
+        if created:
+            logger.info(f"Created {created} transaction partitions")
+        return created
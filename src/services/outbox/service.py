@@ -0,0 +1,209 @@
+# src/services/outbox/service.py
+from collections import defaultdict
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Tuple
+from uuid import UUID
+import json
+import logging
+
+from src.cache.redis import redis_client
+from src.core.config.app import settings
+from src.core.config.database import db
+
+logger = logging.getLogger("shagunpe")
+
+# Topics
+SHAGUN_COMPLETED = "shagun.completed"
+SHAGUN_FAILED = "shagun.failed"
+TRANSACTION_CREATED = "transaction.created"
+PAYMENT_STATUS_CHANGED = "payment.status_changed"
+
+# Shagun payload built inside SQL, for writes done as a single statement
+SHAGUN_PAYLOAD_SQL = """
+    jsonb_build_object(
+        'transaction_id', {t}.id,
+        'event_id', {t}.event_id,
+        'amount', {t}.amount,
+        'type', {t}.type,
+        'status', {t}.status,
+        'sender_name', {t}.sender_name,
+        'address', {t}.address,
+        'created_at', {t}.created_at
+    )
+"""
+
+
+class OutboxService:
+    async def enqueue(self, conn, topic: str, aggregate_id: UUID, payload: Dict):
+        """Record an event in the caller's transaction"""
+        await conn.execute(
+            """
+            INSERT INTO outbox (topic, aggregate_id, payload)
+            VALUES ($1, $2, $3)
+            """,
+            topic,
+            aggregate_id,
+            json.dumps(payload, default=str),
+        )
+
+    async def enqueue_shagun(
+        self, conn, topic: str, transaction_id: UUID, created_at: datetime
+    ):
+        """Record a shagun event carrying the transaction's current state"""
+        await conn.execute(
+            f"""
+            INSERT INTO outbox (topic, aggregate_id, payload)
+            SELECT $1, t.id, {SHAGUN_PAYLOAD_SQL.format(t="t")}
+            FROM transactions t
+            WHERE t.id = $2 AND t.created_at = $3
+            """,
+            topic,
+            transaction_id,
+            created_at,
+        )
+
+    async def enqueue_many(self, conn, topic: str, entries: List[Tuple[UUID, Dict]]):
+        """Record several events of one topic with a single statement"""
+        if not entries:
+            return
+        await conn.execute(
+            """
+            INSERT INTO outbox (topic, aggregate_id, payload)
+            SELECT $1, e.aggregate_id, e.payload::jsonb
+            FROM unnest($2::uuid[], $3::text[])
+                WITH ORDINALITY AS e(aggregate_id, payload, position)
+            ORDER BY e.position
+            """,
+            topic,
+            [aggregate_id for aggregate_id, _ in entries],
+            [json.dumps(payload, default=str) for _, payload in entries],
+        )
+
+    async def enqueue_shagun_many(
+        self, conn, transactions: List[Tuple[UUID, datetime]]
+    ):
+        """Record completed/failed shagun events for (id, created_at) pairs"""
+        if not transactions:
+            return
+        await conn.execute(
+            f"""
+            INSERT INTO outbox (topic, aggregate_id, payload)
+            SELECT CASE t.status WHEN 'completed' THEN $1 ELSE $2 END,
+                   t.id, {SHAGUN_PAYLOAD_SQL.format(t="t")}
+            FROM unnest($3::uuid[], $4::timestamptz[])
+                WITH ORDINALITY AS k(id, created_at, position)
+            INNER JOIN transactions t
+                ON t.id = k.id AND t.created_at = k.created_at
+            WHERE t.status IN ('completed', 'failed')
+            ORDER BY k.position
+            """,
+            SHAGUN_COMPLETED,
+            SHAGUN_FAILED,
+            [transaction_id for transaction_id, _ in transactions],
+            [created_at for _, created_at in transactions],
+        )
+
+
+class OutboxRelay:
+    """Publishes committed outbox rows to consumers, at least once"""
+
+    def __init__(self):
+        self._consumers: Dict[str, List[Callable[[Dict], Awaitable]]] = defaultdict(
+            list
+        )
+
+    def subscribe(self, topic: str, consumer: Callable[[Dict], Awaitable]):
+        self._consumers[topic].append(consumer)
+
+    async def drain(self) -> int:
+        """Publish pending rows until a batch comes back short"""
+        published = 0
+        while True:
+            count = await self.publish_batch()
+            published += count
+            if count < settings.OUTBOX_BATCH_SIZE:
+                return published
+
+    async def publish_batch(self) -> int:
+        async with db.pool.acquire() as conn:
+            async with conn.transaction():
+                # SKIP LOCKED lets every worker run the relay concurrently
+                rows = await conn.fetch(
+                    """
+                    SELECT id, topic, aggregate_id, payload, created_at
+                    FROM outbox
+                    WHERE published_at IS NULL
+                    AND attempts < $2
+                    ORDER BY id
+                    LIMIT $1
+                    FOR UPDATE SKIP LOCKED
+                    """,
+                    settings.OUTBOX_BATCH_SIZE,
+                    settings.OUTBOX_MAX_ATTEMPTS,
+                )
+                if not rows:
+                    return 0
+
+                published, failed, errors = [], [], []
+                for row in rows:
+                    try:
+                        await self._publish(row)
+                        published.append(row["id"])
+                    except Exception as e:
+                        logger.error(f"Outbox event {row['id']} failed: {str(e)}")
+                        failed.append(row["id"])
+                        errors.append(str(e))
+
+                if published:
+                    await conn.execute(
+                        "UPDATE outbox SET published_at = NOW() WHERE id = ANY($1)",
+                        published,
+                    )
+                if failed:
+                    await conn.execute(
+                        """
+                        UPDATE outbox o
+                        SET attempts = attempts + 1,
+                            last_error = f.error
+                        FROM unnest($1::bigint[], $2::text[]) AS f(id, error)
+                        WHERE o.id = f.id
+                        """,
+                        failed,
+                        errors,
+                    )
+
+                return len(published)
+
+    async def purge_published(self) -> int:
+        """Delete rows published longer ago than the retention window"""
+        async with db.pool.acquire() as conn:
+            status = await conn.execute(
+                """
+                DELETE FROM outbox
+                WHERE published_at < NOW() - make_interval(hours => $1)
+                """,
+                settings.OUTBOX_RETENTION_HOURS,
+            )
+        return int(status.split()[-1])
+
+    async def _publish(self, row):
+        event = {
+            "id": row["id"],
+            "topic": row["topic"],
+            "aggregate_id": str(row["aggregate_id"]),
+            "payload": json.loads(row["payload"]),
+            "created_at": row["created_at"].isoformat(),
+        }
+
+        for consumer in self._consumers.get(row["topic"], []):
+            await consumer(event)
+
+        if settings.OUTBOX_REDIS_STREAM:
+            await redis_client.xadd(
+                settings.OUTBOX_REDIS_STREAM,
+                {"event": json.dumps(event)},
+                maxlen=settings.OUTBOX_REDIS_STREAM_MAXLEN,
+            )
+
+
+outbox_relay = OutboxRelay()
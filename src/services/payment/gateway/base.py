@@ -1,19 +1,54 @@
 # src/services/payment/gateway/base.py
 from abc import ABC, abstractmethod
-from typing import Dict
+from typing import Dict, Iterable
+
+
+def order_status(payment_statuses: Iterable[str]) -> str:
+    """Order status from the statuses of its payment attempts"""
+    statuses = set(payment_statuses)
+    if "captured" in statuses:
+        return "paid"
+    if "authorized" in statuses:
+        return "authorized"
+    if statuses == {"failed"}:
+        return "attempted"
+    # No attempt yet, or one still in progress
+    return "created"
 
 
 class PaymentGateway(ABC):
     @abstractmethod
-    async def initialize_payment(
+    async def create_payment(
         self, amount: float, transaction_id: str, metadata: Dict
     ) -> Dict:
+        """Create an order and return what the frontend needs to pay it"""
+        pass
+
+    @abstractmethod
+    async def verify_signature(self, payment_data: Dict) -> bool:
+        """Check the checkout signature sent back by the frontend"""
         pass
 
     @abstractmethod
-    async def verify_payment(self, payment_id: str) -> Dict:
+    async def get_payment_details(self, payment_id: str) -> Dict:
         pass
 
     @abstractmethod
-    async def process_webhook(self, payload: Dict) -> Dict:
+    async def fetch_order(self, order_id: str) -> Dict:
+        """Order state as {"order_id", "status", "payments"}
+
+        status is one of created (no attempt yet), attempted (every attempt
+        failed), authorized (awaiting capture) or paid.
+        """
+        pass
+
+    def is_available(self) -> bool:
+        """Whether new payments can be started right now"""
+        return True
+
+    def status(self) -> Dict:
+        return {"available": self.is_available()}
+
+    async def close(self):
+        """Release network resources held by the gateway"""
         pass
@@ -0,0 +1,170 @@
+# src/services/payment/gateway/breaker.py
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, Tuple, Type
+
+from src.core.config.app import settings
+from src.core.errors.payment import PaymentGatewayUnavailableError
+
+logger = logging.getLogger("shagunpe")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Per-worker circuit breaker and bulkhead around gateway calls
+
+    Closed: calls flow, outcomes go into a rolling window. Once the window
+    holds enough calls and the share of failed or slow ones crosses the
+    threshold, the breaker opens and calls fail fast. After a cool-down it
+    goes half-open and lets a few trial calls through; if they all succeed
+    it closes again, any failure reopens it.
+    """
+
+    def __init__(self, name: str, failure_exceptions: Tuple[Type[Exception], ...]):
+        self.name = name
+        self.failure_exceptions = failure_exceptions
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self._outcomes = deque(maxlen=settings.GATEWAY_BREAKER_WINDOW)
+        self._trials_started = 0
+        self._trials_passed = 0
+        self._in_flight = 0
+        self._rejected = 0
+        self._bulkhead = asyncio.Semaphore(settings.GATEWAY_MAX_CONCURRENCY)
+
+    def is_available(self) -> bool:
+        """Whether a call made now would be let through"""
+        self._maybe_half_open()
+        if self.state == OPEN:
+            return False
+        if self.state == HALF_OPEN:
+            return self._trials_started < settings.GATEWAY_BREAKER_HALF_OPEN_CALLS
+        return True
+
+    def ensure_available(self):
+        if not self.is_available():
+            self._rejected += 1
+            raise PaymentGatewayUnavailableError(retry_after=self._retry_after())
+
+    @asynccontextmanager
+    async def call(self):
+        self.ensure_available()
+
+        # Bulkhead: wait briefly for a slot, then shed load instead of queueing
+        try:
+            await asyncio.wait_for(
+                self._bulkhead.acquire(), timeout=settings.GATEWAY_QUEUE_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            self._rejected += 1
+            logger.warning(f"{self.name} bulkhead full, rejecting call")
+            raise PaymentGatewayUnavailableError(retry_after=1)
+
+        # The state may have changed while waiting for a slot
+        if not self.is_available():
+            self._bulkhead.release()
+            self.ensure_available()
+        trial = self.state == HALF_OPEN
+        if trial:
+            self._trials_started += 1
+
+        self._in_flight += 1
+        started = time.monotonic()
+        failed = cancelled = False
+        try:
+            yield
+        except self.failure_exceptions:
+            failed = True
+            raise
+        except asyncio.CancelledError:
+            # A client gone or a worker stopping says nothing about the
+            # gateway: no outcome, and a trial's place goes to the next call
+            if trial and self.state == HALF_OPEN:
+                self._trials_started -= 1
+            cancelled = True
+            raise
+        finally:
+            self._in_flight -= 1
+            self._bulkhead.release()
+            if not cancelled:
+                slow = (
+                    time.monotonic() - started
+                    > settings.GATEWAY_BREAKER_SLOW_CALL_SECONDS
+                )
+                self._record(not (failed or slow), trial)
+
+    def _record(self, ok: bool, trial: bool):
+        if self.state == HALF_OPEN and trial:
+            if not ok:
+                self._open()
+                return
+            self._trials_passed += 1
+            if self._trials_passed >= settings.GATEWAY_BREAKER_HALF_OPEN_CALLS:
+                self._close()
+            return
+        if self.state != CLOSED:
+            # Late result of a call started before the breaker opened
+            return
+
+        self._outcomes.append(ok)
+        if (
+            len(self._outcomes) >= settings.GATEWAY_BREAKER_MIN_CALLS
+            and self._failure_rate() >= settings.GATEWAY_BREAKER_FAILURE_RATE
+        ):
+            self._open()
+
+    def _failure_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    def _maybe_half_open(self):
+        if (
+            self.state == OPEN
+            and time.monotonic() - self.opened_at >= settings.GATEWAY_BREAKER_OPEN_SECONDS
+        ):
+            self.state = HALF_OPEN
+            self._trials_started = 0
+            self._trials_passed = 0
+            logger.info(f"{self.name} circuit half-open, probing")
+
+    def _open(self):
+        logger.warning(
+            f"{self.name} circuit opened, failure rate {self._failure_rate():.0%}"
+        )
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self._outcomes.clear()
+
+    def _close(self):
+        logger.info(f"{self.name} circuit closed")
+        self.state = CLOSED
+        self._outcomes.clear()
+
+    def _retry_after(self) -> int:
+        if self.state != OPEN:
+            return 1
+        remaining = settings.GATEWAY_BREAKER_OPEN_SECONDS - (
+            time.monotonic() - self.opened_at
+        )
+        return max(1, int(remaining + 0.999))
+
+    def snapshot(self) -> Dict:
+        self._maybe_half_open()
+        return {
+            "name": self.name,
+            "state": self.state,
+            "available": self.is_available(),
+            "failure_rate": round(self._failure_rate(), 3),
+            "window_calls": len(self._outcomes),
+            "in_flight": self._in_flight,
+            "max_concurrency": settings.GATEWAY_MAX_CONCURRENCY,
+            "rejected": self._rejected,
+            "retry_after": self._retry_after() if self.state == OPEN else None,
+        }
@@ -0,0 +1,16 @@
+# src/services/payment/gateway/factory.py
+from src.core.config.app import settings
+from .base import PaymentGateway
+from .fake import FakeGateway
+from .razorpay import RazorpayGateway
+
+
+def create_gateway() -> PaymentGateway:
+    """Gateway selected by PAYMENT_GATEWAY"""
+    if settings.PAYMENT_GATEWAY == "fake":
+        return FakeGateway()
+    return RazorpayGateway()
+
+
+# One per worker so every caller shares the HTTP pool and circuit breaker
+payment_gateway = create_gateway()
@@ -0,0 +1,99 @@
+# src/services/payment/gateway/fake.py
+import hashlib
+import hmac
+import logging
+import uuid
+from typing import Dict
+
+from src.core.config.app import settings
+from src.core.errors.payment import PaymentError
+from .base import PaymentGateway, order_status
+
+logger = logging.getLogger("shagunpe")
+
+
+class FakeGateway(PaymentGateway):
+    """In-memory gateway for local runs and tests; no network calls
+
+    Orders are created unpaid. Tests drive them with pay(), authorize() and
+    fail(), and sign() produces the checkout signature the frontend would
+    send back.
+    """
+
+    def __init__(self, secret: str = "fake_secret"):
+        self.secret = secret
+        self.orders: Dict[str, Dict] = {}
+
+    async def create_payment(
+        self, amount: float, transaction_id: str, metadata: Dict
+    ) -> Dict:
+        order_id = f"order_fake{uuid.uuid4().hex[:14]}"
+        self.orders[order_id] = {
+            "amount": int(round(amount * 100)),
+            "receipt": str(transaction_id),
+            "payments": [],
+        }
+        return {
+            "gateway_payment_id": order_id,
+            "amount": amount,
+            "currency": "INR",
+            "status": "created",
+            "key": settings.RAZORPAY_KEY_ID,
+            "order_id": order_id,
+            "prefill": {
+                "name": metadata.get("sender_name", ""),
+                "contact": metadata.get("contact", ""),
+            },
+        }
+
+    def _attempt(self, order_id: str, status: str) -> str:
+        order = self.orders[order_id]
+        payment_id = f"pay_fake{uuid.uuid4().hex[:14]}"
+        order["payments"].append(
+            {
+                "id": payment_id,
+                "order_id": order_id,
+                "amount": order["amount"],
+                "status": status,
+            }
+        )
+        return payment_id
+
+    def pay(self, order_id: str) -> str:
+        return self._attempt(order_id, "captured")
+
+    def authorize(self, order_id: str) -> str:
+        return self._attempt(order_id, "authorized")
+
+    def fail(self, order_id: str) -> str:
+        return self._attempt(order_id, "failed")
+
+    def sign(self, order_id: str, payment_id: str) -> str:
+        return hmac.new(
+            self.secret.encode(), f"{order_id}|{payment_id}".encode(), hashlib.sha256
+        ).hexdigest()
+
+    async def verify_signature(self, payment_data: Dict) -> bool:
+        try:
+            expected = self.sign(
+                payment_data["razorpay_order_id"], payment_data["razorpay_payment_id"]
+            )
+            return hmac.compare_digest(expected, payment_data["razorpay_signature"])
+        except Exception as e:
+            logger.error(f"Payment signature verification failed: {str(e)}")
+            return False
+
+    async def get_payment_details(self, payment_id: str) -> Dict:
+        for order in self.orders.values():
+            for payment in order["payments"]:
+                if payment["id"] == payment_id:
+                    return payment
+        raise PaymentError("Failed to fetch payment details")
+
+    async def fetch_order(self, order_id: str) -> Dict:
+        order = self.orders.get(order_id)
+        if order is None:
+            raise PaymentError("Order not found")
+
+        status = order_status(payment["status"] for payment in order["payments"])
+        return {"order_id": order_id, "status": status, "payments": order["payments"]}
@@ -1,24 +1,129 @@
 # src/services/payment/gateway/razorpay.py
-import razorpay
+import asyncio
+import hashlib
+import hmac
+import logging
+from typing import Dict, Optional
+
+import httpx
+
 from src.core.errors.payment import PaymentError, PaymentGatewayError
 from src.core.config.app import settings
-from typing import Dict
-import logging
+from .base import PaymentGateway, order_status
+from .breaker import CircuitBreaker
 
 logger = logging.getLogger("shagunpe")
 
+# Worth retrying: Razorpay is overloaded or briefly down
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class RazorpayGateway(PaymentGateway):
+    """Razorpay REST client on a shared, pooled httpx.AsyncClient"""
 
-class RazorpayGateway:
     def __init__(self):
-        try:
-            # Initialize Razorpay client with your credentials
-            self.client = razorpay.Client(
-                auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET)
+        self._client: Optional[httpx.AsyncClient] = None
+        # Only outages trip the breaker; rejected requests (4xx) do not
+        self.breaker = CircuitBreaker("razorpay", (PaymentGatewayError,))
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Created lazily so the pool binds to the running event loop
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=settings.RAZORPAY_BASE_URL,
+                auth=(settings.RAZORPAY_KEY_ID or "", settings.RAZORPAY_KEY_SECRET or ""),
+                http2=settings.RAZORPAY_HTTP2,
+                timeout=httpx.Timeout(
+                    settings.RAZORPAY_TIMEOUT, connect=settings.RAZORPAY_CONNECT_TIMEOUT
+                ),
+                limits=httpx.Limits(
+                    max_connections=settings.RAZORPAY_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.RAZORPAY_MAX_CONNECTIONS,
+                    keepalive_expiry=60,
+                ),
             )
-            logger.info("Initialized Razorpay gateway")
-        except Exception as e:
-            logger.error(f"Failed to initialize Razorpay client: {str(e)}")
-            raise PaymentGatewayError("Payment gateway initialization failed")
+            logger.info(
+                f"Initialized Razorpay gateway at {settings.RAZORPAY_BASE_URL}"
+            )
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def is_available(self) -> bool:
+        return self.breaker.is_available()
+
+    def status(self) -> Dict:
+        return self.breaker.snapshot()
+
+    async def _request(
+        self, method: str, path: str, idempotent: bool, **kwargs
+    ) -> Dict:
+        async with self.breaker.call():
+            return await self._send(method, path, idempotent, **kwargs)
+
+    async def _send(self, method: str, path: str, idempotent: bool, **kwargs) -> Dict:
+        """Send a request, retrying transient failures with backoff
+
+        Non-idempotent calls are only retried when the request never left,
+        so a timed-out order creation is not sent twice.
+        """
+        attempt = 0
+        while True:
+            try:
+                response = await self.client.request(method, path, **kwargs)
+                if (
+                    response.status_code in RETRY_STATUSES
+                    and attempt < settings.RAZORPAY_MAX_RETRIES
+                    and (idempotent or response.status_code == 429)
+                ):
+                    raise httpx.HTTPStatusError(
+                        f"Razorpay returned {response.status_code}",
+                        request=response.request,
+                        response=response,
+                    )
+                break
+            except (httpx.HTTPStatusError, httpx.TransportError) as e:
+                retryable = isinstance(
+                    e, (httpx.HTTPStatusError, httpx.ConnectError, httpx.PoolTimeout)
+                ) or (idempotent and isinstance(e, httpx.TimeoutException))
+                if not retryable or attempt >= settings.RAZORPAY_MAX_RETRIES:
+                    logger.error(f"Razorpay {method} {path} failed: {str(e)}")
+                    raise PaymentGatewayError("Payment gateway unavailable")
+                attempt += 1
+                await asyncio.sleep(settings.RAZORPAY_RETRY_BACKOFF * 2 ** (attempt - 1))
+
+        if response.status_code >= 500:
+            logger.error(f"Razorpay {method} {path} returned {response.status_code}")
+            raise PaymentGatewayError("Payment gateway unavailable")
+        body = self._json(response)
+        if response.status_code >= 400:
+            error = body.get("error") if isinstance(body, dict) else None
+            if not isinstance(error, dict):
+                # Not Razorpay's error shape, e.g. a proxy's HTML page
+                error = {}
+            logger.error(
+                f"Razorpay {method} {path} rejected: "
+                f"{error.get('description', response.status_code)}"
+            )
+            raise PaymentError(error.get("description", "Payment gateway error"))
+        if not isinstance(body, dict):
+            logger.error(f"Razorpay {method} {path} returned a non-JSON body")
+            raise PaymentGatewayError("Payment gateway unavailable")
+        return body
+
+    @staticmethod
+    def _json(response: httpx.Response):
+        """The decoded body, or None if it is empty or not JSON"""
+        if not response.content:
+            return None
+        try:
+            return response.json()
+        except ValueError:
+            return None
 
     async def create_payment(
         self, amount: float, transaction_id: str, metadata: Dict
@@ -27,48 +132,43 @@ class RazorpayGateway:
         Creates a Razorpay order
         Returns order details needed for frontend integration
         """
-        try:
-            data = {
-                "amount": int(amount * 100),  # Convert to paise
-                "currency": "INR",
-                "receipt": str(transaction_id),
-                "notes": metadata,
-                "payment_capture": 1,  # Auto capture payment
-            }
-
-            order = self.client.order.create(data=data)
-
-            # Return data needed for frontend integration
-            return {
-                "gateway_payment_id": order["id"],  # This is the order_id
-                "amount": amount,
-                "currency": "INR",
-                "status": order["status"],
-                "key": settings.RAZORPAY_KEY_ID,  # Frontend needs this
-                "order_id": order["id"],
-                "prefill": {
-                    "name": metadata.get("sender_name", ""),
-                    "contact": metadata.get("contact", ""),
-                },
-            }
+        data = {
+            "amount": int(round(amount * 100)),  # Convert to paise
+            "currency": "INR",
+            "receipt": str(transaction_id),
+            "notes": metadata,
+            "payment_capture": 1,  # Auto capture payment
+        }
+        order = await self._request("POST", "/orders", idempotent=False, json=data)
 
-        except Exception as e:
-            logger.error(f"Payment creation failed: {str(e)}")
-            raise PaymentError("Failed to create payment")
+        # Return data needed for frontend integration
+        return {
+            "gateway_payment_id": order["id"],  # This is the order_id
+            "amount": amount,
+            "currency": "INR",
+            "status": order["status"],
+            "key": settings.RAZORPAY_KEY_ID,  # Frontend needs this
+            "order_id": order["id"],
+            "prefill": {
+                "name": metadata.get("sender_name", ""),
+                "contact": metadata.get("contact", ""),
+            },
+        }
 
     async def verify_signature(self, payment_data: Dict) -> bool:
         """
-        Verifies Razorpay payment signature
+        Verifies Razorpay payment signature locally
         Called when payment is completed
         """
         try:
-            # Verify signature
-            params_dict = {
-                "razorpay_order_id": payment_data["razorpay_order_id"],
-                "razorpay_payment_id": payment_data["razorpay_payment_id"],
-                "razorpay_signature": payment_data["razorpay_signature"],
-            }
-            return self.client.utility.verify_payment_signature(params_dict)
+            message = (
+                f"{payment_data['razorpay_order_id']}|"
+                f"{payment_data['razorpay_payment_id']}"
+            )
+            expected = hmac.new(
+                settings.RAZORPAY_KEY_SECRET.encode(), message.encode(), hashlib.sha256
+            ).hexdigest()
+            return hmac.compare_digest(expected, payment_data["razorpay_signature"])
 
         except Exception as e:
             logger.error(f"Payment signature verification failed: {str(e)}")
@@ -78,9 +178,15 @@ class RazorpayGateway:
         """
         Fetch payment details from Razorpay
         """
-        try:
-            payment = self.client.payment.fetch(payment_id)
-            return payment
-        except Exception as e:
-            logger.error(f"Failed to fetch payment details: {str(e)}")
-            raise PaymentError("Failed to fetch payment details")
+        return await self._request("GET", f"/payments/{payment_id}", idempotent=True)
+
+    async def fetch_order(self, order_id: str) -> Dict:
+        """
+        Fetch an order's payment attempts from Razorpay
+        """
+        response = await self._request(
+            "GET", f"/orders/{order_id}/payments", idempotent=True
+        )
+        payments = response.get("items", [])
+        status = order_status(payment["status"] for payment in payments)
+        return {"order_id": order_id, "status": status, "payments": payments}
@@ -0,0 +1,62 @@
+# src/services/payment/gateway_events.py
+from typing import Dict, List, Tuple
+import json
+import zlib
+
+
+def encode_payload(payload: Dict) -> bytes:
+    """Compact, zlib-compressed JSON; too small for TOAST to compress"""
+    return zlib.compress(
+        json.dumps(payload, separators=(",", ":"), default=str).encode()
+    )
+
+
+def decode_payload(data: bytes) -> Dict:
+    return json.loads(zlib.decompress(data))
+
+
+class GatewayEventLog:
+    """Append-only log of raw gateway payloads, kept off the payments row"""
+
+    async def record(self, conn, entries: List[Tuple[str, str, Dict]]):
+        """Append (gateway order id, event, payload) entries in one insert
+
+        Runs in the caller's transaction. Entries for orders with no payment
+        row are skipped.
+        """
+        if not entries:
+            return
+
+        await conn.execute(
+            """
+            INSERT INTO payment_gateway_events (payment_id, event, payload)
+            SELECT p.id, u.event, u.payload
+            FROM unnest($1::text[], $2::text[], $3::bytea[]) WITH ORDINALITY
+                AS u(order_id, event, payload, position)
+            INNER JOIN payments p ON p.gateway_payment_id = u.order_id
+            ORDER BY u.position
+            """,
+            [order_id for order_id, _, _ in entries],
+            [event for _, event, _ in entries],
+            [encode_payload(payload) for _, _, payload in entries],
+        )
+
+    async def history(self, conn, payment_id) -> List[Dict]:
+        """Every payload recorded for a payment, oldest first"""
+        rows = await conn.fetch(
+            """
+            SELECT event, payload, created_at
+            FROM payment_gateway_events
+            WHERE payment_id = $1
+            ORDER BY id
+            """,
+            payment_id,
+        )
+        return [
+            {
+                "event": row["event"],
+                "payload": decode_payload(row["payload"]),
+                "created_at": row["created_at"],
+            }
+            for row in rows
+        ]
@@ -0,0 +1,135 @@
+# src/services/payment/inbox.py
+from typing import Optional
+import json
+import logging
+
+from src.core.config.app import settings
+from src.core.config.database import db
+from .webhook import WebhookHandler
+
+logger = logging.getLogger("shagunpe")
+
+
+class WebhookInbox:
+    """Durable inbox: webhooks are stored on receipt and applied later"""
+
+    def __init__(self):
+        self.handler = WebhookHandler()
+
+    async def append(
+        self, body: bytes, signature: str, event_id: Optional[str]
+    ) -> bool:
+        """Store a verified webhook as received; False if already stored"""
+        async with db.pool.acquire() as conn:
+            status = await conn.execute(
+                """
+                INSERT INTO webhook_inbox (event_id, signature, body)
+                VALUES ($1, $2, $3)
+                ON CONFLICT (event_id) WHERE event_id IS NOT NULL DO NOTHING
+                """,
+                event_id,
+                signature,
+                body,
+            )
+        return status.endswith(" 1")
+
+    async def drain(self) -> int:
+        """Process pending webhooks until a batch comes back short"""
+        processed = 0
+        while True:
+            count = await self.process_batch()
+            processed += count
+            if count < settings.WEBHOOK_INBOX_BATCH_SIZE:
+                return processed
+
+    async def process_batch(self) -> int:
+        async with db.pool.acquire() as conn:
+            async with conn.transaction():
+                # SKIP LOCKED lets every worker drain concurrently
+                rows = await conn.fetch(
+                    """
+                    SELECT id, body
+                    FROM webhook_inbox
+                    WHERE processed_at IS NULL
+                    AND attempts < $2
+                    ORDER BY id
+                    LIMIT $1
+                    FOR UPDATE SKIP LOCKED
+                    """,
+                    settings.WEBHOOK_INBOX_BATCH_SIZE,
+                    settings.WEBHOOK_INBOX_MAX_ATTEMPTS,
+                )
+                if not rows:
+                    return 0
+
+                done, results, failed, errors = [], [], [], []
+                batch, payloads = [], []
+                for row in rows:
+                    try:
+                        payloads.append(json.loads(row["body"]))
+                        batch.append(row["id"])
+                    except ValueError as e:
+                        logger.error(f"Webhook {row['id']} is not valid JSON: {str(e)}")
+                        failed.append(row["id"])
+                        errors.append(str(e))
+
+                try:
+                    async with conn.transaction():
+                        batch_results = await self.handler.apply_batch(conn, payloads)
+                    done.extend(batch)
+                    results.extend(json.dumps(r, default=str) for r in batch_results)
+                except Exception as e:
+                    # Find the bad webhook by applying one at a time
+                    logger.error(f"Webhook batch failed, retrying singly: {str(e)}")
+                    for inbox_id, payload in zip(batch, payloads):
+                        try:
+                            async with conn.transaction():
+                                result = await self.handler.apply(conn, payload)
+                            done.append(inbox_id)
+                            results.append(json.dumps(result, default=str))
+                        except Exception as e:
+                            logger.error(f"Webhook {inbox_id} failed: {str(e)}")
+                            failed.append(inbox_id)
+                            errors.append(str(e))
+
+                if done:
+                    await conn.execute(
+                        """
+                        UPDATE webhook_inbox w
+                        SET processed_at = NOW(),
+                            result = d.result::jsonb
+                        FROM unnest($1::bigint[], $2::text[]) AS d(id, result)
+                        WHERE w.id = d.id
+                        """,
+                        done,
+                        results,
+                    )
+                if failed:
+                    await conn.execute(
+                        """
+                        UPDATE webhook_inbox w
+                        SET attempts = attempts + 1,
+                            last_error = f.error
+                        FROM unnest($1::bigint[], $2::text[]) AS f(id, error)
+                        WHERE w.id = f.id
+                        """,
+                        failed,
+                        errors,
+                    )
+
+                return len(done)
+
+    async def purge_processed(self) -> int:
+        """Delete webhooks processed longer ago than the retention window"""
+        async with db.pool.acquire() as conn:
+            status = await conn.execute(
+                """
+                DELETE FROM webhook_inbox
+                WHERE processed_at < NOW() - make_interval(days => $1)
+                """,
+                settings.WEBHOOK_INBOX_RETENTION_DAYS,
+            )
+        return int(status.split()[-1])
+
+
+webhook_inbox = WebhookInbox()
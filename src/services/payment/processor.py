@@ -1,11 +1,17 @@
 # src/services/payment/processor.py
+from fastapi import HTTPException
 from typing import Dict
-from .gateway.razorpay import RazorpayGateway
+from .gateway.factory import payment_gateway
 from src.core.config.database import db
-from src.core.errors.payment import PaymentError, PaymentGatewayError
+from src.core.errors.payment import (
+    PaymentError,
+    PaymentGatewayError,
+    PaymentGatewayUnavailableError,
+)
 from src.core.config.app import settings
+from .gateway_events import GatewayEventLog
+from .state import PaymentStateMachine
 import logging
-import json
 
 logger = logging.getLogger("shagunpe")
 
@@ -13,7 +19,9 @@ logger = logging.getLogger("shagunpe")
 class PaymentProcessor:
     def __init__(self):
         try:
-            self.gateway = RazorpayGateway()
+            self.gateway = payment_gateway
+            self.state_machine = PaymentStateMachine()
+            self.gateway_events = GatewayEventLog()
             self.is_test_mode = getattr(settings, "PAYMENT_TEST_MODE", True)
             logger.info(
                 f"Initialized PaymentProcessor in {'test' if self.is_test_mode else 'live'} mode"
@@ -22,129 +30,112 @@ class PaymentProcessor:
             logger.error(f"Failed to initialize payment processor: {str(e)}")
             raise PaymentGatewayError("Payment system initialization failed")
 
+    def ensure_gateway_available(self):
+        """Fail fast before creating a transaction the gateway can't serve"""
+        if not self.gateway.is_available():
+            raise PaymentGatewayUnavailableError()
+
+    def gateway_status(self) -> Dict:
+        return self.gateway.status()
+
     async def process_payment(self, transaction_id: str, payment_data: Dict) -> Dict:
         try:
+            # No connection is held across the gateway call, so a slow gateway
+            # can't drain the pool for cash entries and browsing
             async with db.pool.acquire() as conn:
                 # Get transaction
                 transaction = await conn.fetchrow(
                     "SELECT * FROM transactions WHERE id = $1", transaction_id
                 )
 
-                if not transaction:
-                    raise PaymentError("Transaction not found")
+            if not transaction:
+                raise PaymentError("Transaction not found")
 
-                # Create payment in gateway
-                gateway_response = await self.gateway.create_payment(
-                    amount=float(transaction["amount"]),
-                    transaction_id=str(transaction["id"]),
-                    metadata=payment_data.get("metadata", {}),
-                )
-
-                # Convert dictionary to JSON string for JSONB columns
-                metadata = json.dumps(gateway_response)
+            # Create payment in gateway
+            gateway_response = await self.gateway.create_payment(
+                amount=float(transaction["amount"]),
+                transaction_id=str(transaction["id"]),
+                metadata=payment_data.get("metadata", {}),
+            )
 
-                # Store payment record
-                payment = await conn.fetchrow(
-                    """
-                    INSERT INTO payments (
+            async with db.pool.acquire() as conn:
+                async with conn.transaction():
+                    # Store payment record
+                    payment = await conn.fetchrow(
+                        """
+                        INSERT INTO payments (
+                            transaction_id,
+                            amount,
+                            payment_method,
+                            gateway_payment_id,
+                            status
+                        ) VALUES ($1, $2, $3, $4, $5)
+                        RETURNING *
+                        """,
                         transaction_id,
-                        amount,
-                        payment_method,
-                        gateway_payment_id,
-                        status,
-                        gateway_response,
-                        metadata
-                    ) VALUES ($1, $2, $3, $4, $5, $6, $7)
-                    RETURNING *
-                    """,
-                    transaction_id,
-                    transaction["amount"],
-                    payment_data["payment_method"],
-                    gateway_response["gateway_payment_id"],
-                    "initiated",
-                    json.dumps(gateway_response),  # Convert to JSON string
-                    metadata,
-                )
+                        transaction["amount"],
+                        payment_data["payment_method"],
+                        gateway_response["gateway_payment_id"],
+                        "initiated",
+                    )
+                    await self.gateway_events.record(
+                        conn,
+                        [
+                            (
+                                gateway_response["gateway_payment_id"],
+                                "order.created",
+                                gateway_response,
+                            )
+                        ],
+                    )
 
-                # Update transaction with payment reference
-                await conn.execute(
-                    """
-                    UPDATE transactions 
-                    SET upi_ref = $1, 
-                        updated_at = NOW() 
-                    WHERE id = $2
-                    """,
-                    gateway_response["gateway_payment_id"],
-                    transaction_id,
-                )
+                    # Update transaction with payment reference
+                    await conn.execute(
+                        """
+                        UPDATE transactions 
+                        SET upi_ref = $1, 
+                            updated_at = NOW() 
+                        WHERE id = $2 AND created_at = $3
+                        """,
+                        gateway_response["gateway_payment_id"],
+                        transaction_id,
+                        transaction["created_at"],
+                    )
 
-                return dict(payment)
+            # The client needs the order details to open checkout
+            return {**dict(payment), "gateway_response": gateway_response}
 
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Payment processing failed: {str(e)}")
             raise PaymentError(str(e))
 
-    # In PaymentProcessor.verify_payment:
     async def verify_payment(self, payment_id: str, verification_data: Dict) -> Dict:
         try:
+            # Checked locally before touching the database
+            is_valid = await self.gateway.verify_signature(verification_data)
+            if not is_valid:
+                raise PaymentError("Invalid payment signature")
+
             async with db.pool.acquire() as conn:
                 async with conn.transaction():
-                    # Get payment with transaction info
+                    await self.gateway_events.record(
+                        conn, [(payment_id, "checkout.verified", verification_data)]
+                    )
+                    # A no-op if the webhook already completed it
+                    await self.state_machine.transition(
+                        conn, {payment_id: ("completed", "checkout.verified")}
+                    )
                     payment = await conn.fetchrow(
-                        """
-                        SELECT p.*, t.event_id, t.amount as transaction_amount
-                        FROM payments p
-                        INNER JOIN transactions t ON p.transaction_id = t.id
-                        WHERE p.gateway_payment_id = $1
-                        FOR UPDATE
-                        """,
+                        "SELECT * FROM payments WHERE gateway_payment_id = $1",
                         payment_id,
                     )
 
-                    if not payment:
-                        raise PaymentError("Payment not found")
-
-                    # Verify signature and amount match
-                    is_valid = await self.gateway.verify_signature(verification_data)
-                    if not is_valid:
-                        raise PaymentError("Invalid payment signature")
-
-                    # Update payment status
-                    updated_payment = await conn.fetchrow(
-                        """
-                        UPDATE payments 
-                        SET status = $1,
-                            gateway_response = $2,
-                            updated_at = NOW()
-                        WHERE id = $3
-                        RETURNING *
-                        """,
-                        "completed",
-                        json.dumps(verification_data),
-                        payment["id"],
-                    )
-
-                    # Update transaction and event amounts atomically
-                    await conn.execute(
-                        """
-                        WITH transaction_update AS (
-                            UPDATE transactions 
-                            SET status = 'completed',
-                                updated_at = NOW()
-                            WHERE id = $1
-                        )
-                        UPDATE events
-                        SET total_amount = total_amount + $2,
-                            online_amount = online_amount + $2,
-                            updated_at = NOW()
-                        WHERE id = $3
-                        """,
-                        payment["transaction_id"],
-                        payment["transaction_amount"],
-                        payment["event_id"],
-                    )
+            if not payment:
+                raise PaymentError("Payment not found")
 
-                    return dict(updated_payment)
+            return dict(payment)
 
         except Exception as e:
             logger.error(f"Payment verification failed: {str(e)}")
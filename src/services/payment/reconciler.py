@@ -0,0 +1,130 @@
+# src/services/payment/reconciler.py
+import asyncio
+import logging
+from typing import Dict, Optional, Tuple
+
+from src.core.config.app import settings
+from src.core.config.database import db
+from src.core.errors.payment import (
+    PaymentGatewayError,
+    PaymentGatewayUnavailableError,
+)
+from .gateway.base import PaymentGateway
+from .gateway.factory import payment_gateway
+from .gateway_events import GatewayEventLog
+from .state import PaymentStateMachine
+
+logger = logging.getLogger("shagunpe")
+
+# Payment status implied by the gateway's order status
+ORDER_STATUS_TARGETS = {
+    "paid": "completed",
+    "authorized": "processing",
+    "attempted": "failed",
+}
+
+
+class PaymentReconciler:
+    """Settles payments whose webhook never arrived by asking the gateway"""
+
+    def __init__(self, gateway: Optional[PaymentGateway] = None):
+        self.gateway = gateway or payment_gateway
+        self.state_machine = PaymentStateMachine()
+        self.gateway_events = GatewayEventLog()
+
+    async def reconcile(self) -> int:
+        """Reconcile one batch of stale open payments; returns transitions
+
+        Payments reconciled longest ago go first, so ones the gateway keeps
+        failing on take their turn instead of every turn.
+        """
+        async with db.pool.acquire() as conn:
+            rows = await conn.fetch(
+                """
+                SELECT gateway_payment_id, status::text as status,
+                       reconcile_failures,
+                       created_at < NOW() - make_interval(mins => $2) as expired
+                FROM payments
+                WHERE status IN ('initiated', 'processing')
+                AND created_at < NOW() - make_interval(mins => $1)
+                AND gateway_payment_id IS NOT NULL
+                ORDER BY reconciled_at NULLS FIRST, created_at
+                LIMIT $3
+                """,
+                settings.RECONCILE_AFTER_MINUTES,
+                settings.PAYMENT_ORDER_EXPIRY_MINUTES,
+                settings.RECONCILE_BATCH_SIZE,
+            )
+        if not rows:
+            return 0
+
+        # Bounded so reconciliation never crowds out live payment traffic
+        semaphore = asyncio.Semaphore(settings.RECONCILE_CONCURRENCY)
+
+        async def fetch(order_id: str) -> Tuple[Optional[Dict], Optional[str]]:
+            """(order, None); (None, error) if rejected; (None, None) if down"""
+            async with semaphore:
+                try:
+                    return await self.gateway.fetch_order(order_id), None
+                except (PaymentGatewayUnavailableError, PaymentGatewayError):
+                    # An outage says nothing about the order
+                    return None, None
+                except Exception as e:
+                    logger.error(f"Failed to fetch order {order_id}: {str(e)}")
+                    return None, str(e)
+
+        results = await asyncio.gather(
+            *(fetch(row["gateway_payment_id"]) for row in rows)
+        )
+
+        changes, received = {}, []
+        for row, (order, error) in zip(rows, results):
+            if order is not None:
+                target = ORDER_STATUS_TARGETS.get(order["status"])
+                reason, payload = f"reconcile.{order['status']}", order
+                if target is None and row["expired"]:
+                    # Never attempted within the expiry window: abandoned
+                    target, reason = "failed", "reconcile.expired"
+            elif (
+                error is not None
+                and row["expired"]
+                and row["reconcile_failures"] + 1 >= settings.RECONCILE_MAX_FAILURES
+            ):
+                # The gateway can't return it, and it is past expiry anyway
+                target, reason = "failed", "reconcile.unfetchable"
+                payload = {"error": error}
+            else:
+                continue
+            # Already there: nothing to record
+            if target and target != row["status"]:
+                changes[row["gateway_payment_id"]] = (target, reason)
+                received.append((row["gateway_payment_id"], reason, payload))
+
+        async with db.pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(
+                    """
+                    UPDATE payments p
+                    SET reconciled_at = NOW(),
+                        reconcile_failures = CASE
+                            WHEN u.rejected THEN p.reconcile_failures + 1
+                            WHEN NOT u.rejected THEN 0
+                            ELSE p.reconcile_failures
+                        END
+                    FROM unnest($1::text[], $2::bool[]) AS u(order_id, rejected)
+                    WHERE p.gateway_payment_id = u.order_id
+                    """,
+                    [row["gateway_payment_id"] for row in rows],
+                    # None for an outage, which leaves the count as it was
+                    [
+                        None if order is None and error is None else error is not None
+                        for order, error in results
+                    ],
+                )
+                await self.gateway_events.record(conn, received)
+                transitioned = await self.state_machine.transition(conn, changes)
+
+        logger.info(
+            f"Reconciled {len(rows)} stale payments, {len(transitioned)} transitioned"
+        )
+        return len(transitioned)
@@ -0,0 +1,165 @@
+# src/services/payment/state.py
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, List, Tuple
+import logging
+
+from src.services.outbox.service import OutboxService, PAYMENT_STATUS_CHANGED
+
+logger = logging.getLogger("shagunpe")
+
+# Allowed payment transitions. Every edge moves forward in PAYMENT_STATUSES,
+# so replayed or reordered gateway events can never move a payment back.
+# A failed attempt may be followed by a successful one on the same order.
+PAYMENT_STATUSES = ("initiated", "processing", "failed", "completed")
+PAYMENT_TRANSITIONS = {
+    "initiated": ("processing", "failed", "completed"),
+    "processing": ("failed", "completed"),
+    "failed": ("completed",),
+    "completed": (),
+}
+
+# Transaction status implied by each payment status
+TRANSACTION_STATUS = {
+    "initiated": "pending",
+    "processing": "pending",
+    "failed": "failed",
+    "completed": "completed",
+}
+
+
+def sources(target: str) -> List[str]:
+    """Statuses a payment may be in to move to target"""
+    return [
+        status for status, targets in PAYMENT_TRANSITIONS.items() if target in targets
+    ]
+
+
+def furthest(statuses: List[str]) -> str:
+    """The status a sequence of valid transitions would end at"""
+    return max(statuses, key=PAYMENT_STATUSES.index)
+
+
+class PaymentStateMachine:
+    def __init__(self):
+        self.outbox = OutboxService()
+
+    async def transition(
+        self, conn, changes: Dict[str, Tuple[str, str]]
+    ) -> Dict[str, Dict]:
+        """Move payments to new statuses inside the caller's transaction
+
+        changes maps gateway order id to (target status, reason). Each
+        payment moves only if its current status allows it, checked by the
+        UPDATE itself, so no row is read or locked first. Gateway payloads
+        are recorded by the caller, not here.
+        Event totals are incremented for the transitions that happened and
+        nothing else. Returns the transitioned payments by order id.
+        """
+        if not changes:
+            return {}
+
+        order_ids = list(changes)
+        rows = await conn.fetch(
+            """
+            WITH payment_update AS (
+                UPDATE payments p
+                SET status = u.status::payment_status,
+                    updated_at = NOW()
+                FROM unnest($1::text[], $2::text[], $3::text[], $4::text[])
+                    AS u(order_id, status, sources, transaction_status)
+                WHERE p.gateway_payment_id = u.order_id
+                AND p.status::text = ANY(string_to_array(u.sources, ','))
+                RETURNING p.id, p.transaction_id, p.gateway_payment_id,
+                          p.status, u.transaction_status
+            ), transaction_update AS (
+                UPDATE transactions t
+                SET status = pu.transaction_status::transaction_status,
+                    updated_at = NOW()
+                FROM payment_update pu
+                WHERE t.id = pu.transaction_id
+                RETURNING t.id, t.event_id, t.amount, t.created_at
+            )
+            SELECT pu.id as payment_id,
+                   pu.gateway_payment_id,
+                   pu.status::text as payment_status,
+                   pu.transaction_status,
+                   tu.id as transaction_id,
+                   tu.event_id,
+                   tu.amount,
+                   tu.created_at as transaction_created_at
+            FROM payment_update pu
+            INNER JOIN transaction_update tu ON tu.id = pu.transaction_id
+            """,
+            order_ids,
+            [changes[order_id][0] for order_id in order_ids],
+            [",".join(sources(changes[order_id][0])) for order_id in order_ids],
+            [TRANSACTION_STATUS[changes[order_id][0]] for order_id in order_ids],
+        )
+        transitioned = {row["gateway_payment_id"]: dict(row) for row in rows}
+
+        # Only payments that just became completed count towards event totals
+        event_increments = defaultdict(Decimal)
+        event_counts = defaultdict(int)
+        for row in transitioned.values():
+            if row["payment_status"] == "completed":
+                event_increments[row["event_id"]] += row["amount"]
+                event_counts[row["event_id"]] += 1
+
+        if event_increments:
+            event_ids = sorted(event_increments)
+            # Lock the event rows in a fixed order before touching them
+            await conn.execute(
+                """
+                SELECT 1 FROM events
+                WHERE id = ANY($1::uuid[])
+                ORDER BY id
+                FOR UPDATE
+                """,
+                event_ids,
+            )
+            await conn.execute(
+                """
+                UPDATE events e
+                SET total_amount = e.total_amount + u.amount,
+                    online_amount = e.online_amount + u.amount,
+                    transaction_count = e.transaction_count + u.count,
+                    updated_at = NOW()
+                FROM unnest($1::uuid[], $2::numeric[], $3::int[])
+                    AS u(id, amount, count)
+                WHERE e.id = u.id
+                """,
+                event_ids,
+                [event_increments[event_id] for event_id in event_ids],
+                [event_counts[event_id] for event_id in event_ids],
+            )
+
+        # Side effects are published by the outbox relay after commit
+        await self.outbox.enqueue_many(
+            conn,
+            PAYMENT_STATUS_CHANGED,
+            [
+                (
+                    row["payment_id"],
+                    {
+                        "payment_id": row["payment_id"],
+                        "gateway_payment_id": order_id,
+                        "transaction_id": row["transaction_id"],
+                        "event_id": row["event_id"],
+                        "status": row["payment_status"],
+                        "gateway_event": changes[order_id][1],
+                    },
+                )
+                for order_id, row in transitioned.items()
+            ],
+        )
+        await self.outbox.enqueue_shagun_many(
+            conn,
+            [
+                (row["transaction_id"], row["transaction_created_at"])
+                for row in transitioned.values()
+                if row["transaction_status"] in ("completed", "failed")
+            ],
+        )
+
+        return transitioned
@@ -0,0 +1,130 @@
+# src/services/payment/status.py
+import asyncio
+import json
+import logging
+from typing import AsyncIterator, Dict, List, Optional
+from uuid import UUID
+
+from src.core.config.app import settings
+from src.core.config.database import db
+from src.core.errors.payment import PaymentNotFoundError
+from src.services.payment.gateway_events import GatewayEventLog
+from src.services.realtime.pubsub import pubsub_hub
+
+logger = logging.getLogger("shagunpe")
+
+# Streams end once a payment reaches one of these
+FINAL_STATUSES = ("completed", "failed")
+
+
+class PaymentStatusFeed:
+    """Payment status reads, and pushes of changes to waiting clients"""
+
+    def __init__(self):
+        self.gateway_events = GatewayEventLog()
+
+    @staticmethod
+    def _topic(payment_id) -> str:
+        return f"payment:{payment_id}"
+
+    async def get_status(self, payment_id: UUID, user_id: str) -> Dict:
+        """Current status of a payment the user sent or received"""
+        async with db.pool.acquire() as conn:
+            payment = await conn.fetchrow(
+                """
+                SELECT p.id, p.gateway_payment_id, p.transaction_id,
+                       p.status::text as status, p.amount, p.updated_at
+                FROM payments p
+                INNER JOIN transactions t ON t.id = p.transaction_id
+                WHERE p.id = $1
+                AND (t.sender_id = $2 OR t.receiver_id = $2)
+                """,
+                payment_id,
+                user_id,
+            )
+        if not payment:
+            raise PaymentNotFoundError()
+        return dict(payment)
+
+    async def get_gateway_events(self, payment_id: UUID, user_id: str) -> List[Dict]:
+        """Gateway payloads recorded for a payment, to the user who sent it
+
+        Only the sender: the payloads carry their contact and payment
+        details.
+        """
+        async with db.pool.acquire() as conn:
+            payment_id = await conn.fetchval(
+                """
+                SELECT p.id
+                FROM payments p
+                INNER JOIN transactions t ON t.id = p.transaction_id
+                WHERE p.id = $1
+                AND t.sender_id = $2
+                """,
+                payment_id,
+                user_id,
+            )
+            if not payment_id:
+                raise PaymentNotFoundError()
+            return await self.gateway_events.history(conn, payment_id)
+
+    async def publish(self, event: Dict):
+        """Outbox consumer: fan a status change out to every worker"""
+        payload = event["payload"]
+        await pubsub_hub.publish(
+            self._topic(payload["payment_id"]),
+            {"payment_id": payload["payment_id"], "status": payload["status"]},
+        )
+
+    async def wait(
+        self, payment_id: UUID, user_id: str, since: Optional[str], timeout: float
+    ) -> Dict:
+        """Long-poll: return once the status differs from since, or on timeout"""
+        async with pubsub_hub.subscribe(self._topic(payment_id)) as queue:
+            # Read after subscribing so a change in between is not missed
+            status = await self.get_status(payment_id, user_id)
+            if status["status"] != since or status["status"] in FINAL_STATUSES:
+                return status
+            try:
+                await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                return status
+        return await self.get_status(payment_id, user_id)
+
+    async def stream(self, payment_id: UUID, user_id: str) -> AsyncIterator[str]:
+        """Server-sent events: the current status, then each change"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.PAYMENT_EVENTS_MAX_SECONDS
+
+        async with pubsub_hub.subscribe(self._topic(payment_id)) as queue:
+            status = await self.get_status(payment_id, user_id)
+            yield self._event(status)
+
+            while status["status"] not in FINAL_STATUSES:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(
+                        queue.get(),
+                        min(settings.PAYMENT_EVENTS_KEEPALIVE, remaining),
+                    )
+                    woken = True
+                except asyncio.TimeoutError:
+                    woken = False
+
+                # Re-read on keep-alives too, so a push lost to a pub/sub
+                # reconnect costs one keep-alive interval, not the stream
+                latest = await self.get_status(payment_id, user_id)
+                if latest["status"] != status["status"]:
+                    status = latest
+                    yield self._event(status)
+                elif not woken:
+                    yield ": keep-alive\n\n"
+
+    @staticmethod
+    def _event(status: Dict) -> str:
+        return f"event: status\ndata: {json.dumps(status, default=str)}\n\n"
+
+
+payment_status_feed = PaymentStatusFeed()
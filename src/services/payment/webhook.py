@@ -1,18 +1,20 @@
 # src/services/payment/webhook.py
-from fastapi import HTTPException
-from typing import Dict
-from src.core.config.database import db
-from src.cache.redis import redis_client  # Import Redis client
-import json
+from typing import Dict, List, Optional
 import logging
 
+from .gateway_events import GatewayEventLog
+from .state import PaymentStateMachine, TRANSACTION_STATUS, furthest
+
 logger = logging.getLogger("shagunpe")
 
 
-# src/services/payment/webhook.py
 class WebhookHandler:
     def __init__(self):
-        # Map Razorpay events to our status types
+        self.state_machine = PaymentStateMachine()
+        self.gateway_events = GatewayEventLog()
+
+        # Map Razorpay events to our payment status types; the transaction
+        # status follows from the payment status
         self.payment_status_mapping = {
             "payment.captured": "completed",
             "payment.failed": "failed",
@@ -20,17 +22,24 @@ class WebhookHandler:
             "order.paid": "completed",
         }
 
-        # Separate mapping for transaction status
-        self.transaction_status_mapping = {
-            "payment.captured": "completed",
-            "payment.failed": "failed",
-            "payment.authorized": "pending",  # Keep as pending until captured
-            "order.paid": "completed",
-        }
+    async def apply(self, conn, payload: Dict) -> Dict:
+        """Apply one webhook inside the caller's transaction; raises to retry"""
+        return (await self.apply_batch(conn, [payload]))[0]
+
+    async def apply_batch(self, conn, payloads: List[Dict]) -> List[Dict]:
+        """Apply a batch of webhooks inside the caller's transaction
 
-    async def handle_payment_webhook(self, body: bytes, signature: str) -> Dict:
-        try:
-            payload = json.loads(body)
+        Statuses only move forward, so the webhooks for one order reduce to
+        the furthest status among them, whatever order they arrived in. All
+        orders then move in one set-based conditional update.
+        """
+        results: List[Optional[Dict]] = [None] * len(payloads)
+        targets: Dict[str, List[str]] = {}
+        changes = {}
+        handled = []
+        received = []
+
+        for index, payload in enumerate(payloads):
             event = payload.get("event")
             payment_entity = (
                 payload.get("payload", {}).get("payment", {}).get("entity", {})
@@ -40,90 +49,57 @@ class WebhookHandler:
             logger.info(f"Processing webhook: event={event}, order_id={order_id}")
 
             if not order_id:
-                return {"status": "invalid_payload"}
-
-            async with db.pool.acquire() as conn:
-                async with conn.transaction():
-                    payment = await conn.fetchrow(
-                        """
-                        SELECT p.*, t.event_id, t.amount as transaction_amount
-                        FROM payments p
-                        INNER JOIN transactions t ON p.transaction_id = t.id
-                        WHERE p.gateway_payment_id = $1
-                        FOR UPDATE
-                        """,
-                        order_id,
-                    )
-
-                    if not payment:
-                        return {"status": "payment_not_found"}
-
-                    # Get new statuses from event
-                    new_payment_status = self.payment_status_mapping.get(event)
-                    new_transaction_status = self.transaction_status_mapping.get(event)
-
-                    if not new_payment_status:
-                        return {"status": "unhandled_event"}
-
-                    if new_payment_status == "completed":
-                        await conn.execute(
-                            """
-                            WITH payment_update AS (
-                                UPDATE payments 
-                                SET status = $1::payment_status,
-                                    gateway_response = $2,
-                                    updated_at = NOW()
-                                WHERE id = $3
-                                RETURNING transaction_id
-                            ), transaction_update AS (
-                                UPDATE transactions
-                                SET status = $4::transaction_status,
-                                    updated_at = NOW()
-                                WHERE id = (SELECT transaction_id FROM payment_update)
-                                RETURNING event_id
-                            )
-                            UPDATE events
-                            SET total_amount = total_amount + $5,
-                                online_amount = online_amount + $5,
-                                updated_at = NOW()
-                            WHERE id = (SELECT event_id FROM transaction_update)
-                            """,
-                            new_payment_status,
-                            json.dumps(payload),
-                            payment["id"],
-                            new_transaction_status,
-                            payment["transaction_amount"],
-                        )
-                    else:
-                        # Update statuses for other events
-                        await conn.execute(
-                            """
-                            WITH payment_update AS (
-                                UPDATE payments 
-                                SET status = $1::payment_status,
-                                    gateway_response = $2,
-                                    updated_at = NOW()
-                                WHERE id = $3
-                            )
-                            UPDATE transactions
-                            SET status = $4::transaction_status,
-                                updated_at = NOW()
-                            WHERE id = $5
-                            """,
-                            new_payment_status,
-                            json.dumps(payload),
-                            payment["id"],
-                            new_transaction_status,
-                            payment["transaction_id"],
-                        )
-
-                    return {
-                        "status": "success",
-                        "payment_status": new_payment_status,
-                        "transaction_status": new_transaction_status,
-                        "order_id": order_id,
-                    }
-
-        except Exception as e:
-            logger.error(f"Webhook processing failed: {str(e)}")
-            return {"status": "error", "message": str(e)}
+                results[index] = {"status": "invalid_payload"}
+                continue
+            # Every payload is kept, including ones coalesced away below
+            received.append((order_id, event, payload))
+
+            new_payment_status = self.payment_status_mapping.get(event)
+            if not new_payment_status:
+                results[index] = {"status": "unhandled_event"}
+                continue
+
+            targets.setdefault(order_id, []).append(new_payment_status)
+            if furthest(targets[order_id]) == new_payment_status:
+                changes[order_id] = (new_payment_status, event)
+            handled.append((index, order_id, new_payment_status))
+
+        await self.gateway_events.record(conn, received)
+        transitioned = await self.state_machine.transition(conn, changes)
+
+        # Say why the rest changed nothing, without locking anything
+        current = {}
+        untouched = [order_id for order_id in changes if order_id not in transitioned]
+        if untouched:
+            rows = await conn.fetch(
+                """
+                SELECT gateway_payment_id, status::text
+                FROM payments
+                WHERE gateway_payment_id = ANY($1::text[])
+                """,
+                untouched,
+            )
+            current = {row["gateway_payment_id"]: row["status"] for row in rows}
+
+        for index, order_id, new_payment_status in handled:
+            row = transitioned.get(order_id)
+            if row and row["payment_status"] == new_payment_status:
+                results[index] = {
+                    "status": "success",
+                    "payment_status": new_payment_status,
+                    "transaction_status": TRANSACTION_STATUS[new_payment_status],
+                    "order_id": order_id,
+                }
+            elif not row and order_id not in current:
+                results[index] = {"status": "payment_not_found"}
+            else:
+                # Superseded in this batch, or the payment is already past it
+                results[index] = {
+                    "status": "ignored",
+                    "payment_status": (
+                        row["payment_status"] if row else current[order_id]
+                    ),
+                    "order_id": order_id,
+                }
+
+        return results
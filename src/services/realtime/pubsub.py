@@ -0,0 +1,129 @@
+# src/services/realtime/pubsub.py
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Set
+
+from src.cache.redis import redis_client
+
+logger = logging.getLogger("shagunpe")
+
+CHANNEL_PREFIX = "shagunpe:rt:"
+
+
+class SubscriberQueue(asyncio.Queue):
+    """A subscriber's messages; overflowed is set when any may have been lost
+
+    Set when one had to be dropped, or the hub lost its Redis connection. A
+    subscriber that can't tolerate gaps checks it, clears it and resyncs.
+    """
+
+    def __init__(self, maxsize: int):
+        super().__init__(maxsize=maxsize)
+        self.overflowed = False
+
+    def resync(self):
+        """Flag lost messages and wake the subscriber with a None message"""
+        self.overflowed = True
+        if not self.full():
+            self.put_nowait(None)
+
+
+class PubSubHub:
+    """Per-worker fan-out of Redis pub/sub messages to local subscribers
+
+    Each worker holds a single pattern subscription and hands every message
+    to the queues of the local requests waiting on that topic, so held
+    client connections cost no Redis connection of their own.
+    """
+
+    QUEUE_SIZE = 100
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[SubscriberQueue]] = defaultdict(set)
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def publish(self, topic: str, message: Dict):
+        await redis_client.publish(
+            f"{CHANNEL_PREFIX}{topic}", json.dumps(message, default=str)
+        )
+
+    @asynccontextmanager
+    async def subscribe(self, topic: str) -> AsyncIterator[SubscriberQueue]:
+        """Queue receiving the messages published to topic while open"""
+        await self.start()
+        queue = SubscriberQueue(self.QUEUE_SIZE)
+        self._subscribers[topic].add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers[topic].discard(queue)
+            if not self._subscribers[topic]:
+                del self._subscribers[topic]
+
+    async def _listen(self):
+        reconnecting = False
+        while True:
+            pubsub = redis_client.redis.pubsub()
+            try:
+                await pubsub.psubscribe(f"{CHANNEL_PREFIX}*")
+                if reconnecting:
+                    # Whatever was published while disconnected is gone
+                    self._resync_all()
+                    reconnecting = False
+                while True:
+                    # Bounded reads: an idle channel must not trip the
+                    # client's socket timeout
+                    message = await pubsub.get_message(
+                        ignore_subscribe_messages=True, timeout=1.0
+                    )
+                    if message and message["type"] == "pmessage":
+                        self._dispatch(message["channel"], message["data"])
+            except asyncio.CancelledError:
+                await pubsub.aclose()
+                raise
+            except Exception as e:
+                logger.error(f"Pub/sub listener failed, reconnecting: {str(e)}")
+                reconnecting = True
+                await pubsub.aclose()
+                await asyncio.sleep(1)
+
+    def _resync_all(self):
+        for queues in self._subscribers.values():
+            for queue in queues:
+                queue.resync()
+
+    def _dispatch(self, channel: str, data: str):
+        topic = channel[len(CHANNEL_PREFIX) :]
+        queues = self._subscribers.get(topic)
+        if not queues:
+            return
+        message = json.loads(data)
+        for queue in list(queues):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Logged once per overflow, not per message dropped
+                if not queue.overflowed:
+                    logger.warning(
+                        f"Dropping realtime messages on {topic} for slow subscriber"
+                    )
+                queue.overflowed = True
+
+
+pubsub_hub = PubSubHub()
@@ -3,11 +3,15 @@ from uuid import UUID
 from fastapi import HTTPException
 import logging
 from src.core.config.database import db
+from src.services.archive.service import ArchiveService
 
 logger = logging.getLogger("shagunpe")
 
 
 class SearchService:
+    def __init__(self):
+        self.archive_service = ArchiveService()
+
     async def search_shaguns(
         self,
         event_id: UUID,
@@ -17,11 +21,19 @@ class SearchService:
     ) -> Dict:
         try:
             async with db.pool.acquire() as conn:
+                event = await conn.fetchrow(
+                    "SELECT created_at, archived_at FROM events WHERE id = $1",
+                    event_id,
+                )
+                archived_at = event["archived_at"] if event else None
+                table = self.archive_service.transactions_table(archived_at)
+
                 # Single optimized query using ILIKE
-                base_query = """
-                    FROM transactions t 
+                base_query = f"""
+                    FROM {table} t 
                     WHERE t.event_id = $1 
                     AND t.status = 'completed'
+                    AND t.created_at >= $5
                     AND (
                         t.sender_name ILIKE $2
                         OR t.address ILIKE $2
@@ -61,6 +73,7 @@ class SearchService:
                     *params,
                     page_size,
                     (page - 1) * page_size,
+                    event["created_at"] if event else None,
                 )
 
                 total_count = results[0]["total_count"] if results else 0
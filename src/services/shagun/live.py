@@ -0,0 +1,145 @@
+# src/services/shagun/live.py
+import asyncio
+import json
+import logging
+from typing import AsyncIterator, Dict, List
+from uuid import UUID
+
+from fastapi import HTTPException
+
+from src.core.config.app import settings
+from src.core.config.database import db
+from src.services.realtime.pubsub import pubsub_hub
+from src.services.shagun.service import ShagunService
+
+logger = logging.getLogger("shagunpe")
+
+# Stored counters pushed with every update
+TOTALS_SQL = """
+    SELECT total_amount, online_amount, cash_amount, transaction_count
+    FROM events
+    WHERE id = $1
+"""
+
+
+class EventLiveFeed:
+    """Live shagun dashboard per event, pushed instead of refreshed"""
+
+    def __init__(self):
+        self.shagun_service = ShagunService()
+
+    @staticmethod
+    def _topic(event_id) -> str:
+        return f"event:{event_id}:shaguns"
+
+    async def publish(self, event: Dict):
+        """Outbox consumer: fan a completed shagun and the new totals out"""
+        payload = event["payload"]
+        async with db.pool.acquire() as conn:
+            totals = await conn.fetchrow(TOTALS_SQL, payload["event_id"])
+        if not totals:
+            return
+        await pubsub_hub.publish(
+            self._topic(payload["event_id"]),
+            {
+                "shagun": {
+                    "id": payload["transaction_id"],
+                    "sender_name": payload["sender_name"],
+                    "sender_address": payload["address"],
+                    "amount": float(payload["amount"]),
+                    "type": payload["type"],
+                    "created_at": payload["created_at"],
+                },
+                "totals": self._totals(totals),
+            },
+        )
+
+    async def check_access(self, event_id: UUID, user_id: str):
+        async with db.pool.acquire() as conn:
+            owned = await conn.fetchval(
+                "SELECT 1 FROM events WHERE id = $1 AND creator_id = $2",
+                event_id,
+                user_id,
+            )
+        if not owned:
+            raise HTTPException(status_code=404, detail="Event not found")
+
+    async def stream(self, event_id: UUID) -> AsyncIterator[str]:
+        """Server-sent events: the dashboard, then batches of new shaguns
+
+        Shaguns arriving within LIVE_EVENT_MIN_INTERVAL of the last push go
+        out together, so a burst costs each screen a few updates a second.
+        A client too slow to keep up, or one whose messages were lost to a
+        pub/sub reconnect, gets the whole dashboard again instead of a batch
+        with shaguns missing.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.LIVE_EVENT_MAX_SECONDS
+
+        async with pubsub_hub.subscribe(self._topic(event_id)) as queue:
+            # Read after subscribing so a shagun in between is not missed
+            dashboard = await self.shagun_service.get_event_shaguns(event_id)
+            yield self._event("dashboard", dashboard)
+            last_push = loop.time()
+
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    messages = [
+                        await asyncio.wait_for(
+                            queue.get(), min(settings.LIVE_EVENT_KEEPALIVE, remaining)
+                        )
+                    ]
+                except asyncio.TimeoutError:
+                    messages = []
+
+                if messages:
+                    wait = last_push + settings.LIVE_EVENT_MIN_INTERVAL - loop.time()
+                    if wait > 0:
+                        await asyncio.sleep(wait)
+                    while not queue.empty():
+                        messages.append(queue.get_nowait())
+
+                # Checked on keep-alives too: a pub/sub reconnect may have
+                # lost shaguns without leaving anything in the queue
+                if queue.overflowed:
+                    # Cleared before reading, so a later drop is noticed
+                    queue.overflowed = False
+                    dashboard = await self.shagun_service.get_event_shaguns(event_id)
+                    yield self._event("dashboard", dashboard)
+                elif messages:
+                    yield self._event("shaguns", self._coalesce(messages))
+                else:
+                    yield ": keep-alive\n\n"
+                    continue
+                last_push = loop.time()
+
+    @staticmethod
+    def _coalesce(messages: List[Dict]) -> Dict:
+        """One update for a batch: every shagun, newest first, and the totals"""
+        return {
+            "shaguns": [message["shagun"] for message in reversed(messages)],
+            # Counters only grow; relayed out of order, the largest is latest
+            "totals": max(
+                (message["totals"] for message in messages),
+                key=lambda totals: totals["transaction_count"],
+            ),
+        }
+
+    @staticmethod
+    def _totals(totals) -> Dict:
+        return {
+            "total_amount": float(totals["total_amount"]),
+            "online_amount": float(totals["online_amount"]),
+            "cash_amount": float(totals["cash_amount"]),
+            "transaction_count": totals["transaction_count"],
+        }
+
+    @staticmethod
+    def _event(name: str, data: Dict) -> str:
+        return f"event: {name}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+event_live_feed = EventLiveFeed()
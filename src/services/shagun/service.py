@@ -4,35 +4,43 @@ from uuid import UUID
 from fastapi import HTTPException
 import logging
 
+from src.cache.manager import FIRST_PAGE_SIZE, cache_manager
 from src.core.config.database import db
+from src.services.archive.service import ArchiveService
 
 logger = logging.getLogger("shagunpe")
 
 
 class ShagunService:
+    def __init__(self):
+        self.archive_service = ArchiveService()
+
     async def get_event_shaguns(
         self,
         event_id: UUID,
         page_online: int = 1,
         page_cash: int = 1,
         page_size: int = 10,
+        refresh: bool = False,
     ) -> Dict:
+        # The first page is what hosts keep open; later pages go to the database
+        first_page = page_online == page_cash == 1 and page_size == FIRST_PAGE_SIZE
+        generation = None
+        if first_page:
+            if not refresh:
+                cached = await cache_manager.get_shagun_page(event_id)
+                if cached:
+                    return cached
+            # Before reading, so an invalidation during the read is noticed
+            generation = await cache_manager.get_shagun_generation(event_id)
+
         try:
             async with db.pool.acquire() as conn:
                 event = await conn.fetchrow(
                     """
-                    SELECT 
-                        e.id, e.event_name, e.event_date, e.location,
-                        COALESCE(SUM(t.amount), 0) as total_shagun,
-                        COALESCE(SUM(CASE WHEN t.type = 'online' THEN t.amount ELSE 0 END), 0) as online_shagun,
-                        COALESCE(SUM(CASE WHEN t.type = 'cash' THEN t.amount ELSE 0 END), 0) as cash_shagun,
-                        COUNT(t.*) as shagun_count,
-                        COUNT(CASE WHEN t.type = 'online' THEN 1 END) as online_count,
-                        COUNT(CASE WHEN t.type = 'cash' THEN 1 END) as cash_count
-                    FROM events e
-                    LEFT JOIN transactions t ON e.id = t.event_id AND t.status = 'completed'
-                    WHERE e.id = $1
-                    GROUP BY e.id
+                    SELECT id, event_name, event_date, location, created_at, archived_at
+                    FROM events
+                    WHERE id = $1
                 """,
                     event_id,
                 )
@@ -40,15 +48,44 @@ class ShagunService:
                 if not event:
                     raise HTTPException(status_code=404, detail="Event not found")
 
+                # Shaguns cannot predate their event, so bounding created_at
+                # lets Postgres prune older monthly partitions.
+                since = event["created_at"]
+                table = self.archive_service.transactions_table(event["archived_at"])
+
+                summary = None
+                if event["archived_at"]:
+                    summary = await self.archive_service.get_summary(conn, event_id)
+
+                if not summary:
+                    summary = await conn.fetchrow(
+                        f"""
+                        SELECT 
+                            COALESCE(SUM(t.amount), 0) as total_shagun,
+                            COALESCE(SUM(CASE WHEN t.type = 'online' THEN t.amount ELSE 0 END), 0) as online_shagun,
+                            COALESCE(SUM(CASE WHEN t.type = 'cash' THEN t.amount ELSE 0 END), 0) as cash_shagun,
+                            COUNT(*) as shagun_count,
+                            COUNT(CASE WHEN t.type = 'online' THEN 1 END) as online_count,
+                            COUNT(CASE WHEN t.type = 'cash' THEN 1 END) as cash_count
+                        FROM {table} t
+                        WHERE t.event_id = $1
+                        AND t.status = 'completed'
+                        AND t.created_at >= $2
+                    """,
+                        event_id,
+                        since,
+                    )
+
                 async def get_shaguns_by_type(type: str, page: int):
                     offset = (page - 1) * page_size
-                    base_query = """
-                        FROM transactions t 
+                    base_query = f"""
+                        FROM {table} t 
                         WHERE t.event_id = $1 
                         AND t.type = $2
                         AND t.status = 'completed'
+                        AND t.created_at >= $3
                     """
-                    params = [event_id, type]
+                    params = [event_id, type, since]
 
                     total_count = await conn.fetchval(
                         f"SELECT COUNT(*) {base_query}", *params
@@ -58,19 +95,10 @@ class ShagunService:
                         f"""
                         SELECT 
                             t.id, t.sender_name, t.address as sender_address,
-                            t.amount, t.type, t.created_at, t.location,
-                            CASE
-                                WHEN NOW() - t.created_at < INTERVAL '1 hour' 
-                                    THEN EXTRACT(MINUTE FROM NOW() - t.created_at)::TEXT || ' min ago'
-                                WHEN NOW() - t.created_at < INTERVAL '24 hours' 
-                                    THEN EXTRACT(HOUR FROM NOW() - t.created_at)::TEXT || 'h ago'
-                                WHEN NOW() - t.created_at < INTERVAL '7 days' 
-                                    THEN EXTRACT(DAY FROM NOW() - t.created_at)::TEXT || 'd ago'
-                                ELSE to_char(t.created_at, 'DD Mon YYYY')
-                            END as time_ago
+                            t.amount, t.type, t.created_at, t.location
                         {base_query}
                         ORDER BY t.created_at DESC
-                        LIMIT $3 OFFSET $4
+                        LIMIT $4 OFFSET $5
                     """,
                         *params,
                         page_size,
@@ -83,7 +111,6 @@ class ShagunService:
                                 **dict(tx),
                                 "amount": float(tx["amount"]),
                                 "created_at": tx["created_at"],
-                                "time_ago": tx["time_ago"],
                             }
                             for tx in shaguns
                         ],
@@ -100,22 +127,26 @@ class ShagunService:
                 online_shaguns = await get_shaguns_by_type("online", page_online)
                 cash_shaguns = await get_shaguns_by_type("cash", page_cash)
 
-                return {
+                result = {
                     "event_name": event["event_name"],
                     "event_date": event["event_date"],
                     "event_location": event["location"],
                     "summary": {
-                        "total_shagun": float(event["total_shagun"]),
-                        "online_shagun": float(event["online_shagun"]),
-                        "cash_shagun": float(event["cash_shagun"]),
-                        "shagun_count": event["shagun_count"],
-                        "online_count": event["online_count"],
-                        "cash_count": event["cash_count"],
+                        "total_shagun": float(summary["total_shagun"]),
+                        "online_shagun": float(summary["online_shagun"]),
+                        "cash_shagun": float(summary["cash_shagun"]),
+                        "shagun_count": summary["shagun_count"],
+                        "online_count": summary["online_count"],
+                        "cash_count": summary["cash_count"],
                     },
                     "online_shaguns": online_shaguns,
                     "cash_shaguns": cash_shaguns,
                 }
 
+            if first_page:
+                await cache_manager.set_shagun_page(event_id, result, generation)
+            return result
+
         except Exception as e:
             logger.error(f"Error fetching event shaguns: {str(e)}")
             raise HTTPException(status_code=500, detail=str(e))
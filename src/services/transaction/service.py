@@ -7,6 +7,11 @@ import logging
 from datetime import datetime
 
 from src.core.config.database import db
+from src.services.outbox.service import (
+    SHAGUN_COMPLETED,
+    SHAGUN_PAYLOAD_SQL,
+    TRANSACTION_CREATED,
+)
 
 logger = logging.getLogger("shagunpe")
 
@@ -19,7 +24,7 @@ class TransactionService:
         try:
             async with db.pool.acquire() as conn:
                 result = await conn.fetchrow(
-                    """
+                    f"""
                     WITH event_data AS (
                         SELECT e.id, e.event_name, u.name as creator_name, e.creator_id
                         FROM events e
@@ -44,8 +49,14 @@ class TransactionService:
                         UPDATE events
                         SET total_amount = total_amount + $3,
                             cash_amount = cash_amount + $3,
+                            transaction_count = transaction_count + 1,
                             updated_at = NOW()
                         WHERE id = $1
+                    ),
+                    outbox_entry AS (
+                        INSERT INTO outbox (topic, aggregate_id, payload)
+                        SELECT '{SHAGUN_COMPLETED}', t.id, {SHAGUN_PAYLOAD_SQL.format(t="t")}
+                        FROM new_transaction t
                     )
                     SELECT t.*, 
                            e.event_name,
@@ -84,23 +95,31 @@ class TransactionService:
         try:
             async with db.pool.acquire() as conn:
                 result = await conn.fetchrow(
-                    """
+                    f"""
                     WITH event_data AS (
                         SELECT e.id, e.event_name, u.name as creator_name, e.creator_id
                         FROM events e
                         INNER JOIN users u ON e.creator_id = u.id
                         WHERE e.id = $1
                         FOR UPDATE
+                    ),
+                    new_transaction AS (
+                        INSERT INTO transactions (
+                            event_id, sender_id, receiver_id, amount,
+                            type, status, sender_name, address, message, upi_ref
+                        )
+                        SELECT 
+                            $1, $2, creator_id, $3,
+                            'online', 'pending', $4, $5, $6, $7
+                        FROM event_data
+                        RETURNING *
+                    ),
+                    outbox_entry AS (
+                        INSERT INTO outbox (topic, aggregate_id, payload)
+                        SELECT '{TRANSACTION_CREATED}', t.id, {SHAGUN_PAYLOAD_SQL.format(t="t")}
+                        FROM new_transaction t
                     )
-                    INSERT INTO transactions (
-                        event_id, sender_id, receiver_id, amount,
-                        type, status, sender_name, address, message, upi_ref
-                    )
-                    SELECT 
-                        $1, $2, creator_id, $3,
-                        'online', 'pending', $4, $5, $6, $7
-                    FROM event_data
-                    RETURNING *
+                    SELECT * FROM new_transaction
                     """,
                     event_id,
                     sender_id,
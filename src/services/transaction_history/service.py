@@ -18,22 +18,38 @@ class TransactionHistoryService:
     ) -> Dict:
         try:
             async with db.pool.acquire() as conn:
-                base_query = """
-                    FROM transactions t
+                # One index range per direction on the completed covering
+                # indexes, so pages are served by index-only scans. Includes
+                # archived events, whose rows live in transactions_archive.
+                columns = """
+                    t.id, t.event_id, t.sender_id, t.sender_name,
+                    t.address, t.amount, t.created_at
+                """
+                sent = f"""
+                    SELECT {columns} FROM transactions_all t
+                    WHERE t.status = 'completed' AND t.sender_id = $1
+                """
+                received = f"""
+                    SELECT {columns} FROM transactions_all t
+                    WHERE t.status = 'completed' AND t.receiver_id = $1
+                """
+                if transaction_type == "sent":
+                    source = sent
+                elif transaction_type == "received":
+                    source = received
+                else:
+                    source = f"{sent} UNION ALL {received} AND t.sender_id <> $1"
+
+                base_query = f"""
+                    FROM ({source}) t
                     JOIN events e ON t.event_id = e.id
-                    WHERE t.status = 'completed'
-                    AND (
-                        CASE 
-                            WHEN $2::text = 'sent' THEN t.sender_id = $1
-                            WHEN $2::text = 'received' THEN t.receiver_id = $1
-                            ELSE (t.sender_id = $1 OR t.receiver_id = $1)
-                        END
-                    )
                 """
-                params = [user_id, transaction_type]
+                params = [user_id]
 
                 # Get total count
-                count = await conn.fetchval(f"SELECT COUNT(*) {base_query}", *params)
+                count = await conn.fetchval(
+                    f"SELECT COUNT(*) FROM ({source}) t", *params
+                )
 
                 # Get paginated results with different fields for sent/received
                 query = f"""
@@ -67,7 +83,7 @@ class TransactionHistoryService:
                         END as sent_by
                     {base_query}
                     ORDER BY t.created_at DESC
-                    LIMIT $3 OFFSET $4
+                    LIMIT $2 OFFSET $3
                 """
 
                 transactions = await conn.fetch(
@@ -0,0 +1,111 @@
+# src/utils/pdf.py
+from typing import Dict, List, Optional
+import zlib
+
+# PDF user space is in points
+MM = 72 / 25.4
+
+
+class PDFWriter:
+    """Just enough PDF for generated documents: pages, vector drawing, images
+
+    Text in embedded fonts is drawn with src/utils/pdf_text.py.
+    """
+
+    def __init__(self):
+        # Objects 1 and 2 are the catalog and the page tree, written last
+        self._objects: List[Optional[bytes]] = [None, None]
+        self._pages: List[int] = []
+
+    def add(self, body: bytes) -> int:
+        """Add an object; returns its number"""
+        self._objects.append(body)
+        return len(self._objects)
+
+    def reserve(self) -> int:
+        """Number for an object written later with put()"""
+        self._objects.append(None)
+        return len(self._objects)
+
+    def put(self, number: int, body: bytes):
+        self._objects[number - 1] = body
+
+    def add_stream(self, data: bytes, dictionary: str = "") -> int:
+        data = zlib.compress(data)
+        return self.add(
+            f"<< {dictionary} /Length {len(data)} /Filter /FlateDecode >>\nstream\n".encode()
+            + data
+            + b"\nendstream"
+        )
+
+    def add_image(
+        self, rgb: bytes, width: int, height: int, alpha: Optional[bytes] = None
+    ) -> int:
+        """8-bit RGB image, with an optional 8-bit alpha channel as soft mask"""
+        smask = ""
+        if alpha is not None:
+            mask = self.add_stream(
+                alpha,
+                f"/Type /XObject /Subtype /Image /Width {width} /Height {height} "
+                "/ColorSpace /DeviceGray /BitsPerComponent 8",
+            )
+            smask = f" /SMask {mask} 0 R"
+        return self.add_stream(
+            rgb,
+            f"/Type /XObject /Subtype /Image /Width {width} /Height {height} "
+            f"/ColorSpace /DeviceRGB /BitsPerComponent 8{smask}",
+        )
+
+    def add_page(
+        self,
+        width: float,
+        height: float,
+        content: bytes,
+        images: Optional[Dict[str, int]] = None,
+        fonts: Optional[Dict[str, int]] = None,
+    ) -> int:
+        """Page of width x height points drawn by the content operators"""
+        resources = ""
+        if images:
+            resources += (
+                "/XObject << "
+                + " ".join(f"/{name} {number} 0 R" for name, number in images.items())
+                + " >>"
+            )
+        if fonts:
+            resources += (
+                " /Font << "
+                + " ".join(f"/{name} {number} 0 R" for name, number in fonts.items())
+                + " >>"
+            )
+        contents = self.add_stream(content)
+        page = self.add(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width:.2f} {height:.2f}] "
+            f"/Resources << {resources} >> /Contents {contents} 0 R >>".encode()
+        )
+        self._pages.append(page)
+        return page
+
+    def output(self) -> bytes:
+        self._objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+        self._objects[1] = (
+            "<< /Type /Pages /Kids ["
+            + " ".join(f"{page} 0 R" for page in self._pages)
+            + f"] /Count {len(self._pages)} >>"
+        ).encode()
+
+        out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for number, body in enumerate(self._objects, start=1):
+            offsets.append(len(out))
+            out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+
+        xref = len(out)
+        out += f"xref\n0 {len(self._objects) + 1}\n0000000000 65535 f \n".encode()
+        for offset in offsets:
+            out += f"{offset:010d} 00000 n \n".encode()
+        out += (
+            f"trailer\n<< /Size {len(self._objects) + 1} /Root 1 0 R >>\n"
+            f"startxref\n{xref}\n%%EOF\n"
+        ).encode()
+        return bytes(out)
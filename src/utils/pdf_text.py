@@ -0,0 +1,318 @@
+# src/utils/pdf_text.py
+import hashlib
+import io
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+import uharfbuzz as hb
+from fontTools import subset
+from fontTools.ttLib import TTFont
+
+from src.utils.pdf import PDFWriter
+
+# (glyph id, advance, x offset, y offset), in font units
+Glyph = Tuple[int, int, int, int]
+
+
+class EmbeddedFont:
+    """A TrueType font shaped by HarfBuzz and embedded as a glyph subset
+
+    Text is written as glyph ids (Identity-H), so any script the font covers
+    prints as shaped, and a ToUnicode map keeps it searchable and copyable.
+    Only glyphs actually shown go into the file.
+    """
+
+    def __init__(self, path: str, name: str):
+        with open(path, "rb") as f:
+            self._data = f.read()
+        self.name = name  # Resource name on pages, e.g. F1
+        self.number: Optional[int] = None  # Object number, once referenced
+        self._hb_font = hb.Font(hb.Face(self._data))
+        font = TTFont(io.BytesIO(self._data))
+        self._cmap = font.getBestCmap()
+        self._charset = frozenset(chr(code) for code in self._cmap)
+        # Glyph id to the character it is the plain glyph of
+        self._chars: Dict[int, str] = {}
+        for code, glyph in sorted(self._cmap.items(), reverse=True):
+            self._chars[font.getGlyphID(glyph)] = chr(code)
+        self._sources = self._substituted(font)
+        self._units = font["head"].unitsPerEm
+        self._advances = [font["hmtx"][glyph][0] for glyph in font.getGlyphOrder()]
+        self._postscript_name = font["name"].getDebugName(6) or "Font"
+        head, hhea = font["head"], font["hhea"]
+        self._bbox = [head.xMin, head.yMin, head.xMax, head.yMax]
+        self._ascent, self._descent = hhea.ascent, hhea.descent
+        os2 = font["OS/2"] if "OS/2" in font else None
+        self._cap_height = getattr(os2, "sCapHeight", 0) or hhea.ascent
+        self._shaped: Dict[str, List[Glyph]] = {}
+        self._used: Dict[int, str] = {}  # Glyph id to the text it stands for
+
+    def _substituted(self, font: TTFont) -> Dict[int, str]:
+        """Glyph id to the text a glyph made by shaping stands for
+
+        Followed from the font's single and ligature substitutions back to
+        plain glyphs, e.g. a conjunct to its consonants and virama.
+        """
+        texts = {font.getGlyphName(gid): char for gid, char in self._chars.items()}
+        ligatures, singles = [], []
+        if "GSUB" in font:
+            for lookup in font["GSUB"].table.LookupList.Lookup:
+                for table in lookup.SubTable:
+                    kind = lookup.LookupType
+                    if kind == 7:
+                        kind, table = table.ExtensionLookupType, table.ExtSubTable
+                    if kind == 1:
+                        singles.extend(
+                            ([glyph], out) for glyph, out in table.mapping.items()
+                        )
+                    elif kind == 4:
+                        ligatures.extend(
+                            ([first, *ligature.Component], ligature.LigGlyph)
+                            for first, entries in table.ligatures.items()
+                            for ligature in entries
+                        )
+        # Ligatures first: a contextual single substitution can also make a
+        # conjunct or reph, from a glyph that is not what it stands for.
+        # Substitutions chain, e.g. half forms into a conjunct, so each set
+        # is followed until nothing more resolves.
+        for rules in (ligatures, ligatures + singles):
+            changed = True
+            while changed:
+                changed = False
+                for glyphs, out in rules:
+                    if out not in texts and all(glyph in texts for glyph in glyphs):
+                        texts[out] = "".join(texts[glyph] for glyph in glyphs)
+                        changed = True
+        return {
+            font.getGlyphID(name): text
+            for name, text in texts.items()
+            if font.getGlyphID(name) not in self._chars
+        }
+
+    def has(self, char: str) -> bool:
+        return char in self._charset
+
+    def covers(self, text: str) -> bool:
+        return self._charset.issuperset(text)
+
+    def shape(self, text: str) -> List[Glyph]:
+        glyphs = self._shaped.get(text)
+        if glyphs is None:
+            buffer = hb.Buffer()
+            buffer.add_codepoints([ord(char) for char in text])
+            buffer.guess_segment_properties()
+            hb.shape(self._hb_font, buffer)
+            infos, positions = buffer.glyph_infos, buffer.glyph_positions
+            self._record(text, [info.codepoint for info in infos], infos)
+            glyphs = [
+                (info.codepoint, pos.x_advance, pos.x_offset, pos.y_offset)
+                for info, pos in zip(infos, positions)
+            ]
+            self._shaped[text] = glyphs
+        return glyphs
+
+    def _record(self, text: str, gids: List[int], infos):
+        """Note which text each glyph stands for, for the ToUnicode map
+
+        A glyph of a character maps to it, and one made by shaping, like a
+        conjunct or half form, to the characters it was made from. Any other
+        glyph maps to what of its cluster the rest leave uncovered.
+        """
+        members: Dict[int, List[int]] = {}
+        for gid, info in zip(gids, infos):
+            members.setdefault(info.cluster, []).append(gid)
+        clusters = sorted(members) + [len(text)]
+        for cluster, end in zip(clusters, clusters[1:]):
+            rest = text[cluster:end]
+            for gid in members[cluster]:
+                known = self._chars.get(gid) or self._sources.get(gid)
+                if known:
+                    rest = rest.replace(known, "", 1)
+            for gid in members[cluster]:
+                if gid not in self._used:
+                    known = self._chars.get(gid) or self._sources.get(gid)
+                    self._used[gid] = known or rest
+                    if not known:
+                        rest = ""
+
+    def width(self, glyphs: List[Glyph], size: float) -> float:
+        return sum(glyph[1] for glyph in glyphs) * size / self._units
+
+    def show(self, glyphs: List[Glyph], size: float) -> str:
+        """Text operators for shaped glyphs at the current text position"""
+        scale = 1000 / self._units
+        ops, items, rise = [], [], 0
+        for gid, advance, dx, dy in glyphs:
+            if dy != rise:
+                if items:
+                    ops.append(f"[{' '.join(items)}] TJ")
+                    items = []
+                rise = dy
+                ops.append(f"{dy * size / self._units:.2f} Ts")
+            if dx:
+                items.append(f"{-dx * scale:.0f}")
+            items.append(f"<{gid:04x}>")
+            # TJ numbers move left, in thousandths of the font size
+            shift = (self._advances[gid] - advance + dx) * scale
+            if shift:
+                items.append(f"{shift:.0f}")
+        if items:
+            ops.append(f"[{' '.join(items)}] TJ")
+        if rise:
+            ops.append("0 Ts")
+        return " ".join(ops)
+
+    def reference(self, pdf: PDFWriter) -> int:
+        """Object number for page resources; the font itself is written last"""
+        if self.number is None:
+            self.number = pdf.reserve()
+        return self.number
+
+    def embed(self, pdf: PDFWriter):
+        """Write the subset of glyphs shown so far"""
+        if self.number is None:
+            return
+        gids = sorted(self._used)
+        font = TTFont(io.BytesIO(self._data))
+        options = subset.Options()
+        options.retain_gids = True  # Glyph ids in the text stay valid
+        options.notdef_outline = True
+        options.layout_features = []
+        options.hinting = False
+        subsetter = subset.Subsetter(options)
+        subsetter.populate(gids=gids)
+        subsetter.subset(font)
+        buffer = io.BytesIO()
+        font.save(buffer)
+        data = buffer.getvalue()
+
+        tag = "".join(
+            chr(65 + byte % 26)
+            for byte in hashlib.sha256(repr(gids).encode()).digest()[:6]
+        )
+        base_font = f"{tag}+{self._postscript_name}"
+        scale = 1000 / self._units
+        font_file = pdf.add_stream(data, f"/Length1 {len(data)}")
+        descriptor = pdf.add(
+            (
+                f"<< /Type /FontDescriptor /FontName /{base_font} /Flags 4 "
+                f"/FontBBox [{' '.join(f'{v * scale:.0f}' for v in self._bbox)}] "
+                f"/ItalicAngle 0 /Ascent {self._ascent * scale:.0f} "
+                f"/Descent {self._descent * scale:.0f} "
+                f"/CapHeight {self._cap_height * scale:.0f} /StemV 80 "
+                f"/FontFile2 {font_file} 0 R >>"
+            ).encode()
+        )
+        widths = " ".join(
+            f"{gid} [{self._advances[gid] * scale:.0f}]" for gid in gids
+        )
+        cid_font = pdf.add(
+            (
+                f"<< /Type /Font /Subtype /CIDFontType2 /BaseFont /{base_font} "
+                "/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) "
+                "/Supplement 0 >> "
+                f"/FontDescriptor {descriptor} 0 R /W [{widths}] "
+                "/CIDToGIDMap /Identity >>"
+            ).encode()
+        )
+        to_unicode = pdf.add_stream(self._to_unicode())
+        pdf.put(
+            self.number,
+            (
+                f"<< /Type /Font /Subtype /Type0 /BaseFont /{base_font} "
+                f"/Encoding /Identity-H /DescendantFonts [{cid_font} 0 R] "
+                f"/ToUnicode {to_unicode} 0 R >>"
+            ).encode(),
+        )
+
+    def _to_unicode(self) -> bytes:
+        entries = [
+            f"<{gid:04x}> <{text.encode('utf-16-be').hex()}>"
+            for gid, text in sorted(self._used.items())
+            if text
+        ]
+        lines = [
+            "/CIDInit /ProcSet findresource begin",
+            "12 dict begin",
+            "begincmap",
+            "/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def",
+            "/CMapName /Adobe-Identity-UCS def",
+            "/CMapType 2 def",
+            "1 begincodespacerange",
+            "<0000> <ffff>",
+            "endcodespacerange",
+        ]
+        for start in range(0, len(entries), 100):
+            block = entries[start : start + 100]
+            lines.append(f"{len(block)} beginbfchar")
+            lines.extend(block)
+            lines.append("endbfchar")
+        lines += [
+            "endcmap",
+            "CMapName currentdict /CMap defineresource pop",
+            "end",
+            "end",
+        ]
+        return "\n".join(lines).encode()
+
+
+class TextStyle:
+    """A font with a fallback for characters it lacks, e.g. Latin and Devanagari
+
+    Text is split into runs by which font covers each character; combining
+    marks, joiners and spaces stay in the run they follow, so a syllable is
+    always shaped by one font.
+    """
+
+    def __init__(self, font: EmbeddedFont, fallback: Optional[EmbeddedFont] = None):
+        self.font = font
+        self.fallback = fallback
+        # (text, size) to its width and text operators, as names repeat
+        self._set: Dict[Tuple[str, float], Tuple[float, str]] = {}
+
+    @property
+    def fonts(self) -> List[EmbeddedFont]:
+        return [font for font in (self.font, self.fallback) if font]
+
+    def _runs(self, text: str) -> List[Tuple[EmbeddedFont, str]]:
+        if not text:
+            return []
+        if self.font.covers(text):
+            return [(self.font, text)]
+        runs: List[Tuple[EmbeddedFont, str]] = []
+        current, start = None, 0
+        for i, char in enumerate(text):
+            if current is not None and current.has(char) and (
+                char.isspace() or unicodedata.category(char)[0] in "MC"
+            ):
+                continue
+            if self.font.has(char) or not (self.fallback and self.fallback.has(char)):
+                font = self.font
+            else:
+                font = self.fallback
+            if font is not current:
+                if current is not None:
+                    runs.append((current, text[start:i]))
+                current, start = font, i
+        if current is not None:
+            runs.append((current, text[start:]))
+        return runs
+
+    def _typeset(self, text: str, size: float) -> Tuple[float, str]:
+        typeset = self._set.get((text, size))
+        if typeset is None:
+            width, ops = 0.0, []
+            for font, run in self._runs(text):
+                glyphs = font.shape(run)
+                width += font.width(glyphs, size)
+                ops.append(f"/{font.name} {size} Tf {font.show(glyphs, size)}")
+            typeset = self._set[(text, size)] = (width, " ".join(ops))
+        return typeset
+
+    def width(self, text: str, size: float) -> float:
+        """Width in points of text set at size"""
+        return self._typeset(text, size)[0]
+
+    def show(self, x: float, y: float, text: str, size: float) -> str:
+        """Operators drawing text with its baseline starting at (x, y)"""
+        return f"BT {x:.2f} {y:.2f} Td {self._typeset(text, size)[1]} ET"
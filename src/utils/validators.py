@@ -0,0 +1,14 @@
+# src/utils/validators.py
+import re
+from typing import Optional
+
+# Generated IDs are "SG" and 8 shortuuid characters; the column allows 20
+SHAGUN_ID_PATTERN = re.compile(r"^[A-Z0-9]{4,20}$")
+
+
+def normalize_shagun_id(shagun_id: str) -> Optional[str]:
+    """The stored form of a shagun_id, or None if it can't be one"""
+    shagun_id = shagun_id.strip().upper()
+    if not SHAGUN_ID_PATTERN.match(shagun_id):
+        return None
+    return shagun_id
@@ -26,23 +26,23 @@ class WebhookUtils:
             return False
 
     @staticmethod
-    async def is_duplicate_webhook(signature: str) -> bool:
-        """Check if webhook was already processed"""
-        key = f"webhook:processed:{signature}"
+    async def claim_webhook(event_key: str) -> bool:
+        """Atomically claim a webhook; False if it was already received"""
+        key = f"webhook:received:{event_key}"
         try:
-            return await redis_client.exists(key)
+            return await redis_client.set_nx(key, "1", WebhookUtils.WEBHOOK_EXPIRY)
         except Exception as e:
-            logger.error(f"Redis check failed: {str(e)}")
-            return False
+            logger.error(f"Redis claim failed: {str(e)}")
+            return True  # The inbox unique key still dedupes
 
     @staticmethod
-    async def mark_webhook_processed(signature: str):
-        """Mark webhook as processed"""
-        key = f"webhook:processed:{signature}"
+    async def release_webhook(event_key: str):
+        """Drop a claim so Razorpay's retry of an unstored webhook gets in"""
+        key = f"webhook:received:{event_key}"
         try:
-            await redis_client.set(key, "1", ex=WebhookUtils.WEBHOOK_EXPIRY)
+            await redis_client.delete(key)
         except Exception as e:
-            logger.error(f"Redis mark failed: {str(e)}")
+            logger.error(f"Redis release failed: {str(e)}")
 
     @staticmethod
     async def check_rate_limit(signature: str) -> bool: